@@ -0,0 +1,14 @@
+"""Performance benchmarks.
+
+Benchmarks run offline, checkers are never executed or are replaced by
+stub executables.
+
+Modules:
+
+* :mod:`benchmarks.e2e` - end-to-end check-code runs in synthetic
+  repositories compared against stored baseline
+* :mod:`benchmarks.micro` - orchestration overhead per checked file
+  compared against fixed budget
+* :mod:`benchmarks.memory` - peak memory of huge runs must not grow with
+  number of tasks
+"""
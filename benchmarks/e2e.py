@@ -0,0 +1,321 @@
+"""End-to-end benchmarks of check-code.
+
+Every scenario generates throwaway git repository with staged (or
+committed) files in several languages and precommit-checkers.yml, puts
+stub checkers with configured latency and output size on PATH and runs
+check-code in separate process. Wall time, peak memory (max RSS) and
+duration of run phases (see ``check-code --timings-json``) are measured.
+
+Results are compared with stored baseline, run fails if any metric
+regressed more than tolerance::
+
+    python -m benchmarks.e2e
+    python -m benchmarks.e2e --scenario staged --repeat 5
+    python -m benchmarks.e2e --update-baseline
+
+Baseline depends on machine, update it when benchmarks are moved to other
+machine.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from os import path
+
+import yaml
+
+
+BENCHMARKS_DIR = path.dirname(path.abspath(__file__))
+PROJECT_DIR = path.dirname(BENCHMARKS_DIR)
+BASELINE_PATH = path.join(BENCHMARKS_DIR, 'baseline.json')
+
+# relative slowdown treated as regression
+DEFAULT_TOLERANCE = 0.25
+# absolute differences below these are treated as noise
+TIME_SLACK = 0.05
+MEMORY_SLACK_KB = 5 * 1024
+
+# file extension -> checker
+LANGUAGES = {
+    'js': 'jshint',
+    'php': 'phpcs',
+    'rst': 'rst-lint',
+    'py': 'pep8'
+}
+
+SCENARIOS = {
+    # typical commit
+    'staged': {'files': 100, 'latency': 0.005, 'output': 0},
+    # failing checkers printing long reports
+    'verbose': {'files': 50, 'latency': 0, 'output': 64 * 1024,
+                'failing': True},
+    # vendored copies, most files have identical contents; checkers are
+    # path independent (external ones get explicit config), so identical
+    # contents are checked once
+    'duplicates': {'files': 200, 'latency': 0.005, 'output': 0,
+                   'duplicates': 0.9,
+                   'checkers': {'js': {'jshint': {'config': '.jshintrc'}},
+                                'php': {'phpcs': {'standard': 'PSR2'}},
+                                'py': 'trailing-whitespace',
+                                'rst': 'final-newline'}},
+    # second run with warm local cache
+    'cached': {'files': 200, 'latency': 0.005, 'output': 0,
+               'cache': True, 'warmup': True},
+    # files changed in pushed commit
+    'range': {'files': 200, 'latency': 0, 'output': 0, 'mode': 'range'},
+    # whole repository scan
+    'all': {'files': 1000, 'latency': 0, 'output': 0, 'mode': 'all'},
+    # staged files checked in snapshot of index, every file of repository
+    # is part of snapshot
+    'snapshot': {'files': 1000, 'latency': 0, 'output': 0,
+                 'mode': 'snapshot'}
+}
+
+_RUNNER_CODE = ('import sys;'
+                'from codechecker.scripts.runner import main;'
+                'sys.exit(main(sys.argv[1:]))')
+
+_STUB_TEMPLATE = """#!/bin/sh
+for file_path; do :; done
+cat "$file_path" > /dev/null
+{latency}{output}exit {status}
+"""
+
+
+def main(argv=None):
+    """Run benchmarks and compare them with baseline.
+
+    :returns: 0 if no metric regressed, 1 otherwise
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.e2e',
+        description='Run end-to-end check-code benchmarks'
+    )
+    parser.add_argument('--scenario', action='append',
+                        choices=sorted(SCENARIOS),
+                        help='run only selected scenario, may be repeated')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='number of measured runs of every scenario')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='allowed relative slowdown')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='store results as new baseline')
+    args = parser.parse_args(argv)
+
+    names = args.scenario or sorted(SCENARIOS)
+    results = {}
+    for each_name in names:
+        results[each_name] = run_scenario(SCENARIOS[each_name], args.repeat)
+        print(format_result(each_name, results[each_name]))
+
+    if args.update_baseline:
+        baseline = load_baseline(args.baseline)
+        baseline.update(results)
+        with open(args.baseline, 'w') as baseline_file:
+            json.dump(baseline, baseline_file, indent=2, sort_keys=True)
+            baseline_file.write('\n')
+        print('Baseline {} updated'.format(args.baseline))
+        return 0
+
+    regressions = compare(load_baseline(args.baseline), results,
+                          args.tolerance)
+    for each_regression in regressions:
+        print('REGRESSION {}'.format(each_regression))
+    return 1 if regressions else 0
+
+
+def run_scenario(scenario, repeat):
+    """Run scenario repeatedly and return aggregated metrics.
+
+    :returns: dict with median wall time, max RSS and median duration of
+        every run phase
+    """
+    runs = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        repo_dir = path.join(work_dir, 'repo')
+        bin_dir = path.join(work_dir, 'bin')
+        create_stub_checkers(bin_dir, scenario)
+        check_args = create_repository(repo_dir, scenario)
+        if scenario.get('warmup'):
+            run_check_code(repo_dir, bin_dir, check_args)
+        for _ in range(repeat):
+            runs.append(run_check_code(repo_dir, bin_dir, check_args))
+    phases = {}
+    for each_phase in runs[0]['phases']:
+        phases[each_phase] = round(statistics.median(
+            run['phases'].get(each_phase, 0) for run in runs
+        ), 4)
+    return {
+        'wall': round(statistics.median(run['wall'] for run in runs), 4),
+        'max_rss_kb': max(run['max_rss_kb'] for run in runs),
+        'phases': phases
+    }
+
+
+def create_stub_checkers(bin_dir, scenario):
+    """Create stub checker executables named as real checkers."""
+    os.makedirs(bin_dir)
+    latency = scenario.get('latency', 0)
+    output = scenario.get('output', 0)
+    contents = _STUB_TEMPLATE.format(
+        latency='sleep {}\n'.format(latency) if latency else '',
+        output='head -c {} /dev/zero | tr "\\000" x\n'.format(output)
+        if output else '',
+        status=1 if scenario.get('failing') else 0
+    )
+    for each_checker in LANGUAGES.values():
+        stub_path = path.join(bin_dir, each_checker)
+        with open(stub_path, 'w') as stub_file:
+            stub_file.write(contents)
+        os.chmod(stub_path, 0o755)
+
+
+def create_repository(repo_dir, scenario):
+    """Create git repository with files to check.
+
+    :returns: check-code arguments selecting checked files
+    """
+    os.makedirs(repo_dir)
+    _git(repo_dir, 'init', '-q')
+    _git(repo_dir, 'config', 'user.email', 'bench@example.com')
+    _git(repo_dir, 'config', 'user.name', 'bench')
+    mode = scenario.get('mode', 'staged')
+
+    checkers = dict(LANGUAGES, **scenario.get('checkers', {}))
+    config = {'file-checkers': {
+        '*.{}'.format(extension): [checker]
+        for extension, checker in checkers.items()
+    }}
+    if scenario.get('cache'):
+        config['cache'] = {'local': True}
+    config_path = path.join(repo_dir, 'precommit-checkers.yml')
+    with open(config_path, 'w') as config_file:
+        yaml.safe_dump(config, config_file)
+
+    if mode in ('range', 'snapshot'):
+        _write_files(repo_dir, scenario, revision='base')
+        _git(repo_dir, 'add', '-A')
+        _git(repo_dir, 'commit', '-q', '-m', 'base')
+    _write_files(repo_dir, scenario)
+    _git(repo_dir, 'add', '-A')
+    if mode == 'staged':
+        return []
+    if mode == 'snapshot':
+        return ['--snapshot']
+    _git(repo_dir, 'commit', '-q', '-m', 'changes')
+    if mode == 'range':
+        return ['--range', 'HEAD~1..HEAD']
+    return ['--all']
+
+
+def run_check_code(repo_dir, bin_dir, check_args):
+    """Run check-code once and measure it.
+
+    :returns: dict with wall time, max RSS and run phases durations
+    """
+    timings_path = path.join(path.dirname(repo_dir), 'timings.json')
+    environ = dict(os.environ)
+    environ['PATH'] = bin_dir + os.pathsep + environ.get('PATH', '')
+    environ['PYTHONPATH'] = PROJECT_DIR
+    for each_variable in ('CODECHECKER_JOBS', 'CODECHECKER_CACHE_URL',
+                          'CODECHECKER_AGENTS', 'CI'):
+        environ.pop(each_variable, None)
+    command = [sys.executable, '-c', _RUNNER_CODE,
+               '--timings-json', timings_path] + check_args
+
+    start_time = time.monotonic()
+    process = subprocess.Popen(command, cwd=repo_dir, env=environ,
+                               stdout=subprocess.DEVNULL,
+                               stderr=subprocess.PIPE)
+    # wait4 reports resource usage of check-code and its workers
+    _, status, rusage = os.wait4(process.pid, 0)
+    wall_time = time.monotonic() - start_time
+    process.returncode = os.waitstatus_to_exitcode(status)
+    stderr = process.stderr.read().decode(errors='replace')
+    process.stderr.close()
+    # 1 means that some checker failed, which is expected
+    if process.returncode not in (0, 1):
+        raise RuntimeError('check-code failed ({}): {}'
+                           .format(process.returncode, stderr))
+    with open(timings_path) as timings_file:
+        phases = json.load(timings_file)
+    return {'wall': wall_time, 'max_rss_kb': rusage.ru_maxrss,
+            'phases': phases}
+
+
+def load_baseline(baseline_path):
+    """Load stored results, return empty baseline if file does not exist."""
+    try:
+        with open(baseline_path) as baseline_file:
+            return json.load(baseline_file)
+    except FileNotFoundError:
+        return {}
+
+
+def compare(baseline, results, tolerance):
+    """Compare results with baseline.
+
+    :returns: list of regressions descriptions
+    """
+    regressions = []
+    for each_name, result in sorted(results.items()):
+        expected = baseline.get(each_name)
+        if expected is None:
+            print('No baseline for scenario {}'.format(each_name))
+            continue
+        metrics = [('wall', result['wall'], expected['wall'], TIME_SLACK),
+                   ('max_rss_kb', result['max_rss_kb'],
+                    expected['max_rss_kb'], MEMORY_SLACK_KB)]
+        for each_phase, duration in sorted(result['phases'].items()):
+            if each_phase in expected['phases']:
+                metrics.append(('phase ' + each_phase, duration,
+                                expected['phases'][each_phase], TIME_SLACK))
+        for metric, value, expected_value, slack in metrics:
+            if value > expected_value * (1 + tolerance) + slack:
+                regressions.append('{} {}: {} (baseline {})'.format(
+                    each_name, metric, value, expected_value
+                ))
+    return regressions
+
+
+def format_result(name, result):
+    """Format scenario result as single line."""
+    phases = ', '.join('{} {:.3f}s'.format(phase, duration)
+                       for phase, duration in result['phases'].items())
+    return '{:<12} wall {:.3f}s  max RSS {:.1f}MB  ({})'.format(
+        name, result['wall'], result['max_rss_kb'] / 1024, phases
+    )
+
+
+def _write_files(repo_dir, scenario, revision='changed'):
+    """Write scenario files spread over languages and directories."""
+    extensions = sorted(LANGUAGES)
+    files_count = scenario['files']
+    # files with equal content id have identical contents
+    unique_count = max(
+        int(files_count * (1 - scenario.get('duplicates', 0))
+            / len(extensions)), 1
+    )
+    for index in range(files_count):
+        extension = extensions[index % len(extensions)]
+        file_path = path.join(repo_dir, 'dir{}'.format(index % 10),
+                              'file{}.{}'.format(index, extension))
+        os.makedirs(path.dirname(file_path), exist_ok=True)
+        content_id = index // len(extensions) % unique_count
+        with open(file_path, 'w') as checked_file:
+            checked_file.write('{} {} {}\n'.format(
+                revision, extension, content_id
+            ) * 20)
+
+
+def _git(repo_dir, *args):
+    subprocess.run(('git',) + args, cwd=repo_dir, check=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
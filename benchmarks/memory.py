@@ -0,0 +1,115 @@
+"""Memory benchmark of result aggregation in huge runs.
+
+Stream of instant in-process tasks (no checker processes) is executed
+through :func:`codechecker.worker.iter_results` and results are aggregated
+like by ``check-code`` in compact mode. Peak memory allocated by Python
+(tracemalloc) is measured for small and large run, large run must not
+need noticeably more memory than small one::
+
+    python -m benchmarks.memory
+    python -m benchmarks.memory --tasks 10000 --tasks 200000
+
+Tasks are streamed, so memory of tasks list is not part of measurement.
+"""
+import argparse
+import concurrent.futures as futures
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from os import path
+
+from codechecker.checker.task import (Task,
+                                      CheckResult)
+from codechecker.worker import (iter_results,
+                                CompactReport,
+                                ResultSummary,
+                                TimingsMonitor)
+
+
+DEFAULT_TASKS = [10000, 100000]
+# every ERROR_EVERY-th task fails with long message, failures of small
+# run fill bounded buffers (summary, output), so only unbounded growth is
+# measured
+ERROR_EVERY = 10
+MESSAGE_SIZE = 2048
+# summary memory limit, lower than default so overflow is exercised
+SUMMARY_LIMIT = 256 * 1024
+# allowed relative growth of peak memory
+TOLERANCE = 0.1
+
+
+def main(argv=None):
+    """Measure peak memory of runs of increasing size.
+
+    :returns: 0 if peak memory stays flat, 1 otherwise
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.memory',
+        description='Measure orchestrator memory of huge runs'
+    )
+    parser.add_argument('--tasks', type=int, action='append',
+                        help='number of tasks of run, may be repeated')
+    args = parser.parse_args(argv)
+
+    peaks = []
+    for each_count in sorted(args.tasks or DEFAULT_TASKS):
+        peak_kb, duration = measure_run(each_count)
+        peaks.append(peak_kb)
+        print('{:>8} tasks  peak {:8.1f}KB  {:6.2f}s'.format(
+            each_count, peak_kb, duration
+        ))
+    if peaks[-1] > peaks[0] * (1 + TOLERANCE):
+        print('Peak memory grows with number of tasks')
+        return 1
+    return 0
+
+
+def measure_run(tasks_count):
+    """Execute tasks and aggregate results.
+
+    :returns: tuple of peak allocated KB and duration in seconds
+    """
+    with tempfile.TemporaryDirectory() as log_dir, \
+            open(os.devnull, 'w') as devnull, \
+            futures.ThreadPoolExecutor(4) as executor:
+        start = time.monotonic()
+        tracemalloc.start()
+        report = CompactReport(path.join(log_dir, 'last-run'), devnull)
+        monitor = TimingsMonitor()
+        with ResultSummary(SUMMARY_LIMIT) as summary:
+            for result in iter_results(_iter_tasks(tasks_count),
+                                       workers_count=4, adaptive=False,
+                                       monitor=monitor, executor=executor):
+                report.add(result)
+                summary.add(result)
+            report.finish(summary, [])
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak / 1024, time.monotonic() - start
+
+
+def _iter_tasks(tasks_count):
+    for index in range(tasks_count):
+        yield _InstantTask('TASK src/file{}.py'.format(index),
+                           index % ERROR_EVERY == 0)
+
+
+class _InstantTask(Task):
+    """Task returning result without executing checker."""
+
+    def __init__(self, taskname, fails):
+        super().__init__(taskname, 'true')
+        self.checkername = 'instant'
+        self._fails = fails
+
+    def __call__(self):
+        if self._fails:
+            return CheckResult(self.taskname, CheckResult.ERROR,
+                               message='x' * MESSAGE_SIZE)
+        return CheckResult(self.taskname)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""Micro-benchmarks of orchestration hot paths.
+
+Measure overhead added by check-code to every checked file, without
+executing checkers: matching file against configured patterns, creating
+tasks, building commands and creating results. Sum of per task costs is
+compared with fixed budget, so checking 100k files stays cheap::
+
+    python -m benchmarks.micro
+    python -m benchmarks.micro --budget 150
+
+Costs which do not depend on number of files (sorting patterns), result
+creators on large outputs and native hygiene checks of 1000 files are
+reported too, but are not part of per task budget.
+"""
+import argparse
+import itertools
+import sys
+import timeit
+
+from codechecker.checker import native
+from codechecker.result_creators import (create_pylint_result,
+                                         create_pyunittest_result,
+                                         create_phpunit_result)
+# pylint: disable=protected-access
+from codechecker import api
+
+
+# max orchestration overhead per checked file in microseconds
+PER_TASK_BUDGET_US = 50.0
+
+FILE_CHECKERS_CONFIG = {
+    '*.py': ['pylint', 'pep8'],
+    'tests/*.py': [{'pylint': {'rcfile': 'tests/pylintrc'}}, 'pep8'],
+    '*.js': ['jshint', {'jscs': {'preset': 'google'}}],
+    '*.php': [{'phpcs': {'standard': 'PSR2'}}],
+    '*.rst': 'rst-lint',
+    'vendor/*': []
+}
+
+LARGE_OUTPUT_LINES = 50000
+
+# native checks which only search contents
+HYGIENE_CHECKS = [native.check_trailing_whitespace,
+                  native.check_merge_conflict, native.check_final_newline,
+                  native.check_crlf]
+HYGIENE_FILES = 1000
+
+
+def main(argv=None):
+    """Run micro-benchmarks and check per task budget.
+
+    :returns: 0 if per task overhead is within budget, 1 otherwise
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.micro',
+        description='Measure check-code orchestration overhead'
+    )
+    parser.add_argument('--budget', type=float, default=PER_TASK_BUDGET_US,
+                        help='max overhead per task in microseconds')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='number of measurements, best one is reported')
+    args = parser.parse_args(argv)
+
+    per_task = {}
+    for name, (function, number) in _per_task_benchmarks().items():
+        per_task[name] = measure(function, number, args.repeat)
+        print('{:<28} {:10.2f} us/task'.format(name, per_task[name]))
+    for name, (function, number) in _other_benchmarks().items():
+        cost = measure(function, number, args.repeat)
+        print('{:<28} {:10.2f} us/call'.format(name, cost))
+
+    total = sum(per_task.values())
+    print('{:<28} {:10.2f} us/task (budget {:.2f})'.format(
+        'total per task', total, args.budget
+    ))
+    if total > args.budget:
+        print('Per task overhead exceeds budget')
+        return 1
+    return 0
+
+
+def measure(function, number, repeat):
+    """Get best time of single function call in microseconds."""
+    timer = timeit.Timer(function)
+    return min(timer.repeat(repeat, number)) / number * 1e6
+
+
+def _per_task_benchmarks():
+    """Get benchmarks of costs paid for every checked file.
+
+    :returns: dict mapping name to tuple of function and number of calls
+    """
+    builder = api._init_checkers_builder()
+    file_patterns = api._compile_file_patterns(FILE_CHECKERS_CONFIG)
+    file_paths = itertools.cycle(
+        'src/module{}/file{}.{}'.format(index % 50, index, extension)
+        for index in range(1000)
+        for extension in ('py', 'js', 'php', 'rst')
+    )
+
+    def match_file():
+        api._match_file_checkers(file_patterns, next(file_paths))
+
+    def create_task():
+        builder.create_checkers_for_file('src/module/file.js',
+                                         [{'jscs': {'preset': 'google'}}],
+                                         'a' * 40)
+
+    task = builder.create_checkers_for_file('src/module/file.php',
+                                            [{'phpcs': {'standard': 'PSR2'}}],
+                                            'a' * 40)[0]
+    task.rootdir = '/tmp/repository'
+
+    small_output = 'src/module/file.py:1: [C0111] Missing docstring\n' * 5 \
+        + 'Your code has been rated at 9.50/10\n'
+    pylint_task = builder.create_checkers_for_file('src/module/file.py',
+                                                   ['pylint'])[0]
+
+    return {
+        'match file patterns': (match_file, 20000),
+        'create task': (create_task, 5000),
+        'build command': (task._build_command, 5000),
+        'create result': (
+            lambda: create_pylint_result(pylint_task, 0, small_output),
+            5000
+        )
+    }
+
+
+def _other_benchmarks():
+    """Get benchmarks of costs independent of number of checked files."""
+    patterns = ['dir{}/*.py'.format(index) for index in range(100)] + \
+        ['*.py', '*.js', 'dir1/sub/*.py']
+    pylint_output = '\n'.join(
+        'src/module/file.py:{}: [C0111] Missing docstring'.format(index)
+        for index in range(LARGE_OUTPUT_LINES)
+    ) + '\nYour code has been rated at 5.00/10 (previous run: 5.00/10, +0)\n'
+    unittest_output = '.' * LARGE_OUTPUT_LINES + \
+        '\nRan {0} tests in 1.000s\n\nOK (skipped=1)\n'.format(
+            LARGE_OUTPUT_LINES
+        )
+    phpunit_output = '.' * LARGE_OUTPUT_LINES + \
+        '\nTime: 60 ms, Memory: 3.75Mb\n\nOK (40 tests, 57 assertions)\n'
+    task = _ResultTask()
+    # typical 4KB source file
+    native_contents = b'def function(argument):\n    return argument\n' * 100
+
+    def check_hygiene():
+        for _ in range(HYGIENE_FILES):
+            for each_check in HYGIENE_CHECKS:
+                each_check(native_contents, {})
+
+    return {
+        'sort 103 file patterns': (
+            lambda: api._sort_file_patterns(patterns), 20
+        ),
+        'pylint result (50k lines)': (
+            lambda: create_pylint_result(task, 0, pylint_output), 5
+        ),
+        'unittest result (50k tests)': (
+            lambda: create_pyunittest_result(task, 0, unittest_output), 5
+        ),
+        'phpunit result (50k tests)': (
+            lambda: create_phpunit_result(task, 0, phpunit_output), 5
+        ),
+        'hygiene checks (1000 files)': (check_hygiene, 5),
+        'python syntax (4KB file)': (
+            lambda: native.check_python_syntax(native_contents, {}), 50
+        )
+    }
+
+
+class _ResultTask:
+    # pylint: disable=too-few-public-methods
+    """Minimal task accepted by result creators."""
+
+    taskname = 'benchmark'
+    config = {'accepted-code-rate': 9}
+
+
+if __name__ == '__main__':
+    sys.exit(main())
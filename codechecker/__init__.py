@@ -2,9 +2,16 @@
 
 Exports:
 
+- :func:`run` - execute checkers and yield results, see
+  :mod:`codechecker.api`
+- :mod:`codechecker.api` - run checkers from Python code
 - :mod:`codechecker.checkers` - base checker tasks and builders
 - :mod:`codechecker.scripts` - console scripts logic
 - :mod:`codechecker.git` - get git repository informations
 - :mod:`codechecker.worker` - execute checkers tasks
+- :mod:`codechecker.watch` - check files while they are edited
+- :mod:`codechecker.progress` - show progress of checkers execution
 - :mod:`codechecker.checkers_spec` - define concrete checkers
+- :mod:`codechecker.cache` - cache checkers results
 """
+from codechecker.api import run
@@ -0,0 +1,287 @@
+"""Execute checker tasks on remote agents.
+
+Agent is TCP server executing serialized file checker tasks. Task is sent
+together with checked file contents, agent writes contents to temporary
+directory and executes task there.
+
+Protocol: client connects, sends single JSON request terminated by newline
+and reads single JSON response terminated by newline.
+
+- ``{"op": "load"}`` - respond with ``{"running": n, "capacity": c}``
+- ``{"op": "run", "task": {...}, "content": "..."}`` - execute task and
+  respond with ``{"result": {...}, "running": n, "capacity": c}``,
+  content is base64 encoded zlib compressed file contents
+
+Agent executes any command it receives, so it should listen on trusted
+network only.
+
+Exports:
+
+* :func:`serialize_task` - convert task to JSON compatible dict
+* :func:`deserialize_task` - create task from dict
+* :class:`AgentServer` - agent executing tasks
+* :class:`AgentPool` - dispatch tasks to least loaded agents
+* :exc:`AgentUnavailableError` - raised when no agent can execute task
+"""
+import base64
+import json
+import os
+import socket
+import socketserver
+import tempfile
+import threading
+import zlib
+from os import path
+
+from codechecker import result_creators
+from codechecker.checker.task import (Task,
+                                      CheckResult,
+                                      create_result_by_returncode)
+
+
+CONNECT_TIMEOUT = 1.0
+
+_RESULT_CREATORS = {
+    creator.__name__: creator for creator in (
+        create_result_by_returncode,
+        result_creators.create_pylint_result,
+        result_creators.create_pyunittest_result,
+        result_creators.create_phpunit_result
+    )
+}
+
+
+class AgentUnavailableError(RuntimeError):
+    """Raised when no agent can execute task."""
+
+    pass
+
+
+def serialize_task(task):
+    """Convert file checker task to JSON compatible dict."""
+    # pylint: disable=protected-access
+    return {
+        'taskname': task.taskname,
+        'command': task._command.template,
+        'config': task.config,
+        'command_options': task.command_options,
+        'result_creator': task.result_creator.__name__,
+        'relpath': task.relpath,
+        'fingerprint': task.fingerprint,
+        'content_hash': task.content_hash,
+        'stdin': task.stdin
+    }
+
+
+def deserialize_task(data):
+    """Create file checker task from dict.
+
+    :raises: :exc:`ValueError` if result creator is unknown
+    """
+    try:
+        result_creator = _RESULT_CREATORS[data['result_creator']]
+    except KeyError:
+        raise ValueError('Unknown result creator "{}"'
+                         .format(data['result_creator']))
+    task = Task(data['taskname'], data['command'], data['config'])
+    task.command_options = data['command_options']
+    task.result_creator = result_creator
+    task.relpath = data['relpath']
+    task.fingerprint = data['fingerprint']
+    task.content_hash = data['content_hash']
+    task.stdin = bool(data.get('stdin'))
+    return task
+
+
+class AgentServer(socketserver.ThreadingTCPServer):
+    """Agent executing at most capacity tasks at once."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host='127.0.0.1', port=0, capacity=1):
+        """Bind agent to address, port 0 selects free port."""
+        super().__init__((host, port), _AgentRequestHandler)
+        self.capacity = capacity
+        self.running = 0
+        self.executed = 0
+        self._slots = threading.BoundedSemaphore(capacity)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def address(self):
+        """Agent address in host:port format."""
+        host, port = self.server_address[:2]
+        return '{}:{}'.format(host, port)
+
+    def load(self):
+        """Get current load information."""
+        with self._lock:
+            return {'running': self.running, 'capacity': self.capacity}
+
+    def execute(self, task, content):
+        """Execute task for passed file contents.
+
+        Checked file is written to temporary directory.
+
+        :raises: :exc:`ValueError` if checked file path is not relative
+        """
+        relpath = path.normpath(task.relpath)
+        if path.isabs(relpath) or relpath.split(os.sep)[0] == os.pardir:
+            raise ValueError('Invalid file path "{}"'.format(task.relpath))
+        with self._lock:
+            self.running += 1
+        try:
+            with self._slots, tempfile.TemporaryDirectory() as rootdir:
+                file_path = path.join(rootdir, task.relpath)
+                os.makedirs(path.dirname(file_path), exist_ok=True)
+                with open(file_path, 'wb') as checked_file:
+                    checked_file.write(content)
+                task.rootdir = rootdir
+                return task(content)
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.executed += 1
+
+    def start(self):
+        """Serve requests in background thread."""
+        self._thread = threading.Thread(target=self.serve_forever,
+                                        kwargs={'poll_interval': 0.1},
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop background thread and close socket."""
+        self.shutdown()
+        self.server_close()
+        self._thread.join()
+
+
+class _AgentRequestHandler(socketserver.StreamRequestHandler):
+    """Handle agent protocol request."""
+
+    def handle(self):
+        """Respond to single request."""
+        try:
+            request = json.loads(self.rfile.readline().decode('utf-8'))
+            if request['op'] == 'load':
+                response = self.server.load()
+            elif request['op'] == 'run':
+                task = deserialize_task(request['task'])
+                content = zlib.decompress(
+                    base64.b64decode(request['content'])
+                )
+                result = self.server.execute(task, content)
+                response = self.server.load()
+                response['result'] = dict(result._asdict())
+            else:
+                raise ValueError('Unknown operation')
+        except (ValueError, KeyError, TypeError, zlib.error) as error:
+            response = {'error': str(error)}
+        self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+
+
+class AgentPool:
+    """Dispatch tasks to agents.
+
+    Every task is sent to agent with lowest ratio of running tasks to
+    capacity. Agent which can not be reached is not used anymore.
+    """
+
+    def __init__(self, addresses, connect_timeout=CONNECT_TIMEOUT):
+        """Query agents load.
+
+        :param addresses: list of agents addresses in host:port format
+        """
+        self._connect_timeout = connect_timeout
+        self._lock = threading.Lock()
+        self._agents = {}
+        for each_address in addresses:
+            try:
+                load = self._request(each_address, {'op': 'load'})
+            except (OSError, ValueError):
+                continue
+            self._agents[each_address] = _AgentState(load['running'],
+                                                     load['capacity'])
+
+    @property
+    def capacity(self):
+        """Sum of capacities of available agents."""
+        with self._lock:
+            return sum(agent.capacity for agent in self._agents.values())
+
+    def execute(self, task, content):
+        """Execute task on least loaded agent.
+
+        :param content: checked file contents
+        :type content: bytes
+        :rtype: codechecker.checker.task.CheckResult
+        :raises: :exc:`AgentUnavailableError` if there is no available agent
+        """
+        request = {
+            'op': 'run',
+            'task': serialize_task(task),
+            'content': base64.b64encode(zlib.compress(content)).decode()
+        }
+        while True:
+            address = self._acquire_agent()
+            try:
+                response = self._request(address, request, timeout=None)
+            except (OSError, ValueError):
+                self._remove_agent(address)
+                continue
+            self._release_agent(address, response)
+            if 'error' in response:
+                raise AgentUnavailableError(response['error'])
+            return CheckResult(**response['result'])
+
+    def _acquire_agent(self):
+        with self._lock:
+            if not self._agents:
+                raise AgentUnavailableError('No agent is available')
+            address = min(self._agents,
+                          key=lambda each: self._agents[each].usage())
+            self._agents[address].in_flight += 1
+            return address
+
+    def _release_agent(self, address, load):
+        with self._lock:
+            agent = self._agents.get(address)
+            if agent is not None:
+                agent.in_flight -= 1
+                agent.running = load.get('running', 0)
+
+    def _remove_agent(self, address):
+        with self._lock:
+            self._agents.pop(address, None)
+
+    def _request(self, address, request, timeout=CONNECT_TIMEOUT):
+        """Send request to agent and return decoded response."""
+        host, port = address.rsplit(':', 1)
+        with socket.create_connection((host, int(port)),
+                                      self._connect_timeout) as connection:
+            connection.settimeout(timeout)
+            connection.sendall(json.dumps(request).encode('utf-8') + b'\n')
+            response = connection.makefile('rb').readline()
+        if not response:
+            raise ConnectionError('Agent {} closed connection'
+                                  .format(address))
+        return json.loads(response.decode('utf-8'))
+
+
+class _AgentState:
+    # pylint: disable=too-few-public-methods
+    """Load of agent known by client."""
+
+    def __init__(self, running, capacity):
+        self.running = running
+        self.capacity = max(capacity, 1)
+        self.in_flight = 0
+
+    def usage(self):
+        """Get estimated ratio of running tasks to capacity."""
+        # reported running tasks include tasks sent by this client
+        return max(self.running, self.in_flight) / self.capacity
@@ -0,0 +1,798 @@
+"""Run checkers from Python code.
+
+Tools embedding code-checker (editor plugins, merge bots) can execute
+checkers in-process and receive results as they complete::
+
+    import codechecker
+
+    for result in codechecker.run(paths=['module.py']):
+        print(result.taskname, result.status, result.summary)
+
+Functions must be called with repository main directory as working
+directory, like ``check-code``.
+
+Exports:
+
+* :func:`run` - execute checkers and yield results
+* :func:`prepare` - create checker tasks and execution options
+* :func:`watch` - check files continuously while they are edited
+* :func:`load_config` - read checkers configuration
+* :class:`CheckPlan` - tasks and execution options of checks run
+* :class:`PhaseTimer` - measure duration of run phases
+"""
+import collections
+import contextlib
+import fnmatch
+import hashlib
+import itertools
+import json
+import operator
+import os
+import re
+import tempfile
+import time
+
+import yaml
+
+from codechecker import git
+from codechecker import watch as watching
+from codechecker import worker
+from codechecker.agent import AgentPool
+from codechecker.cache import (LocalResultCache,
+                               RemoteResultCache,
+                               CacheChain,
+                               DEFAULT_TIMEOUT)
+from codechecker.concurrency import resolve_workers_count
+from codechecker.dependencies import (DependencyGraph,
+                                      DependencyIndex,
+                                      INDEX_FILE)
+from codechecker.checker.builder import (CheckListBuilder,
+                                         TaskCreator,
+                                         group_duplicate_tasks)
+from codechecker.checker.native import NativeTaskCreator
+from codechecker.checkers_spec import (PROJECT_CHECKERS,
+                                       FILE_CHECKERS,
+                                       NATIVE_CHECKERS)
+
+
+CONFIG_FILE = 'precommit-checkers.yml'
+LOCAL_CACHE_DIR = '.git/code-checker/cache'
+
+
+CheckPlan = collections.namedtuple('CheckPlan', 'tasks options')
+CheckPlan.__doc__ = """Tasks of checks run.
+
+tasks are :class:`codechecker.checker.task.Task` objects (list or lazy
+iterator), options are keyword arguments of
+:func:`codechecker.worker.iter_results` (cache, agents, workers_count,
+adaptive, speculative, jobserver), not configured options are None.
+"""
+
+
+def run(paths=None, config=None, revrange=None, all_files=False, jobs=None,
+        agents=None, executor=None, cancel=None, monitor=None,
+        snapshot=False):
+    """Execute checkers and yield results in order of completion.
+
+    Checked files are selected like by ``check-code``: staged files by
+    default, see :func:`prepare` for other options. Closing generator
+    stops run.
+
+    :param executor: :class:`concurrent.futures.Executor` executing tasks
+        locally, by default new process pool is created for every run,
+        passed executor is not shut down
+    :param cancel: object with ``is_set()`` method (e.g.
+        :class:`threading.Event`), when it is set queued tasks are
+        cancelled and no more results are yielded
+    :param monitor: see :class:`codechecker.worker.Monitor`
+    :rtype: iterator of :class:`codechecker.checker.task.CheckResult`
+    :raises: :exc:`ValueError` if configuration is invalid
+    """
+    # pylint: disable=too-many-arguments
+    with prepare(paths, config, revrange, all_files, jobs, agents,
+                 snapshot=snapshot) as plan:
+        options = {name: value for name, value in plan.options.items()
+                   if value is not None}
+        yield from worker.iter_results(plan.tasks, executor=executor,
+                                       cancel=cancel, monitor=monitor,
+                                       **options)
+
+
+@contextlib.contextmanager
+def prepare(paths=None, config=None, revrange=None, all_files=False,
+            jobs=None, agents=None, timer=None, snapshot=False):
+    """Create checker tasks, tasks can be executed inside context.
+
+    :param paths: paths of checked files relative to repository main
+        directory, files are checked as they are in working tree and
+        project checkers are not executed; staged files and project
+        checkers are checked if paths, revrange and all_files are not set
+    :param config: checkers configuration dict, path of YAML file or None
+        to read precommit-checkers.yml
+    :param revrange: check files changed in commits range as they are in
+        range tip, see :func:`codechecker.git.get_range_blobs`
+    :param all_files: check every file in repository, tasks are created
+        lazily
+    :param jobs: number of local workers, overrides configured one
+    :param agents: comma separated agents addresses, overrides configured
+        ones
+    :param timer: :class:`PhaseTimer` measuring preparation phases
+    :param snapshot: check staged files and project as they are in git
+        index, checkers are executed in temporary snapshot of index, see
+        :func:`codechecker.git.create_snapshot`
+    :rtype: :class:`CheckPlan`
+    :raises: :exc:`ValueError` if configuration is invalid or snapshot is
+        combined with paths, revrange or all_files
+    """
+    # pylint: disable=too-many-arguments,too-many-locals
+    if snapshot and (paths is not None or revrange or all_files):
+        raise ValueError('Only staged files can be checked in snapshot')
+    timer = timer or PhaseTimer()
+    with timer.measure('config'):
+        checkers_data = load_config(config)
+        cache = _create_cache(checkers_data.get('cache'))
+        agent_pool = _create_agent_pool(agents, checkers_data.get('agents'))
+        options = _get_concurrency_options(jobs,
+                                           checkers_data.get('concurrency'))
+        options.update(cache=cache, agents=agent_pool)
+        # streamed tasks can not be ordered by tier
+        checklist_builder = _create_checklist_builder(checkers_data,
+                                                      tiers=not all_files)
+        file_checkers = checkers_data.get('file-checkers', {})
+
+    if all_files:
+        # files are streamed, so tasks list is never built and files
+        # listing is part of execution phase
+        yield CheckPlan(itertools.chain(
+            checklist_builder.get_result(),
+            _bind_dependencies(
+                _iter_file_checkers(
+                    checklist_builder, file_checkers,
+                    timer.count_files(git.iter_tracked_files()), stdin=True
+                ),
+                cache, _list_worktree_files
+            )
+        ), options)
+    elif revrange:
+        with timer.measure('files'):
+            content_hashes = git.get_range_blobs(revrange)
+        with timer.measure('tasks'):
+            # checkers see only files checked out from range
+            checker_tasks = _select_triggered_checkers(
+                checklist_builder.get_result(), content_hashes
+            ) + list(_bind_dependencies(
+                _iter_file_checkers(checklist_builder, file_checkers,
+                                    content_hashes.items(), stdin=True),
+                cache, content_hashes.items
+            ))
+        with tempfile.TemporaryDirectory() as rootdir:
+            with timer.measure('checkout'):
+                _checkout_checked_files(checker_tasks, rootdir)
+            yield CheckPlan(
+                _sort_by_tier(group_duplicate_tasks(checker_tasks)), options
+            )
+    elif paths is not None:
+        with timer.measure('files'):
+            checked_files = git.get_worktree_files(paths)
+            content_hashes = git.hash_worktree_files(checked_files)
+        with timer.measure('tasks'):
+            checker_tasks = _sort_by_tier(group_duplicate_tasks(list(
+                _bind_dependencies(_iter_file_checkers(
+                    checklist_builder, file_checkers,
+                    [(each_file, content_hashes.get(each_file))
+                     for each_file in checked_files]
+                ), cache, _list_worktree_files)
+            )))
+        yield CheckPlan(checker_tasks, options)
+    elif snapshot:
+        with tempfile.TemporaryDirectory(prefix='code-checker-',
+                                         dir=_get_snapshot_parent()) \
+                as rootdir:
+            with timer.measure('checkout'):
+                blobs = git.create_snapshot(rootdir)
+            with timer.measure('files'):
+                # partially staged files are checked with staged contents
+                checked_files = [
+                    each_file for each_file in git.get_staged_files()
+                    if each_file in blobs
+                ] if file_checkers else []
+                index = _get_staged_index(checklist_builder, file_checkers,
+                                          checked_files)
+                project_tasks = checklist_builder.get_result()
+                if any(each_task.trigger for each_task in project_tasks):
+                    project_tasks = _select_triggered_checkers(
+                        project_tasks, git.get_staged_files(deleted=True)
+                    )
+                if project_tasks and cache is not None:
+                    _bind_project_checkers(project_tasks, blobs)
+            with timer.measure('tasks'):
+                checker_tasks = project_tasks + list(_bind_dependencies(
+                    _iter_file_checkers(
+                        checklist_builder, file_checkers,
+                        [(each_file, blobs[each_file])
+                         for each_file in checked_files],
+                        stdin=True, index=index
+                    ),
+                    cache, blobs.items
+                ))
+                for each_task in checker_tasks:
+                    each_task.rootdir = rootdir
+                    each_task.workdir = rootdir
+                checker_tasks = _sort_by_tier(
+                    group_duplicate_tasks(checker_tasks)
+                )
+            yield CheckPlan(checker_tasks, options)
+    else:
+        with timer.measure('files'):
+            checked_files = git.get_staged_files() if file_checkers else []
+            content_hashes = git.get_staged_blobs() if checked_files else {}
+            index = _get_staged_index(checklist_builder, file_checkers,
+                                      checked_files)
+            modified_files = [each_file for each_file in checked_files
+                              if each_file not in content_hashes]
+            if modified_files:
+                # checkers reading stdin check staged contents
+                content_hashes.update(git.get_index_blobs(modified_files))
+            project_tasks = checklist_builder.get_result()
+            if any(each_task.trigger for each_task in project_tasks):
+                # deleting file can break project as well as changing it
+                project_tasks = _select_triggered_checkers(
+                    project_tasks, git.get_staged_files(deleted=True)
+                )
+            if project_tasks and cache is not None:
+                _bind_project_checkers(project_tasks)
+        with timer.measure('tasks'):
+            file_tasks = list(_iter_file_checkers(
+                checklist_builder, file_checkers,
+                [(each_file, content_hashes.get(each_file))
+                 for each_file in checked_files],
+                stdin=True, index=index
+            ))
+            _unbind_modified_files(file_tasks, modified_files)
+            file_tasks = list(_bind_dependencies(file_tasks, cache,
+                                                 _list_worktree_files))
+            checker_tasks = _sort_by_tier(group_duplicate_tasks(
+                project_tasks + file_tasks
+            ))
+        yield CheckPlan(checker_tasks, options)
+
+
+def watch(config=None, jobs=None, agents=None):
+    """Check files continuously until interrupted.
+
+    See :func:`codechecker.watch.watch`, results are stored in configured
+    results cache or local cache if cache is not configured.
+    """
+    checkers_data = load_config(config)
+    cache = _create_cache(checkers_data.get('cache')) or \
+        LocalResultCache(git.abspath(LOCAL_CACHE_DIR))
+    options = _get_concurrency_options(jobs, checkers_data.get('concurrency'))
+    options['agents'] = _create_agent_pool(agents,
+                                           checkers_data.get('agents'))
+    checklist_builder = _create_checklist_builder(checkers_data, tiers=False)
+    file_checkers = checkers_data.get('file-checkers', {})
+    return watching.watch(
+        lambda checked_files: _create_watched_tasks(
+            checklist_builder, file_checkers, checked_files, cache
+        ),
+        cache,
+        **{name: value for name, value in options.items()
+           if value is not None}
+    )
+
+
+def load_config(config=None):
+    """Load and validate checkers configuration.
+
+    :param config: configuration dict, path of YAML file or None to read
+        precommit-checkers.yml
+    :rtype: dict
+    :raises: :exc:`ValueError` if configuration contains invalid option
+    """
+    if config is None:
+        config = CONFIG_FILE
+    if isinstance(config, str):
+        with open(config, 'r') as checkers_file:
+            config = yaml.safe_load(checkers_file) or {}
+    _validate_checkers_data(config)
+    return config
+
+
+def _create_checklist_builder(checkers_data, tiers=True):
+    """Create builder containing configured project checkers.
+
+    :param tiers: if false, configured tiers are ignored and every task is
+        in first tier
+    """
+    checklist_builder = _init_checkers_builder()
+    if 'config' in checkers_data:
+        _set_checkers_config(checklist_builder, checkers_data['config'])
+    if tiers and 'tiers' in checkers_data:
+        _set_checkers_tiers(checklist_builder, checkers_data['tiers'])
+    if 'project-checkers' in checkers_data:
+        _create_project_checkers(checklist_builder,
+                                 checkers_data['project-checkers'])
+    return checklist_builder
+
+
+def _init_checkers_builder():
+    project_chekcers = {}
+    for each_checker in PROJECT_CHECKERS:
+        project_chekcers[each_checker] = TaskCreator(
+            each_checker,
+            **PROJECT_CHECKERS[each_checker]
+        )
+    file_checkers = {}
+    for each_checker in FILE_CHECKERS:
+        file_checkers[each_checker] = TaskCreator(
+            each_checker,
+            **FILE_CHECKERS[each_checker]
+        )
+    for each_checker in NATIVE_CHECKERS:
+        file_checkers[each_checker] = NativeTaskCreator(
+            each_checker,
+            **NATIVE_CHECKERS[each_checker]
+        )
+    checklist_builder = CheckListBuilder(
+        project_chekcers,
+        file_checkers
+    )
+    return checklist_builder
+
+
+def _validate_checkers_data(checkers_data):
+    """Check if precommit-checkers.yml contains valid options only."""
+    for each_option in checkers_data:
+        if each_option not in ('config', 'project-checkers', 'file-checkers',
+                               'cache', 'agents', 'concurrency', 'tiers'):
+            raise ValueError('precommit-checkers.yml contains'
+                             ' invalid option "{}"'.format(each_option))
+
+
+def _create_cache(cache_config):
+    """Create results cache.
+
+    If "local" option of "cache" section is true, results are cached in
+    .git/code-checker/cache directory.
+
+    Remote cache url is taken from CODECHECKER_CACHE_URL environment variable
+    or "url" option. Results are stored in remote cache only if "push" option
+    is set or CODECHECKER_CACHE_PUSH environment variable is set to true
+    value (usually on CI).
+
+    :returns: cache or None if cache is not configured
+    """
+    cache_config = dict(cache_config or {})
+    for each_option in cache_config:
+        if each_option not in ('local', 'url', 'timeout', 'push'):
+            raise ValueError('"{}" is not valid cache option'
+                             .format(each_option))
+    caches = []
+    if cache_config.get('local'):
+        caches.append(LocalResultCache(git.abspath(LOCAL_CACHE_DIR)))
+    url = os.environ.get('CODECHECKER_CACHE_URL', cache_config.get('url'))
+    if url:
+        push = cache_config.get('push', False)
+        if 'CODECHECKER_CACHE_PUSH' in os.environ:
+            push = os.environ['CODECHECKER_CACHE_PUSH'].lower() \
+                not in ('', '0', 'false', 'no')
+        timeout = float(cache_config.get('timeout', DEFAULT_TIMEOUT))
+        caches.append(RemoteResultCache(url, timeout, push))
+    if not caches:
+        return None
+    if len(caches) == 1:
+        return caches[0]
+    return CacheChain(caches)
+
+
+def _create_agent_pool(cli_addresses, configured_addresses):
+    """Connect to agents executing file checkers.
+
+    Agents addresses are taken from command line, CODECHECKER_AGENTS
+    environment variable or "agents" section, in that order.
+
+    :returns: agent pool or None if agents are not configured
+    """
+    addresses = cli_addresses or os.environ.get('CODECHECKER_AGENTS')
+    if addresses:
+        addresses = [each.strip() for each in addresses.split(',')
+                     if each.strip()]
+    else:
+        addresses = configured_addresses
+    if isinstance(addresses, str):
+        addresses = [addresses]
+    if not addresses:
+        return None
+    return AgentPool(addresses)
+
+
+def _get_concurrency_options(cli_jobs, concurrency_config):
+    """Get options of checkers execution concurrency.
+
+    Number of jobs is taken from command line, CODECHECKER_JOBS environment
+    variable or "jobs" option of "concurrency" section. If "adaptive" option
+    is false, number of jobs is not reduced when system is loaded. If
+    "speculative" option is true, tasks of later tiers are started while
+    earlier tiers are running. If "jobserver" option is true, checkers
+    share worker slots through jobserver passed in MAKEFLAGS.
+    """
+    concurrency_config = dict(concurrency_config or {})
+    for each_option in concurrency_config:
+        if each_option not in ('jobs', 'adaptive', 'speculative',
+                               'jobserver'):
+            raise ValueError('"{}" is not valid concurrency option'
+                             .format(each_option))
+    return {
+        'workers_count': resolve_workers_count(
+            cli_jobs, concurrency_config.get('jobs')
+        ),
+        'adaptive': concurrency_config.get('adaptive'),
+        'speculative': concurrency_config.get('speculative'),
+        'jobserver': concurrency_config.get('jobserver')
+    }
+
+
+def _set_checkers_config(checklist_builder, config):
+    """Configure checker factories."""
+    for each_checker, each_conf in list(config.items()):
+        checklist_builder.configure_checker(each_checker, each_conf)
+
+
+def _set_checkers_tiers(checklist_builder, tiers):
+    """Assign checkers to pipeline tiers.
+
+    :param tiers: list of lists of checkers names, checkers which are not
+        listed are in first tier
+    """
+    if not isinstance(tiers, list):
+        raise ValueError('"tiers" must be list of checkers lists')
+    for tier, checkers in enumerate(tiers):
+        if isinstance(checkers, str):
+            checkers = [checkers]
+        for each_checker in checkers:
+            checklist_builder.set_checker_tier(each_checker, tier)
+
+
+def _sort_by_tier(checker_tasks):
+    """Order tasks by tier, tasks of one tier keep their order."""
+    return sorted(checker_tasks, key=operator.attrgetter('tier'))
+
+
+def _create_project_checkers(checklist_builder, checkers):
+    """Create project checkers."""
+    if isinstance(checkers, str):
+        checkers = [checkers]
+    for each_checker in checkers:
+        checklist_builder.add_project_checker(each_checker)
+
+
+def _iter_file_checkers(checklist_builder, checkers, checked_files,
+                        stdin=False, index=None):
+    """Create file checkers for files matching configured patterns.
+
+    Checkers are created lazily, one file at a time.
+
+    :param checked_files: iterable of tuples of file path and blob id of
+        checked contents, tasks bound to blob ids can be cached
+    :param stdin: blobs are stored in git, checkers supporting stdin read
+        them instead of checked files
+    :param index: dict mapping staged files to
+        :class:`codechecker.git.IndexEntry`, checkers skip files (e.g.
+        binary ones) before tasks are created
+    """
+    file_patterns = _compile_file_patterns(checkers)
+    for each_file, content_hash in checked_files:
+        checkers_list = _match_file_checkers(file_patterns, each_file)
+        if checkers_list:
+            yield from checklist_builder.create_checkers_for_file(
+                each_file, checkers_list, content_hash, stdin,
+                index.get(each_file) if index else None
+            )
+
+
+def _get_staged_index(checklist_builder, checkers, checked_files):
+    """Get index entries of files matching configured patterns.
+
+    Contents of blobs larger than size limits of all checkers of their file
+    are not read.
+
+    :returns: dict mapping file paths to :class:`codechecker.git.IndexEntry`
+    """
+    file_patterns = _compile_file_patterns(checkers)
+    size_limits = {}
+    for each_file in checked_files:
+        checkers_list = _match_file_checkers(file_patterns, each_file)
+        if checkers_list:
+            size_limits[each_file] = \
+                checklist_builder.get_size_limit(checkers_list)
+    if not size_limits:
+        return {}
+    return git.get_staged_index(size_limits, size_limits)
+
+
+def _unbind_modified_files(file_tasks, modified_files):
+    """Do not cache results of tasks checking files with unstaged changes.
+
+    Tasks reading staged contents from stdin stay bound to staged blobs,
+    other tasks check working tree contents which have no blob id.
+    """
+    if not modified_files:
+        return
+    modified_files = set(modified_files)
+    for each_task in file_tasks:
+        if each_task.relpath in modified_files and not each_task.stdin:
+            each_task.content_hash = None
+
+
+def _bind_dependencies(file_tasks, cache, list_files, read_blob=None):
+    """Bind tasks of cross-file checkers to digest of imported files.
+
+    Tasks are passed through lazily, visible files are listed and
+    dependency index is loaded when first cross-file task is found.
+    Nothing is bound if results are not cached.
+
+    :param list_files: function returning iterable of tuples of file path
+        and blob id of files visible to checkers
+    :param read_blob: function returning contents of blob, see
+        :class:`codechecker.dependencies.DependencyIndex`
+    """
+    if cache is None:
+        yield from file_tasks
+        return
+    index = None
+    graph = None
+    try:
+        for each_task in file_tasks:
+            if each_task.cross_file and each_task.content_hash:
+                if graph is None:
+                    index = DependencyIndex(git.abspath(INDEX_FILE),
+                                            read_blob)
+                    graph = DependencyGraph(list_files(), index)
+                each_task.dependencies_hash = graph.digest(
+                    each_task.relpath, each_task.content_hash
+                )
+            yield each_task
+    finally:
+        if index is not None:
+            index.save()
+
+
+def _create_watched_tasks(checklist_builder, checkers, checked_files,
+                          cache):
+    """Create tasks checking working tree contents of changed files.
+
+    Tasks of cross-file checkers are bound to imported files. Blobs of
+    checked files are hashed but not stored in git, so their contents are
+    read from working tree.
+
+    :param checked_files: iterable of tuples of file path and blob id of
+        working tree contents
+    :returns: list of tasks
+    """
+    checked_files = list(checked_files)
+    worktree_blobs = {blob_id: each_file
+                      for each_file, blob_id in checked_files if blob_id}
+
+    def list_files():
+        files = dict(_list_worktree_files())
+        files.update((each_file, blob_id)
+                     for blob_id, each_file in worktree_blobs.items())
+        return files.items()
+
+    def read_blob(blob_id):
+        file_relpath = worktree_blobs.get(blob_id)
+        if file_relpath is None:
+            return git.get_shared_blob_reader().read(blob_id)
+        with open(file_relpath, 'rb') as checked_file:
+            return checked_file.read()
+
+    return list(_bind_dependencies(
+        _iter_file_checkers(checklist_builder, checkers, checked_files),
+        cache, list_files, read_blob
+    ))
+
+
+def _list_worktree_files():
+    """List files visible to checkers executed in working tree.
+
+    Contents of untracked files and files with unstaged changes are not
+    known, their blob ids are None.
+    """
+    return itertools.chain(
+        git.iter_tracked_files(),
+        ((each_file, None) for each_file in git.get_untracked_files())
+    )
+
+
+def _compile_file_patterns(checkers):
+    """Compile file patterns.
+
+    :returns: list of tuples of compiled pattern and checkers list, more
+        specific patterns first
+    """
+    file_patterns = []
+    for path_pattern in _sort_file_patterns(list(checkers.keys())):
+        checkers_list = checkers[path_pattern]
+        if isinstance(checkers_list, str):
+            checkers_list = [checkers_list]
+        compiled_pattern = re.compile(fnmatch.translate(path_pattern))
+        file_patterns.append((compiled_pattern, checkers_list))
+    return file_patterns
+
+
+def _match_file_checkers(file_patterns, file_path):
+    """Get checkers of most specific pattern matching file.
+
+    :returns: checkers list or None if file does not match any pattern
+    """
+    for compiled_pattern, checkers_list in file_patterns:
+        if compiled_pattern.match(file_path):
+            return checkers_list
+    return None
+
+
+def _select_triggered_checkers(project_tasks, checked_files):
+    """Drop project checkers which trigger matches none of checked files.
+
+    Triggers are matched like file checkers patterns, checkers without
+    trigger are always kept.
+    """
+    checked_files = list(checked_files)
+    selected_tasks = []
+    for each_task in project_tasks:
+        if each_task.trigger:
+            trigger_patterns = _compile_file_patterns(
+                dict.fromkeys(each_task.trigger, [each_task.checkername])
+            )
+            if not any(_match_file_checkers(trigger_patterns, each_file)
+                       for each_file in checked_files):
+                continue
+        selected_tasks.append(each_task)
+    return selected_tasks
+
+
+def _bind_project_checkers(project_tasks, snapshot_blobs=None):
+    """Bind project checkers to checked contents, so results can be cached.
+
+    Tasks declaring inputs are bound to digest of staged contents of
+    matching files, other tasks to staged tree. Results are not cached
+    (content_hash stays None) if checked files have unstaged changes or
+    untracked files could be read by checker.
+
+    :param snapshot_blobs: blobs of index snapshot checkers are executed
+        in (see :func:`codechecker.git.create_snapshot`), working tree
+        changes are not checked then
+    """
+    tree_tasks = [each_task for each_task in project_tasks
+                  if not each_task.inputs]
+    if tree_tasks:
+        if snapshot_blobs is None:
+            tree_id = git.get_staged_tree()
+        else:
+            tree_id = git.write_tree()
+        for each_task in tree_tasks:
+            each_task.content_hash = tree_id
+    input_tasks = [each_task for each_task in project_tasks
+                   if each_task.inputs]
+    if input_tasks:
+        if snapshot_blobs is None:
+            tracked_files = list(git.iter_tracked_files())
+            untracked_files = git.get_untracked_files()
+        else:
+            tracked_files = list(snapshot_blobs.items())
+            untracked_files = []
+        for each_task in input_tasks:
+            each_task.content_hash = _hash_inputs(
+                each_task.inputs, tracked_files, untracked_files
+            )
+
+
+def _hash_inputs(inputs, tracked_files, untracked_files):
+    """Compute digest of staged contents of files matching input patterns.
+
+    :param tracked_files: list of tuples of file path and blob id, see
+        :func:`codechecker.git.iter_tracked_files`
+    :returns: hex digest or None if some matching file is untracked or has
+        unstaged changes
+    """
+    compiled_inputs = [re.compile(fnmatch.translate(each_pattern))
+                       for each_pattern in inputs]
+
+    def is_input(file_relpath):
+        return any(each_pattern.match(file_relpath)
+                   for each_pattern in compiled_inputs)
+
+    if any(is_input(each_file) for each_file in untracked_files):
+        return None
+    digest = hashlib.sha1('\0'.join(inputs).encode('utf-8'))
+    for file_relpath, blob_id in tracked_files:
+        if not is_input(file_relpath):
+            continue
+        if blob_id is None:
+            return None
+        digest.update('\0{}\0{}'.format(file_relpath, blob_id)
+                      .encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _get_snapshot_parent():
+    """Get directory of index snapshots, memory backed if available."""
+    if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK):
+        return '/dev/shm'
+    return None
+
+
+def _checkout_checked_files(checker_tasks, rootdir):
+    """Write checked blobs to directory and point file checkers to it.
+
+    Blobs checked only by tasks reading stdin are not written.
+    """
+    blobs = {}
+    for each_task in checker_tasks:
+        if each_task.relpath is not None:
+            if not each_task.stdin:
+                blobs[each_task.relpath] = each_task.content_hash
+            each_task.rootdir = rootdir
+    git.checkout_blobs(blobs, rootdir)
+
+
+class PhaseTimer:
+    """Measure duration of run phases and number of listed files."""
+
+    def __init__(self):
+        self.durations = collections.OrderedDict()
+        self.files_count = 0
+        self._start_time = time.monotonic()
+
+    @contextlib.contextmanager
+    def measure(self, phase):
+        """Measure duration of code executed in context."""
+        start_time = time.monotonic()
+        try:
+            yield
+        finally:
+            self.durations[phase] = time.monotonic() - start_time
+
+    def count_files(self, files):
+        """Count files passing through."""
+        for each_file in files:
+            self.files_count += 1
+            yield each_file
+
+    def elapsed(self):
+        """Get seconds since timer was created."""
+        return time.monotonic() - self._start_time
+
+    def report(self, verbose, json_path):
+        """Print durations and/or write them to JSON file."""
+        durations = collections.OrderedDict(self.durations)
+        durations['total'] = self.elapsed()
+        if verbose:
+            print('Phases: {}'.format(', '.join(
+                '{} {:.2f}s'.format(phase, duration)
+                for phase, duration in durations.items()
+            )))
+        if json_path:
+            with open(json_path, 'w') as json_file:
+                json.dump(durations, json_file, indent=2)
+
+
+def _sort_file_patterns(pattern_list):
+    """Sort file patterns.
+
+    Sort file patterns so that more specific patterns are before more generic
+    patterns. For example if we have patterns ['*.py', 'tests/*.py'] result
+    should be ['tests/*.py', '*.py']
+    """
+    patterns_sorted = []
+    for pattern_to_insert in pattern_list:
+        for index, pattern_inserted in enumerate(patterns_sorted):
+            if fnmatch.fnmatch(pattern_to_insert, pattern_inserted):
+                # more generic pattern is already inserted into result list
+                # so pattern_to_insert must by inserted before
+                patterns_sorted.insert(index, pattern_to_insert)
+                break
+        else:
+            # there is not more generic patterns in result list
+            patterns_sorted.append(pattern_to_insert)
+    return patterns_sorted
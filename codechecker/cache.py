@@ -0,0 +1,312 @@
+"""Cache checkers results.
+
+Results are stored in content addressed cache, in local directory or
+accessible over HTTP, so results computed once (for example by CI on main
+branch) are reused by pre-commit hooks. Cache key depends on checker
+command, checker config, checked file path and checked file blob id, or
+checked tree id for project checkers. Keys of cross-file checkers contain
+digest of files imported by checked file.
+
+HTTP cache protocol:
+
+- ``GET <url>/results/<key>`` - respond with stored result or 404 status
+- ``PUT <url>/results/<key>`` - store result
+
+Result payload is zlib compressed JSON object containing
+:class:`codechecker.checker.task.CheckResult` fields.
+
+Exports:
+
+* :func:`result_key` - compute cache key of task
+* :func:`encode_result` - serialize check result to payload
+* :func:`decode_result` - deserialize check result from payload
+* :class:`LocalResultCache` - cache stored in local directory
+* :class:`RemoteResultCache` - HTTP cache client
+* :class:`CacheChain` - use several caches at once
+* :class:`CacheServer` - reference in-memory cache server
+"""
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import zlib
+from http.client import HTTPException
+from http.server import (BaseHTTPRequestHandler,
+                         ThreadingHTTPServer)
+from urllib.error import HTTPError
+from urllib.request import (Request,
+                            urlopen)
+
+from codechecker.checker.task import CheckResult
+
+
+CACHE_VERSION = '1'
+DEFAULT_TIMEOUT = 0.5
+PAYLOAD_CONTENT_TYPE = 'application/x-codechecker-result'
+
+
+def result_key(task):
+    """Compute cache key of task result.
+
+    :returns: hex digest or None if task result can not be cached
+    :rtype: string
+    """
+    if not (task.fingerprint and task.content_hash):
+        return None
+    key_parts = [CACHE_VERSION, task.fingerprint, task.relpath or '',
+                 task.content_hash]
+    if task.cross_file:
+        if task.dependencies_hash is None:
+            return None
+        key_parts.append(task.dependencies_hash)
+    key_data = '\0'.join(key_parts)
+    return hashlib.sha256(key_data.encode('utf-8')).hexdigest()
+
+
+def encode_result(result):
+    """Serialize check result to compressed payload.
+
+    :type result: codechecker.checker.task.CheckResult
+    :rtype: bytes
+    """
+    data = json.dumps(dict(result._asdict()))
+    return zlib.compress(data.encode('utf-8'))
+
+
+def decode_result(payload):
+    """Deserialize check result from compressed payload.
+
+    :rtype: codechecker.checker.task.CheckResult
+    :raises: :exc:`ValueError` if payload is invalid
+    """
+    try:
+        data = json.loads(zlib.decompress(payload).decode('utf-8'))
+        return CheckResult(data['taskname'], data['status'],
+                           data['summary'], data['message'])
+    except (zlib.error, UnicodeDecodeError, TypeError, KeyError) as error:
+        raise ValueError('Invalid result payload') from error
+
+
+class LocalResultCache:
+    """Cache storing results in local directory."""
+
+    def __init__(self, directory):
+        """Set cache directory, it is created on first write."""
+        self._directory = directory
+
+    def get(self, task):
+        """Return cached result of task or None if result is not cached."""
+        key = result_key(task)
+        if key is None:
+            return None
+        try:
+            with open(self._result_path(key), 'rb') as result_file:
+                return decode_result(result_file.read())
+        except (OSError, ValueError):
+            return None
+
+    def put(self, task, result):
+        """Store task result."""
+        key = result_key(task)
+        if key is None:
+            return
+        result_path = self._result_path(key)
+        temp_path = '{}.{}.tmp'.format(result_path, os.getpid())
+        try:
+            os.makedirs(os.path.dirname(result_path), exist_ok=True)
+            with open(temp_path, 'wb') as result_file:
+                result_file.write(encode_result(result))
+            os.replace(temp_path, result_path)
+        except OSError as error:
+            print('Result can not be cached: {}'.format(error),
+                  file=sys.stderr)
+
+    def _result_path(self, key):
+        return os.path.join(self._directory, key[:2], key)
+
+
+class RemoteResultCache:
+    """Client of HTTP results cache.
+
+    Cache failures never break checking. If cache is slow or unavailable
+    client stops sending requests and checkers are executed locally.
+    Client can be used by several threads.
+    """
+
+    def __init__(self, url, timeout=DEFAULT_TIMEOUT, push=False):
+        """Set cache location.
+
+        :param url: cache server base url
+        :param timeout: timeout of every request in seconds
+        :param push: if true computed results are stored in cache
+        """
+        self._url = url.rstrip('/')
+        self._timeout = timeout
+        self._push = push
+        self.is_available = True
+        self._lock = threading.Lock()
+
+    def get(self, task):
+        """Return cached result of task or None if result is not cached."""
+        key = result_key(task)
+        if key is None or not self.is_available:
+            return None
+        try:
+            with urlopen(self._result_url(key),
+                         timeout=self._timeout) as response:
+                payload = response.read()
+            return decode_result(payload)
+        except HTTPError as error:
+            if error.code != 404:
+                self._disable(error)
+        except (OSError, HTTPException, ValueError) as error:
+            self._disable(error)
+        return None
+
+    def put(self, task, result):
+        """Store task result if cache is writable."""
+        key = result_key(task)
+        if key is None or not (self._push and self.is_available):
+            return
+        request = Request(self._result_url(key), data=encode_result(result),
+                          headers={'Content-Type': PAYLOAD_CONTENT_TYPE},
+                          method='PUT')
+        try:
+            urlopen(request, timeout=self._timeout).close()
+        except (OSError, HTTPException) as error:
+            self._disable(error)
+
+    def _result_url(self, key):
+        return '{}/results/{}'.format(self._url, key)
+
+    def _disable(self, error):
+        """Stop using cache for rest of run."""
+        with self._lock:
+            if not self.is_available:
+                # other request failed meanwhile
+                return
+            self.is_available = False
+        print('Results cache {} is unavailable ({}), checkers are executed'
+              ' locally'.format(self._url, error), file=sys.stderr)
+
+
+class CacheChain:
+    """Use several caches, ordered from fastest to slowest.
+
+    Result found in slower cache is stored in faster caches.
+    """
+
+    def __init__(self, caches):
+        """Set caches."""
+        self._caches = caches
+
+    def get(self, task):
+        """Return result from first cache containing it."""
+        for index, each_cache in enumerate(self._caches):
+            result = each_cache.get(task)
+            if result is not None:
+                for faster_cache in self._caches[:index]:
+                    faster_cache.put(task, result)
+                return result
+        return None
+
+    def put(self, task, result):
+        """Store result in every cache."""
+        for each_cache in self._caches:
+            each_cache.put(task, result)
+
+
+class CacheServer(ThreadingHTTPServer):
+    """Reference results cache server keeping results in memory.
+
+    Intended for tests and local experiments::
+
+        server = CacheServer().start()
+        cache = RemoteResultCache(server.url, push=True)
+        ...
+        server.stop()
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=0):
+        """Bind server to address, port 0 selects free port."""
+        super().__init__((host, port), _CacheRequestHandler)
+        self.results = {}
+        self.results_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        """Base url of server."""
+        host, port = self.server_address[:2]
+        return 'http://{}:{}'.format(host, port)
+
+    def start(self):
+        """Serve requests in background thread."""
+        self._thread = threading.Thread(target=self.serve_forever,
+                                        kwargs={'poll_interval': 0.1},
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop background thread and close socket."""
+        self.shutdown()
+        self.server_close()
+        self._thread.join()
+
+
+class _CacheRequestHandler(BaseHTTPRequestHandler):
+    """Handle results cache protocol requests."""
+
+    _RE_RESULT_PATH = re.compile(r'^/results/([0-9a-f]{64})$')
+
+    def do_GET(self):
+        # pylint: disable=invalid-name
+        """Respond with stored result."""
+        key = self._get_key()
+        if key is None:
+            return
+        with self.server.results_lock:
+            payload = self.server.results.get(key)
+        if payload is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', PAYLOAD_CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_PUT(self):
+        # pylint: disable=invalid-name
+        """Store result."""
+        key = self._get_key()
+        if key is None:
+            return
+        length = int(self.headers.get('Content-Length', 0))
+        payload = self.rfile.read(length)
+        try:
+            decode_result(payload)
+        except ValueError:
+            self.send_error(400, 'Invalid result payload')
+            return
+        with self.server.results_lock:
+            self.server.results[key] = payload
+        self.send_response(201)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *_):
+        """Do not log requests."""
+        pass
+
+    def _get_key(self):
+        match = self._RE_RESULT_PATH.match(self.path)
+        if not match:
+            self.send_error(404)
+            return None
+        return match.group(1)
@@ -7,6 +7,10 @@ Classes:
 - :class:`ExitCodeFileCheckerFactory`: Create exit code checker for
    specified file
 
+Functions:
+
+- :func:`group_duplicate_tasks`: Execute identical tasks once
+
 Exceptions:
 
 - :exc:`InvalidCheckerError`
@@ -14,10 +18,38 @@ Exceptions:
 """
 
 import copy
+import hashlib
+import json
+from collections import namedtuple
 from string import Template
 
-from codechecker.checker.task import Task
-from codechecker import git
+from codechecker.checker.task import (Task,
+                                      ArgvTemplate)
+
+
+# Options accepted by every checker, they control tasks execution
+EXECUTION_OPTIONS = {
+    # number of worker slots consumed by task
+    'weight': 1,
+    # max number of tasks of checker executed at once
+    'max-parallel': None,
+    # glob patterns of files read by project checker, its result is reused
+    # while contents of matching files do not change
+    'inputs': None,
+    # glob patterns, project checker runs only if some checked file matches
+    'trigger': None,
+    # checker supporting stdin reads staged blob instead of checked file
+    'stdin': True,
+    # staged files skipped before tasks are created, see
+    # codechecker.git.IndexEntry
+    'skip-binary': True,
+    'skip-generated': True,
+    'skip-symlinks': True,
+    # staged files larger than this number of bytes are skipped
+    'skip-larger-than': None
+}
+_BOOLEAN_OPTIONS = ('stdin', 'skip-binary', 'skip-generated',
+                    'skip-symlinks')
 
 
 class CheckListBuilder:
@@ -27,7 +59,10 @@ class CheckListBuilder:
 
     - :meth:`add_project_checker`
     - :meth:`add_checkers_for_file`: Add all checkers for specified file
+    - :meth:`create_checkers_for_file`: Create all checkers for specified file
     - :meth:`configure_checker`: Change checker global configuration
+    - :meth:`set_checker_tier`: Set pipeline tier of checker tasks
+    - :meth:`get_size_limit`: Get max size of file checked by checkers
     - :meth:`get_result`: Get prepared list of checkers
     """
 
@@ -62,15 +97,67 @@ class CheckListBuilder:
         checker = creator.create()
         self._checker_tasks.append(checker)
 
-    def add_checkers_for_file(self, file_path, checkers_list):
+    def add_checkers_for_file(self, file_path, checkers_list,
+                              content_hash=None, stdin=False,
+                              index_entry=None):
         """Create specified checkers for given file.
 
+        :param content_hash: git blob id of checked file contents, if given
+            tasks results can be cached
+        :param stdin: blob content_hash is stored in git, checkers
+            supporting stdin read it instead of checked file
+        :param index_entry: :class:`codechecker.git.IndexEntry` of staged
+            file, checkers skipping file (see :meth:`TaskCreator.accepts`)
+            are not created
+        :raises: :exc:`InvalidCheckerError` If factory for specified checker
+            name not found
+        """
+        # pylint: disable=too-many-arguments
+        self._checker_tasks.extend(
+            self.create_checkers_for_file(file_path, checkers_list,
+                                          content_hash, stdin, index_entry)
+        )
+
+    def create_checkers_for_file(self, file_path, checkers_list,
+                                 content_hash=None, stdin=False,
+                                 index_entry=None):
+        """Create specified checkers for given file without adding them.
+
+        Allows to stream checkers for large number of files.
+
+        :raises: :exc:`InvalidCheckerError` If factory for specified checker
+            name not found
+        """
+        # pylint: disable=too-many-arguments
+        tasks = []
+        for checker_data in checkers_list:
+            task = self._create_file_checker(checker_data, file_path,
+                                             content_hash, stdin, index_entry)
+            if task is not None:
+                tasks.append(task)
+        return tasks
+
+    def get_size_limit(self, checkers_list):
+        """Get max size of file checked by any of specified checkers.
+
+        :returns: size in bytes or None if size is not limited
         :raises: :exc:`InvalidCheckerError` If factory for specified checker
             name not found
         """
-        checkers = [self._create_file_checker(checker_data, file_path)
-                    for checker_data in checkers_list]
-        self._checker_tasks.extend(checkers)
+        size_limits = []
+        for checker_data in checkers_list:
+            if isinstance(checker_data, dict):
+                checkername = next(iter(checker_data))
+                config = checker_data[checkername]
+            else:
+                checkername = checker_data
+                config = None
+            factory = self._get_filechecker_factory(checkername)
+            size_limit = factory.get_size_limit(config)
+            if size_limit is None:
+                return None
+            size_limits.append(size_limit)
+        return max(size_limits, default=None)
 
     def configure_checker(self, name, config):
         """Change global checker.
@@ -87,19 +174,38 @@ class CheckListBuilder:
                                       'Checker "{}" is invalid'.format(name))
         checker.set_config(config)
 
+    def set_checker_tier(self, name, tier):
+        """Set pipeline tier of tasks created by checker.
+
+        :raises: :exc:`InvalidCheckerError` If factory for specified checker
+            name not found
+        """
+        if name in self._projectchecker_factories:
+            checker = self._projectchecker_factories[name]
+        elif name in self._filecheckers_factories:
+            checker = self._filecheckers_factories[name]
+        else:
+            raise InvalidCheckerError('Can not set tier of checker. '
+                                      'Checker "{}" is invalid'.format(name))
+        checker.tier = tier
+
     def get_result(self):
         """Return built checkers list."""
         return self._checker_tasks
 
-    def _create_file_checker(self, checker_data, file_path):
+    def _create_file_checker(self, checker_data, file_path,
+                             content_hash=None, stdin=False,
+                             index_entry=None):
         """Create file checker.
 
         checker_data should be checker name or dict. If checker_data is dict
         then its key is checker name and value is checker config.
 
+        :returns: task or None if checker skips file
         :raises: :exc:`InvalidCheckerError` If factory for specified checker
             name not found
         """
+        # pylint: disable=too-many-arguments
         if isinstance(checker_data, dict):
             checkername = next(iter(checker_data))
             config = checker_data[checkername]
@@ -107,7 +213,10 @@ class CheckListBuilder:
             checkername = checker_data
             config = None
         factory = self._get_filechecker_factory(checkername)
-        return factory.create(file_path, config)
+        if index_entry is not None and \
+                not factory.accepts(index_entry, config):
+            return None
+        return factory.create(file_path, config, content_hash, stdin)
 
     def _get_filechecker_factory(self, checkername):
         """Get factory for file checker.
@@ -127,32 +236,120 @@ class TaskCreator:
     """Create :class:`codechecker.checker.task.Task` objects."""
 
     def __init__(self, checkername, taskname, command, defaultconfig=None,
-                 command_options=None, result_creator=None):
-        """Set checker data."""
+                 command_options=None, result_creator=None,
+                 stdin_command=None, jobs_option=None, cross_file=False,
+                 path_independent=False):
+        """Set checker data.
+
+        :param stdin_command: command reading checked contents from stdin,
+            used for files which contents are stored in git
+        :param jobs_option: option passing number of granted worker slots
+            (``${jobs}``) to checker parallelizing itself
+        :param cross_file: checker results depend on files imported by
+            checked file
+        :param path_independent: checker results do not depend on path of
+            checked file, so tasks checking identical contents are grouped
+            (see :func:`group_duplicate_tasks`); True, or tuple of config
+            options, checker is path independent when all of them are set
+            (e.g. config file is given explicitly instead of being looked up
+            next to checked file)
+        """
         # pylint: disable=too-many-arguments
         self._checkername = checkername
         self._taskname = Template(taskname)
         self._command = Template(command)
+        self._stdin_command = stdin_command
+        self._jobs_option = jobs_option
+        self._cross_file = cross_file
+        self._path_independent = path_independent
+        # default config can override defaults of execution options
+        defaultconfig, execution_options = self._split_config(defaultconfig)
         self.config = defaultconfig if defaultconfig else {}
+        self.execution_options = dict(EXECUTION_OPTIONS,
+                                      **execution_options)
+        self.tier = 0
         self._command_options = command_options
         self._result_creator = result_creator
+        self._compiled = {}
 
-    def create(self, relpath=None, config=None):
-        """Create Task for specified file."""
-        config = self._mix_config(config)
+    def create(self, relpath=None, config=None, content_hash=None,
+               stdin=False):
+        """Create Task for specified file.
+
+        :param stdin: blob content_hash is stored in git, if checker
+            supports stdin task reads blob instead of checked file
+        """
+        compiled = self._compile(config)
         if relpath:
-            abspath = git.abspath(relpath)
-            command = self._command.safe_substitute(file_abspath=abspath)
             taskname = self._taskname.substitute(file_relpath=relpath)
         else:
             taskname = self._taskname.template
-            command = self._command.template
 
-        task = Task(taskname, command, config)
+        task = self._new_task(
+            taskname, compiled,
+            bool(stdin and relpath and content_hash and
+                 compiled.execution_options['stdin'])
+        )
         if self._command_options:
             task.command_options = self._command_options
         if self._result_creator:
             task.result_creator = self._result_creator
+        task.fingerprint = compiled.fingerprint
+        task.relpath = relpath
+        task.content_hash = content_hash
+        task.checkername = self._checkername
+        task.cross_file = self._cross_file
+        task.path_independent = compiled.path_independent
+        task.tier = self.tier
+        task.weight = compiled.execution_options['weight']
+        task.max_parallel = compiled.execution_options['max-parallel']
+        task.inputs = compiled.execution_options['inputs']
+        task.trigger = compiled.execution_options['trigger']
+        return task
+
+    def accepts(self, index_entry, config=None):
+        """Check that checker does not skip staged file.
+
+        Symbolic links, binary files, generated files and files larger than
+        limit are skipped unless execution options allow them.
+
+        :type index_entry: :class:`codechecker.git.IndexEntry`
+        :param config: config of file checker, see :meth:`create`
+        """
+        execution_options = self._compile(config).execution_options
+        if index_entry.is_symlink:
+            return not execution_options['skip-symlinks']
+        if index_entry.binary and execution_options['skip-binary']:
+            return False
+        if index_entry.is_generated and execution_options['skip-generated']:
+            return False
+        max_size = execution_options['skip-larger-than']
+        return max_size is None or index_entry.size is None or \
+            index_entry.size <= max_size
+
+    def get_size_limit(self, config=None):
+        """Get max size of file not skipped by checker.
+
+        :param config: config of file checker, see :meth:`create`
+        :returns: size in bytes or None if size is not limited
+        """
+        return self._compile(config).execution_options['skip-larger-than']
+
+    def _new_task(self, taskname, compiled, stdin):
+        """Create task executing checker command.
+
+        :param stdin: checked blob is stored in git, checker reads it from
+            stdin if it supports stdin
+        """
+        # file path is substituted by task, so task can check file located
+        # outside of repository directory
+        if stdin and compiled.stdin_argv_template is not None:
+            task = Task(taskname, self._stdin_command, compiled.config)
+            task.argv_template = compiled.stdin_argv_template
+            task.stdin = True
+        else:
+            task = Task(taskname, self._command.template, compiled.config)
+            task.argv_template = compiled.argv_template
         return task
 
     def set_config(self, config):
@@ -161,7 +358,115 @@ class TaskCreator:
         :type config: dict
         :raises: :exc:`ValueError` if passed config contains invalid option
         """
+        config, execution_options = self._split_config(config)
         self.config = self._mix_config(config)
+        self.execution_options.update(execution_options)
+        self._compiled.clear()
+
+    def _compile(self, config):
+        """Get config mixed with factory config and data derived from it.
+
+        Result is computed once for every distinct config, tasks created
+        with equal configs share config and compiled command.
+
+        :rtype: :class:`_CompiledConfig`
+        """
+        config_key = json.dumps(config, sort_keys=True, default=str) \
+            if config else None
+        compiled = self._compiled.get(config_key)
+        if compiled is None:
+            checker_config, execution_options = self._split_config(config)
+            checker_config = self._mix_config(checker_config)
+            execution_options = dict(self.execution_options,
+                                     **execution_options)
+            if self._stdin_command and execution_options['stdin']:
+                stdin_argv_template = ArgvTemplate(
+                    self._stdin_command, checker_config,
+                    self._command_options, self._jobs_option
+                )
+            else:
+                stdin_argv_template = None
+            compiled = _CompiledConfig(
+                checker_config,
+                execution_options,
+                self._fingerprint(checker_config),
+                ArgvTemplate(self._command.template, checker_config,
+                             self._command_options, self._jobs_option),
+                stdin_argv_template,
+                self._is_path_independent(checker_config)
+            )
+            self._compiled[config_key] = compiled
+        return compiled
+
+    def _is_path_independent(self, config):
+        """Check if results of checker with config do not depend on path."""
+        if self._path_independent in (True, False):
+            return self._path_independent
+        return all(config.get(each_option) is not None
+                   for each_option in self._path_independent)
+
+    def _split_config(self, config):
+        """Separate execution options from checker config.
+
+        Execution options control how tasks are executed and are not passed
+        to checker, see :data:`EXECUTION_OPTIONS`.
+
+        :raises: :exc:`ValueError` if execution option value is invalid
+        """
+        if not config:
+            return config, {}
+        checker_config = {}
+        execution_options = {}
+        for option_name, option_value in config.items():
+            if option_name in EXECUTION_OPTIONS:
+                execution_options[option_name] = option_value
+            else:
+                checker_config[option_name] = option_value
+        for option_name in ('weight', 'max-parallel', 'skip-larger-than'):
+            option_value = execution_options.get(option_name)
+            if option_value is not None and \
+                    not (isinstance(option_value, int) and option_value > 0):
+                raise ValueError('"{}" option of "{}" must be positive'
+                                 ' integer'.format(option_name,
+                                                   self._checkername))
+        for option_name in _BOOLEAN_OPTIONS:
+            if not isinstance(execution_options.get(option_name, True),
+                              bool):
+                raise ValueError('"{}" option of "{}" must be boolean'
+                                 .format(option_name, self._checkername))
+        for option_name in ('inputs', 'trigger'):
+            patterns = execution_options.get(option_name)
+            if isinstance(patterns, str):
+                patterns = [patterns]
+            if patterns is None:
+                continue
+            if not (isinstance(patterns, list) and
+                    all(isinstance(each, str) for each in patterns)):
+                raise ValueError('"{}" option of "{}" must be list of glob'
+                                 ' patterns'.format(option_name,
+                                                    self._checkername))
+            execution_options[option_name] = tuple(patterns)
+        return checker_config, execution_options
+
+    def _fingerprint(self, config):
+        """Compute digest identifying checker command and configuration.
+
+        Digest does not depend on repository location, so results of tasks
+        with equal fingerprints can be shared between machines.
+        """
+        if self._result_creator:
+            result_creator = '{0.__module__}.{0.__qualname__}' \
+                .format(self._result_creator)
+        else:
+            result_creator = None
+        checker_identity = json.dumps(
+            [self._checkername, self._taskname.template,
+             self._command.template, config, self._command_options,
+             result_creator],
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha1(checker_identity.encode('utf-8')).hexdigest()
 
     def _mix_config(self, config):
         """Get joined factory config with passed one.
@@ -181,6 +486,46 @@ class TaskCreator:
         return result_config
 
 
+def group_duplicate_tasks(tasks):
+    """Group tasks of the same checker checking identical contents.
+
+    Vendored or generated files often have identical contents. Tasks with
+    equal fingerprint (checker and config), content hash and dependencies
+    hash are executed once, other tasks of group are appended to
+    duplicates of first task.
+
+    Only tasks of path independent checkers are grouped, results of other
+    checkers can depend on path (e.g. config files found next to checked
+    file or module name). Tasks which checked contents is unknown are never
+    grouped.
+
+    :returns: list of tasks to execute
+    """
+    unique_tasks = []
+    groups = {}
+    for each_task in tasks:
+        if not (each_task.path_independent and each_task.fingerprint and
+                each_task.content_hash):
+            unique_tasks.append(each_task)
+            continue
+        group_key = (each_task.fingerprint, each_task.content_hash,
+                     each_task.dependencies_hash)
+        first_task = groups.get(group_key)
+        if first_task is None:
+            groups[group_key] = each_task
+            unique_tasks.append(each_task)
+        else:
+            first_task.duplicates.append(each_task)
+    return unique_tasks
+
+
+_CompiledConfig = namedtuple(
+    '_CompiledConfig',
+    'config execution_options fingerprint argv_template stdin_argv_template'
+    ' path_independent'
+)
+
+
 class InvalidCheckerError(ValueError):
     """Exception thrown if trying to access checker with invalid name."""
 
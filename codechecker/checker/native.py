@@ -0,0 +1,234 @@
+"""Checkers executed in checking process without starting checker command.
+
+Hygiene checks are cheap compared to starting process, so native checker
+task reads checked contents (staged blob, or memory mapped file) and
+searches them in place. Check function receives contents (bytes-like
+object) and checker config and returns list of problems, tuples of line
+number (None if problem concerns whole file) and message.
+
+Exports:
+
+* :class:`NativeTask` - execute check function for checked file
+* :class:`NativeTaskCreator` - create native checker tasks
+* :func:`check_trailing_whitespace` - find lines ending with whitespace
+* :func:`check_merge_conflict` - find merge conflict markers
+* :func:`check_file_size` - check size of file
+* :func:`check_final_newline` - check that file ends with newline
+* :func:`check_crlf` - find lines ending with CRLF
+* :func:`check_python_syntax` - compile Python source
+* :func:`check_json` - parse JSON document
+* :func:`check_yaml` - parse YAML documents
+"""
+import json
+import mmap
+import re
+
+import yaml
+
+from codechecker import git
+from codechecker.checker.builder import TaskCreator
+from codechecker.checker.task import (Task,
+                                      CheckResult)
+
+
+# max number of problems reported for single file
+MAX_PROBLEMS = 50
+
+_TRAILING_WHITESPACE = re.compile(rb'[ \t]+\r?$', re.MULTILINE)
+_CONFLICT_MARKER = re.compile(rb'^(?:<{7}|\|{7}|>{7})(?: |\r?$)',
+                              re.MULTILINE)
+_CRLF = re.compile(rb'\r$', re.MULTILINE)
+# plain searches finding files which need regular expression search, they
+# are several times faster than searching with expression
+_TRAILING_WHITESPACE_ENDINGS = (b' \n', b'\t\n', b' \r\n', b'\t\r\n')
+_CONFLICT_MARKERS = (b'<<<<<<<', b'|||||||', b'>>>>>>>')
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+class NativeTask(Task):
+    """Execute check function for checked file."""
+
+    def __init__(self, taskname, check, config=None):
+        """Set task name and check function.
+
+        :param check: function called with checked contents and config,
+            returning list of tuples of line number and message
+        """
+        super().__init__(taskname, _check_name(check), config)
+        self.check = check
+        self.in_process = True
+
+    def __call__(self, contents=None):
+        """Check contents and return check result.
+
+        Contents are read from git blob if task reads stdin (blob is
+        stored), otherwise checked file is mapped to memory.
+
+        :param contents: checked contents, read from blob or file by default
+        :rtype: codechecker.checker.task.CheckResult
+        """
+        if contents is not None:
+            problems = self.check(contents, self.config)
+        elif self.stdin:
+            problems = self.check(
+                git.get_shared_blob_reader().read(self.content_hash),
+                self.config
+            )
+        else:
+            with open(self.file_abspath(), 'rb') as checked_file:
+                problems = self._check_file(checked_file)
+        if not problems:
+            return CheckResult(self.taskname)
+        lines = []
+        for line_number, message in problems[:MAX_PROBLEMS]:
+            if line_number is None:
+                lines.append('{}: {}'.format(self.relpath, message))
+            else:
+                lines.append('{}:{}: {}'.format(self.relpath, line_number,
+                                                message))
+        if len(problems) > MAX_PROBLEMS:
+            lines.append('... {} more'.format(len(problems) - MAX_PROBLEMS))
+        return CheckResult(self.taskname, CheckResult.ERROR,
+                           message='\n'.join(lines))
+
+    def __repr__(self):
+        """Create representation of NativeTask."""
+        return '<NativeTask({}): check={}, config={}>'.format(
+            self.taskname, _check_name(self.check), repr(self.config)
+        )
+
+    def _check_file(self, checked_file):
+        try:
+            contents = mmap.mmap(checked_file.fileno(), 0,
+                                 access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty file can not be mapped
+            return self.check(b'', self.config)
+        with contents:
+            return self.check(contents, self.config)
+
+
+class NativeTaskCreator(TaskCreator):
+    """Create :class:`NativeTask` objects."""
+
+    def __init__(self, checkername, taskname, check, defaultconfig=None):
+        """Set checker data.
+
+        :param check: check function, see :class:`NativeTask`
+        """
+        # check function is part of fingerprint instead of command, it gets
+        # only checked contents and config
+        super().__init__(checkername, taskname, _check_name(check),
+                         defaultconfig, path_independent=True)
+        self._check = check
+
+    def _new_task(self, taskname, compiled, stdin):
+        task = NativeTask(taskname, self._check, compiled.config)
+        task.stdin = stdin
+        return task
+
+
+def check_trailing_whitespace(contents, config):
+    """Find lines ending with spaces or tabs."""
+    # pylint: disable=unused-argument
+    if not (_contains_any(contents, _TRAILING_WHITESPACE_ENDINGS) or
+            contents[-2:].rstrip(b'\r').endswith((b' ', b'\t'))):
+        return []
+    return _find_lines(_TRAILING_WHITESPACE, contents, 'trailing whitespace')
+
+
+def check_merge_conflict(contents, config):
+    """Find merge conflict markers left in file."""
+    # pylint: disable=unused-argument
+    if not _contains_any(contents, _CONFLICT_MARKERS):
+        return []
+    return _find_lines(_CONFLICT_MARKER, contents, 'merge conflict marker')
+
+
+def check_file_size(contents, config):
+    """Check that file is not larger than "max-size" bytes."""
+    if len(contents) > config['max-size']:
+        return [(None, 'file has {} bytes, limit is {}'.format(
+            len(contents), config['max-size']
+        ))]
+    return []
+
+
+def check_final_newline(contents, config):
+    """Check that non empty file ends with newline."""
+    # pylint: disable=unused-argument
+    if len(contents) and contents[-1:] != b'\n':
+        return [(None, 'no newline at end of file')]
+    return []
+
+
+def check_crlf(contents, config):
+    """Find lines ending with CRLF."""
+    # pylint: disable=unused-argument
+    if contents.find(b'\r') == -1:
+        return []
+    return _find_lines(_CRLF, contents, 'CRLF line ending')
+
+
+def check_python_syntax(contents, config):
+    """Compile Python source without executing it."""
+    # pylint: disable=unused-argument
+    try:
+        compile(bytes(contents), '<checked>', 'exec', dont_inherit=True)
+    except SyntaxError as error:
+        return [(error.lineno, 'syntax error: {}'.format(error.msg))]
+    except ValueError as error:
+        # source contains null bytes
+        return [(None, 'syntax error: {}'.format(error))]
+    return []
+
+
+def check_json(contents, config):
+    """Parse JSON document."""
+    # pylint: disable=unused-argument
+    try:
+        json.loads(bytes(contents))
+    except json.JSONDecodeError as error:
+        return [(error.lineno, 'invalid JSON: {}'.format(error.msg))]
+    except UnicodeDecodeError as error:
+        return [(None, 'invalid JSON: {}'.format(error))]
+    return []
+
+
+def check_yaml(contents, config):
+    """Parse every YAML document in file."""
+    # pylint: disable=unused-argument
+    try:
+        for _ in yaml.load_all(bytes(contents), Loader=_YAML_LOADER):
+            pass
+    except yaml.YAMLError as error:
+        mark = getattr(error, 'problem_mark', None)
+        problem = getattr(error, 'problem', None) or str(error)
+        return [(mark.line + 1 if mark is not None else None,
+                 'invalid YAML: {}'.format(problem))]
+    return []
+
+
+def _contains_any(contents, substrings):
+    return any(contents.find(each_substring) != -1
+               for each_substring in substrings)
+
+
+def _find_lines(pattern, contents, message):
+    """Get problems of lines matching pattern.
+
+    Newlines are counted incrementally, contents can be memory map which
+    does not support counting.
+    """
+    problems = []
+    line_number = 1
+    position = 0
+    for match in pattern.finditer(contents):
+        line_number += contents[position:match.start()].count(b'\n')
+        position = match.start()
+        problems.append((line_number, message))
+    return problems
+
+
+def _check_name(check):
+    return 'native:{}.{}'.format(check.__module__, check.__qualname__)
@@ -4,9 +4,14 @@ Exports:
 
 * :class:`CheckResult`: Result of checker execution.
 * :class:`Task`: Run checker and return result.
+* :class:`ArgvTemplate`: Checker command compiled to arguments list.
 * :class:`Config`: Handle task configuration.
 """
+import os
+import re
 import sys
+from os import (path,
+                sep)
 from string import Template
 from shlex import (split,
                    quote)
@@ -15,6 +20,8 @@ from subprocess import (Popen,
                         PIPE,
                         STDOUT)
 
+from codechecker import git
+
 
 _CheckResult = namedtuple('CheckResult', 'taskname status summary message')
 
@@ -67,14 +74,85 @@ class Task:
             self.config = config
         self.result_creator = create_result_by_returncode
         self.command_options = {}
+        # Identity of checked content, used to look up cached results.
+        # fingerprint identifies checker command and config, relpath and
+        # content_hash (git object id) identify checked file. Project tasks
+        # have relpath None and content_hash is id of checked tree.
+        self.fingerprint = None
+        self.relpath = None
+        self.content_hash = None
+        # Result of cross-file checker depends on files imported by checked
+        # file, dependencies_hash is digest of their contents (see
+        # codechecker.dependencies)
+        self.cross_file = False
+        self.dependencies_hash = None
+        # Result does not depend on path of checked file, see
+        # codechecker.checker.builder.group_duplicate_tasks
+        self.path_independent = False
+        # Directory containing checked file, repository directory if None
+        self.rootdir = None
+        # Working directory of checker process, current directory if None
+        self.workdir = None
+        # Scheduling options, see codechecker.checker.builder
+        self.checkername = None
+        self.weight = 1
+        self.max_parallel = None
+        # Pipeline tier, task starts after tasks of lower tiers pass
+        self.tier = 0
+        # Glob patterns of files read by project task, content_hash is
+        # computed from their contents instead of whole tree
+        self.inputs = None
+        # Glob patterns, project task is executed only if some checked file
+        # matches them
+        self.trigger = None
+        # Checker reads checked contents from stdin, they are read from git
+        # blob content_hash
+        self.stdin = False
+        # Worker slots granted to task, checker parallelizing itself gets
+        # them in command (see ArgvTemplate), and MAKEFLAGS of jobserver
+        # sharing slots with checker
+        self.jobs = 1
+        self.makeflags = None
+        # Task is executed by checking process itself, it does not start
+        # checker command and does not consume worker slots
+        self.in_process = False
+        # Tasks checking identical contents with the same checker and config,
+        # they reuse result of this task
+        self.duplicates = []
+        # Compiled command, see ArgvTemplate. Tasks created by the same
+        # TaskCreator with the same config share it.
+        self.argv_template = None
+
+    def __getstate__(self):
+        """Get state pickled for worker process.
+
+        Duplicates are not sent to worker process, results are adopted by
+        them in checking process.
+        """
+        state = self.__dict__.copy()
+        state['duplicates'] = []
+        return state
 
-    def __call__(self):
+    def __call__(self, contents=None):
         """Execute checker and return check result.
 
+        :param contents: checked contents passed to checker reading stdin,
+            by default they are read from git blob
+        :type contents: bytes
         :rtype: codechecker.checker.task.CheckResult
         """
-        returncode, stdout = self._execute_shell_command()
-        return self.result_creator(self, returncode, stdout)
+        returncode, stdout = self._execute_shell_command(contents)
+        result = self.result_creator(self, returncode, stdout)
+        if result.message:
+            # show relative paths, they do not depend on location of
+            # repository (or of directory with checked out files), so
+            # messages can be cached and reused in other clones
+            rootdir = git.abspath('') if self.rootdir is None else \
+                self.rootdir + sep
+            result = result._replace(
+                message=result.message.replace(rootdir, '')
+            )
+        return result
 
     def __repr__(self):
         """Create representation of Task."""
@@ -84,7 +162,35 @@ class Task:
             repr(self.config)
         )
 
-    def _execute_shell_command(self):
+    def file_abspath(self):
+        """Get absolute path of checked file or None for project tasks."""
+        if self.relpath is None:
+            return None
+        if self.rootdir is None:
+            return git.abspath(self.relpath)
+        return path.join(self.rootdir, self.relpath)
+
+    def adopt_result(self, result, source):
+        """Create result of this task from result of duplicate task.
+
+        Task name and checked file paths in message are replaced by
+        this task ones.
+
+        :param source: task checking identical contents
+        :type result: codechecker.checker.task.CheckResult
+        :rtype: codechecker.checker.task.CheckResult
+        """
+        message = result.message
+        if message and source.relpath is not None:
+            source_abspath = source.file_abspath()
+            message = message.replace(source_abspath, self.file_abspath())
+            path_pattern = r'(?<![\w./-]){}(?![\w/])'.format(
+                re.escape(source.relpath)
+            )
+            message = re.sub(path_pattern, lambda _: self.relpath, message)
+        return result._replace(taskname=self.taskname, message=message)
+
+    def _execute_shell_command(self, contents=None):
         """Execute shell command and return result.
 
         Execute shell command and return its return code, stdout and stderr.
@@ -93,23 +199,70 @@ class Task:
         :returns: first item is return code(int), second stdout and stderr(str)
         :rtype: tuple
         """
-        process = Popen(self._build_command(), stdout=PIPE, stderr=STDOUT)
-        stdout, _ = process.communicate()
+        popen_options = {}
+        if self.workdir is not None:
+            popen_options['cwd'] = self.workdir
+        if self.makeflags is not None:
+            popen_options['env'] = dict(os.environ, MAKEFLAGS=self.makeflags)
+        if self.stdin:
+            popen_options['stdin'] = PIPE
+            if contents is None:
+                contents = git.get_shared_blob_reader().read(
+                    self.content_hash
+                )
+        else:
+            contents = None
+        process = Popen(self._build_command(), stdout=PIPE, stderr=STDOUT,
+                        **popen_options)
+        stdout, _ = process.communicate(contents)
         returncode = process.returncode
         return returncode, stdout.decode(sys.stdout.encoding)
 
     def _build_command(self):
         """Prepare shell command.
 
+        Command is compiled to :class:`ArgvTemplate` on first call, unless
+        task was created with shared template, only checked file path is
+        substituted on every call.
+        """
+        if self.argv_template is None:
+            self.argv_template = ArgvTemplate(self._command.template,
+                                              self.config,
+                                              self.command_options)
+        return self.argv_template.build(self.file_abspath(), self.jobs)
+
+
+class ArgvTemplate:
+    """Checker command split to arguments with checked file path slots.
+
+    Config options are substituted and command is tokenized once, so
+    building arguments of every task only replaces checked file path.
+    """
+
+    # arguments can not contain NUL, so slot never collides with config value
+    FILE_SLOT = '\0file_abspath\0'
+
+    def __init__(self, command, config=None, command_options=None,
+                 jobs_option=None):
+        """Compile command.
+
         Passes some config options to command options.
+
+        :param command: command template
+        :type command: string
+        :param jobs_option: option template passing number of granted
+            slots (``${jobs}``) to checker, appended when more than one
+            slot is granted (before ``-`` ending command reading stdin)
         """
+        config = config or {}
+        command_options = command_options or {}
         options = []
-        for each_option in self.command_options:
-            option_value = self.config[each_option]
+        for each_option in command_options:
+            option_value = config[each_option]
             if option_value is None:
                 continue
             option_pattern = Template(
-                self.command_options[each_option]
+                command_options[each_option]
             )
             options.append(
                 option_pattern.substitute(value=quote(str(option_value)))
@@ -118,11 +271,12 @@ class Task:
         options_mapping = {}
         options_mapping['options'] = space_separated_options
 
-        if 'executable' in self.config:
-            options_mapping['executable'] = self.config['executable']
+        if 'executable' in config:
+            options_mapping['executable'] = config['executable']
+        options_mapping['file_abspath'] = self.FILE_SLOT
 
-        for each_option in self.command_options:
-            option_value = self.config[each_option]
+        for each_option in command_options:
+            option_value = config[each_option]
             if option_value is None:
                 # Command options which config option is None
                 # should not be passed to command.
@@ -131,15 +285,47 @@ class Task:
                 continue
 
             option_pattern = Template(
-                self.command_options[each_option]
+                command_options[each_option]
             )
             options_mapping[each_option] = \
                 option_pattern.substitute(value=quote(str(option_value)))
 
-        command_string = self._command.substitute(
+        command_string = Template(command).substitute(
             options_mapping
         )
-        return split(command_string)
+        self.argv = split(command_string)
+        self._slots = [index for index, each_arg in enumerate(self.argv)
+                       if self.FILE_SLOT in each_arg]
+        self._jobs_option = Template(jobs_option) if jobs_option else None
+
+    @property
+    def passes_jobs(self):
+        """Command gets number of granted slots in jobs option."""
+        return self._jobs_option is not None
+
+    def build(self, file_abspath=None, jobs=1):
+        """Get command arguments for checked file.
+
+        :param jobs: number of slots granted to checker
+        :raises: :exc:`KeyError` if command requires file path and it is
+            not passed
+        """
+        argv = list(self.argv)
+        if jobs > 1 and self._jobs_option is not None:
+            position = len(argv)
+            if argv and argv[-1] == '-':
+                position -= 1
+            argv[position:position] = split(
+                self._jobs_option.substitute(jobs=jobs)
+            )
+        if not self._slots:
+            return argv
+        if file_abspath is None:
+            raise KeyError('file_abspath')
+        for each_index in self._slots:
+            argv[each_index] = argv[each_index].replace(self.FILE_SLOT,
+                                                        file_abspath)
+        return argv
 
 
 def create_result_by_returncode(task, returncode, shell_output) -> CheckResult:
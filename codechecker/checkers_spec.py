@@ -8,10 +8,30 @@ checkers tasks.
 from codechecker.result_creators import (create_pylint_result,
                                          create_pyunittest_result,
                                          create_phpunit_result)
+from codechecker.checker import native
 
 
 TASKNAME, COMMAND, DEFAULTCONFIG, COMMAND_OPTIONS, RESULT_CREATOR = \
     'taskname', 'command', 'defaultconfig', 'command_options', 'result_creator'
+# Command reading checked contents from stdin, ${file_abspath} is only name
+# of checked file shown in messages. It is used when checked contents are
+# stored in git, so checker reads staged blob instead of file.
+STDIN_COMMAND = 'stdin_command'
+# Function checking contents in checking process, see
+# codechecker.checker.native
+CHECK = 'check'
+# Option passing number of worker slots granted to checker (${jobs}),
+# checker runs alone with several slots when it has weight greater than 1
+JOBS_OPTION = 'jobs_option'
+# Checker results depend on modules imported by checked file, cached results
+# are bound to imported files, see codechecker.dependencies
+CROSS_FILE = 'cross_file'
+# Checker results depend only on checked contents and config, not on path of
+# checked file (e.g. on config files found next to it), tasks checking
+# identical contents are executed once. Value is True or tuple of config
+# options, checker is path independent when all of them are set. Native
+# checkers are path independent.
+PATH_INDEPENDENT = 'path_independent'
 
 
 PROJECT_CHECKERS = {
@@ -108,6 +128,10 @@ FILE_CHECKERS = {
     'jshint': {
         TASKNAME: 'JSHint ${file_relpath}',
         COMMAND: '${executable} ${options} ${file_abspath}',
+        STDIN_COMMAND: '${executable} ${options} --filename ${file_abspath}'
+                       ' -',
+        # .jshintrc is not looked up when config is given
+        PATH_INDEPENDENT: ('config',),
         DEFAULTCONFIG: {
             'config': None,
             'executable': 'jshint'
@@ -117,6 +141,8 @@ FILE_CHECKERS = {
     'jscs': {
         TASKNAME: 'JSCS ${file_relpath}',
         COMMAND: '${executable} ${options} ${file_abspath}',
+        # .jscsrc is not looked up when config is given
+        PATH_INDEPENDENT: ('config',),
         DEFAULTCONFIG: {
             'executable': 'jscs',
             'config': None,
@@ -134,6 +160,10 @@ FILE_CHECKERS = {
     'pylint': {
         TASKNAME: 'Pylint ${file_relpath}',
         COMMAND: 'pylint -f parseable ${file_abspath} ${options}',
+        STDIN_COMMAND: 'pylint -f parseable --from-stdin ${file_abspath}'
+                       ' ${options}',
+        JOBS_OPTION: '--jobs=${jobs}',
+        CROSS_FILE: True,
         DEFAULTCONFIG: {
             'rcfile': None,
             'accepted-code-rate': 9
@@ -144,6 +174,11 @@ FILE_CHECKERS = {
     'phpcs': {
         TASKNAME: 'PHPCS ${file_relpath}',
         COMMAND: '${executable} ${options} ${file_abspath}',
+        STDIN_COMMAND: '${executable} ${options}'
+                       ' --stdin-path=${file_abspath} -',
+        JOBS_OPTION: '--parallel=${jobs}',
+        # ruleset is not looked up when standard is given
+        PATH_INDEPENDENT: ('standard',),
         DEFAULTCONFIG: {
             'executable': 'phpcs',
             'encoding': 'utf-8',
@@ -166,3 +201,47 @@ FILE_CHECKERS = {
         }
     }
 }
+
+
+# File checkers executed without starting process, they are configured in
+# file-checkers section like FILE_CHECKERS
+NATIVE_CHECKERS = {
+    'trailing-whitespace': {
+        TASKNAME: 'Trailing whitespace ${file_relpath}',
+        CHECK: native.check_trailing_whitespace
+    },
+    'merge-conflict': {
+        TASKNAME: 'Merge conflict ${file_relpath}',
+        CHECK: native.check_merge_conflict
+    },
+    'max-file-size': {
+        TASKNAME: 'File size ${file_relpath}',
+        CHECK: native.check_file_size,
+        DEFAULTCONFIG: {
+            'max-size': 512 * 1024,
+            # large binary and generated files are what checker looks for
+            'skip-binary': False,
+            'skip-generated': False
+        }
+    },
+    'final-newline': {
+        TASKNAME: 'Final newline ${file_relpath}',
+        CHECK: native.check_final_newline
+    },
+    'crlf': {
+        TASKNAME: 'CRLF ${file_relpath}',
+        CHECK: native.check_crlf
+    },
+    'python-syntax': {
+        TASKNAME: 'Python syntax ${file_relpath}',
+        CHECK: native.check_python_syntax
+    },
+    'json': {
+        TASKNAME: 'JSON ${file_relpath}',
+        CHECK: native.check_json
+    },
+    'yaml': {
+        TASKNAME: 'YAML ${file_relpath}',
+        CHECK: native.check_yaml
+    }
+}
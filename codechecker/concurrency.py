@@ -0,0 +1,189 @@
+"""Determine number of concurrently executed tasks.
+
+Exports:
+
+* :func:`available_cpus` - number of CPUs process can use
+* :func:`available_memory` - memory available for new processes
+* :func:`resolve_workers_count` - configured number of workers
+* :class:`LoadController` - adjust concurrency to system load
+"""
+import math
+import os
+import time
+
+
+CGROUP_ROOT = '/sys/fs/cgroup'
+PROC_CGROUP = '/proc/self/cgroup'
+PROC_MEMINFO = '/proc/meminfo'
+
+
+def available_cpus(cgroup_root=CGROUP_ROOT, proc_cgroup=PROC_CGROUP):
+    """Get number of CPUs process can use.
+
+    Takes into account CPU affinity mask and cgroup v2 CPU quota
+    (cpu.max), so container limits are respected.
+
+    :rtype: integer
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    quota = _cgroup_cpu_quota(cgroup_root, proc_cgroup)
+    if quota is not None:
+        cpus = min(cpus, math.ceil(quota))
+    return max(cpus, 1)
+
+
+def available_memory(cgroup_root=CGROUP_ROOT, proc_cgroup=PROC_CGROUP,
+                     proc_meminfo=PROC_MEMINFO):
+    """Get memory available for new processes in bytes.
+
+    :returns: available memory or None if it can not be determined
+    """
+    candidates = []
+    try:
+        with open(proc_meminfo) as meminfo:
+            for each_line in meminfo:
+                if each_line.startswith('MemAvailable:'):
+                    candidates.append(int(each_line.split()[1]) * 1024)
+                    break
+    except (OSError, ValueError, IndexError):
+        pass
+    for each_dir in _cgroup_dirs(cgroup_root, proc_cgroup):
+        memory_max = _read_cgroup_file(each_dir, 'memory.max')
+        memory_current = _read_cgroup_file(each_dir, 'memory.current')
+        if memory_max and memory_max[0] != 'max' and memory_current:
+            try:
+                candidates.append(
+                    int(memory_max[0]) - int(memory_current[0])
+                )
+            except ValueError:
+                pass
+    if not candidates:
+        return None
+    return max(min(candidates), 0)
+
+
+def resolve_workers_count(cli_value=None, config_value=None, environ=None):
+    """Get configured number of workers.
+
+    Number is taken from command line, CODECHECKER_JOBS environment
+    variable or config, in that order.
+
+    :returns: number of workers or None if it is not configured, then
+        number of available CPUs should be used
+    :raises: :exc:`ValueError` if number is invalid
+    """
+    if environ is None:
+        environ = os.environ
+    for each_value in (cli_value, environ.get('CODECHECKER_JOBS'),
+                       config_value):
+        if each_value is None or each_value == '':
+            continue
+        workers_count = int(each_value)
+        if workers_count < 1:
+            raise ValueError('Number of jobs must be positive')
+        return workers_count
+    return None
+
+
+class LoadController:
+    """Adjust number of concurrently executed tasks to system load.
+
+    Limit is reduced by load average caused by other processes, so
+    max_jobs higher than number of CPUs (e.g. set explicitly for checkers
+    waiting for I/O) is kept on idle system. Limit is halved when available
+    memory is low. Load is checked at most once per interval.
+    """
+
+    def __init__(self, max_jobs, min_jobs=1, interval=1.0,
+                 min_free_memory=512 * 1024 * 1024):
+        """Set concurrency bounds.
+
+        :param min_free_memory: if available memory in bytes is lower,
+            concurrency is reduced
+        """
+        # pylint: disable=too-many-arguments
+        self.max_jobs = max_jobs
+        self.min_jobs = min(min_jobs, max_jobs)
+        self.interval = interval
+        self.min_free_memory = min_free_memory
+        self._limit = max_jobs
+        self._checked_at = None
+
+    def limit(self, running):
+        """Get number of tasks which can run concurrently.
+
+        :param running: number of tasks currently running
+        """
+        now = time.monotonic()
+        if self._checked_at is None or \
+                now - self._checked_at >= self.interval:
+            self._checked_at = now
+            self._limit = self._compute_limit(running)
+        return self._limit
+
+    def _compute_limit(self, running):
+        limit = self.max_jobs
+        try:
+            load = os.getloadavg()[0]
+        except OSError:
+            load = None
+        if load is not None:
+            # running tasks are part of load average
+            external_load = max(load - running, 0)
+            limit = math.floor(limit - external_load)
+        free_memory = available_memory()
+        if free_memory is not None and free_memory < self.min_free_memory:
+            limit = limit // 2
+        return max(limit, self.min_jobs)
+
+
+def _cgroup_cpu_quota(cgroup_root, proc_cgroup):
+    """Get lowest cgroup v2 CPU quota of process cgroup and its parents.
+
+    :returns: quota in CPUs or None if CPU usage is not limited
+    """
+    quotas = []
+    for each_dir in _cgroup_dirs(cgroup_root, proc_cgroup):
+        cpu_max = _read_cgroup_file(each_dir, 'cpu.max')
+        if not cpu_max or cpu_max[0] == 'max':
+            continue
+        try:
+            period = int(cpu_max[1]) if len(cpu_max) > 1 else 100000
+            quotas.append(int(cpu_max[0]) / period)
+        except (ValueError, ZeroDivisionError):
+            continue
+    return min(quotas) if quotas else None
+
+
+def _cgroup_dirs(cgroup_root, proc_cgroup):
+    """Get cgroup v2 directories of process cgroup and its parents."""
+    try:
+        with open(proc_cgroup) as cgroup_file:
+            lines = cgroup_file.read().splitlines()
+    except OSError:
+        return []
+    for each_line in lines:
+        if each_line.startswith('0::'):
+            cgroup_path = each_line[3:].strip('/')
+            break
+    else:
+        return []
+    dirs = [cgroup_root]
+    current_dir = cgroup_root
+    for each_part in cgroup_path.split('/'):
+        if each_part:
+            current_dir = os.path.join(current_dir, each_part)
+            dirs.append(current_dir)
+    return dirs
+
+
+def _read_cgroup_file(cgroup_dir, filename):
+    """Read whitespace separated values of cgroup file."""
+    try:
+        with open(os.path.join(cgroup_dir, filename)) as cgroup_file:
+            return cgroup_file.read().split()
+    except OSError:
+        return []
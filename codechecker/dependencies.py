@@ -0,0 +1,218 @@
+"""Resolve imports of checked files for cross-file checkers.
+
+Results of cross-file checkers (e.g. pylint) depend on modules imported by
+checked file, so their cache key contains digest of files imported by
+checked file directly or indirectly. Imports are parsed from Python source
+blobs and stored in index persisted between runs. Index is keyed by blob
+id, so only blobs which were not seen before are parsed.
+
+Imported module is resolved to every visible file which module path ends
+with module name (e.g. ``pkg.util`` to ``src/pkg/util.py``), so source
+roots do not have to be configured. Resolving is conservative: unrelated
+file can be taken as dependency, but dependency is never missed.
+
+Exports:
+
+* :class:`DependencyIndex` - imports of blobs stored in JSON file
+* :class:`DependencyGraph` - compute digests of dependencies of files
+* :func:`parse_imports` - get imports of Python source
+"""
+import ast
+import collections
+import hashlib
+import json
+import os
+from os import path
+
+from codechecker import git
+
+
+INDEX_FILE = '.git/code-checker/dependencies.json'
+# max number of blobs stored in index, blobs used by last run are kept
+MAX_ENTRIES = 200000
+PYTHON_SUFFIX = '.py'
+
+
+class DependencyIndex:
+    """Imports of Python source blobs stored in JSON file."""
+
+    def __init__(self, file_path=None, read_blob=None):
+        """Load index, missing or invalid file is treated as empty.
+
+        :param file_path: path of index file, index is not persisted if
+            it is None
+        :param read_blob: function returning contents of blob, blobs are
+            read from git object store by default
+        """
+        self._file_path = file_path
+        self._read_blob = read_blob
+        self._imports = {}
+        if file_path is not None:
+            try:
+                with open(file_path) as index_file:
+                    self._imports = dict(json.load(index_file))
+            except (OSError, ValueError, TypeError):
+                pass
+        self._used = {}
+        self._is_changed = False
+
+    def get_imports(self, blob_id):
+        """Get imports of Python source blob, see :func:`parse_imports`."""
+        imports = self._used.get(blob_id)
+        if imports is None:
+            imports = self._imports.get(blob_id)
+            if imports is None:
+                read_blob = self._read_blob or \
+                    git.get_shared_blob_reader().read
+                imports = parse_imports(read_blob(blob_id))
+                self._is_changed = True
+            self._used[blob_id] = imports
+        return imports
+
+    def save(self):
+        """Write index to file if some blob was parsed.
+
+        Blobs used by this run are kept, other blobs are dropped when index
+        has more than :data:`MAX_ENTRIES` entries.
+        """
+        if self._file_path is None or not self._is_changed:
+            return
+        entries = dict(self._used)
+        for blob_id, imports in self._imports.items():
+            if len(entries) >= MAX_ENTRIES:
+                break
+            entries.setdefault(blob_id, imports)
+        os.makedirs(path.dirname(self._file_path), exist_ok=True)
+        temporary_path = self._file_path + '.tmp'
+        with open(temporary_path, 'w') as index_file:
+            json.dump(entries, index_file, separators=(',', ':'))
+        os.replace(temporary_path, self._file_path)
+        self._imports = entries
+        self._is_changed = False
+
+
+class DependencyGraph:
+    """Compute digests of files imported by checked files."""
+
+    def __init__(self, files, index):
+        """Map module names to visible Python files.
+
+        :param files: iterable of tuples of file path and blob id of files
+            visible to checkers, blob id is None if contents of file are
+            not known (e.g. file has unstaged changes)
+        :type index: :class:`DependencyIndex`
+        """
+        self._index = index
+        self._blobs = {}
+        self._modules = collections.defaultdict(list)
+        for file_relpath, blob_id in files:
+            if not file_relpath.endswith(PYTHON_SUFFIX):
+                continue
+            self._blobs[file_relpath] = blob_id
+            module_parts = _get_module_parts(file_relpath)
+            for index in range(len(module_parts)):
+                self._modules['.'.join(module_parts[index:])].append(
+                    file_relpath
+                )
+        self._direct = {}
+
+    def digest(self, file_relpath, blob_id):
+        """Compute digest of files imported directly or indirectly.
+
+        :param blob_id: blob id of checked contents of file
+        :returns: hex digest or None if contents of some dependency are
+            not known
+        """
+        if not file_relpath.endswith(PYTHON_SUFFIX):
+            return hashlib.sha1().hexdigest()
+        dependencies = {file_relpath: blob_id}
+        pending = [(file_relpath, blob_id)]
+        while pending:
+            for each_dependency in self._get_direct(*pending.pop()):
+                if each_dependency in dependencies:
+                    continue
+                dependency_blob = self._blobs[each_dependency]
+                if dependency_blob is None:
+                    return None
+                dependencies[each_dependency] = dependency_blob
+                pending.append((each_dependency, dependency_blob))
+        del dependencies[file_relpath]
+        digest = hashlib.sha1()
+        for each_dependency in sorted(dependencies):
+            digest.update('{}\0{}\0'.format(
+                each_dependency, dependencies[each_dependency]
+            ).encode('utf-8'))
+        return digest.hexdigest()
+
+    def _get_direct(self, file_relpath, blob_id):
+        """Get files imported by file, they are computed once."""
+        key = file_relpath, blob_id
+        direct = self._direct.get(key)
+        if direct is None:
+            direct = set()
+            for level, module, names in self._index.get_imports(blob_id):
+                for each_module in _get_imported_modules(file_relpath, level,
+                                                         module, names):
+                    direct.update(self._modules.get(each_module, ()))
+            self._direct[key] = direct
+        return direct
+
+
+def parse_imports(source):
+    """Get imports of Python source.
+
+    Imports nested in functions and conditions are included. Source which
+    can not be parsed has no imports.
+
+    :param source: Python source
+    :type source: bytes
+    :returns: list of lists of relative import level, module name (empty
+        for ``from . import name``) and list of imported names
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return []
+    imports = []
+    for each_node in ast.walk(tree):
+        if isinstance(each_node, ast.Import):
+            imports.extend([0, each_alias.name, []]
+                           for each_alias in each_node.names)
+        elif isinstance(each_node, ast.ImportFrom):
+            imports.append([
+                each_node.level, each_node.module or '',
+                [each_alias.name for each_alias in each_node.names
+                 if each_alias.name != '*']
+            ])
+    return imports
+
+
+def _get_module_parts(file_relpath):
+    """Get module path of Python file relative to repository directory."""
+    module_parts = file_relpath[:-len(PYTHON_SUFFIX)].split('/')
+    if module_parts[-1] == '__init__':
+        module_parts.pop()
+    return module_parts
+
+
+def _get_imported_modules(file_relpath, level, module, names):
+    """Get names of modules and packages executed by import.
+
+    Imported names can be modules, parent packages are executed too.
+    """
+    if level:
+        package_parts = _get_module_parts(file_relpath)
+        if not file_relpath.endswith('__init__' + PYTHON_SUFFIX):
+            package_parts.pop()
+        if level - 1 > len(package_parts):
+            return []
+        module_parts = package_parts[:len(package_parts) - level + 1]
+        if module:
+            module_parts.extend(module.split('.'))
+    else:
+        module_parts = module.split('.')
+    modules = ['.'.join(module_parts[:index + 1])
+               for index in range(len(module_parts))]
+    modules.extend('.'.join(module_parts + [each_name])
+                   for each_name in names)
+    return modules
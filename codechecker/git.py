@@ -5,14 +5,55 @@ Exports:
 * :func:`find_repository_dir` - git repository main directory path
 * :func:`abspath` - get absolute path of file
 * :func:`get_staged_files` - get staged files
+* :func:`get_staged_blobs` - get blob ids of staged files
+* :func:`iter_tracked_files` - stream files in git index
+* :func:`get_index_blobs` - get blob ids of staged contents of files
+* :func:`get_staged_index` - get metadata of staged entries
+* :class:`IndexEntry` - metadata of staged file
+* :func:`read_blob` - get contents of blob
+* :func:`get_range_blobs` - get blob ids of files changed in commits range
+* :func:`checkout_blobs` - write blobs to directory
+* :func:`get_changed_files` - get files changed since last commit
+* :func:`get_untracked_files` - get files which are not tracked nor ignored
+* :func:`get_worktree_files` - filter out ignored and deleted files
+* :func:`hash_worktree_files` - get blob ids of working tree contents
+* :func:`get_staged_tree` - get id of staged tree equal to working tree
+* :func:`write_tree` - get id of staged tree
+* :func:`create_snapshot` - write exact contents of index to directory
+* :class:`BlobReader` - read many blobs using single git process
+* :func:`get_shared_blob_reader` - get blob reader shared by process
 * :exc:`GitRepoNotFoundError` - raised when git repository can not be found
 """
+import atexit
+import collections
 import os
 from os import path
 import sys
+import functools
+import threading
 from subprocess import Popen, PIPE
 
 
+# mode of submodule entries in git index
+_GITLINK_MODE = '160000'
+_SYMLINK_MODE = '120000'
+_NULL_BLOB_ID = '0' * 40
+# attributes read by get_staged_index
+_INDEX_ATTRIBUTES = ('binary', 'diff', 'text', 'linguist-generated',
+                     'linguist-vendored')
+# blob is binary if it contains NUL byte in first bytes (like in git)
+_BINARY_SNIFF_SIZE = 8000
+# blobs larger than this are sniffed by own git process, so their contents
+# are not streamed through shared process
+_LARGE_BLOB_SIZE = 1024 * 1024
+
+# reader shared by tasks executed in process, it is recreated in forked
+# processes and other repositories
+_shared_reader = None
+_shared_reader_key = None
+_shared_reader_lock = threading.Lock()
+
+
 class GitRepoNotFoundError(RuntimeError):
     """Raised when git repository can not be found."""
 
@@ -44,7 +85,15 @@ def find_repository_dir(curdir):
         curdir = path.dirname(curdir)
     raise GitRepoNotFoundError('Git repository can not be found')
 
-_REPOSITORY_DIR_PATH = find_repository_dir(os.getcwd())
+
+@functools.lru_cache(maxsize=None)
+def _repository_dir_path():
+    """Get main directory of repository containing working directory.
+
+    Repository is found on first use, so this module can be imported outside
+    of git repository.
+    """
+    return find_repository_dir(os.getcwd())
 
 
 def abspath(rel_path):
@@ -53,11 +102,14 @@ def abspath(rel_path):
     Convert relative path to absolute one. Passed path must be relative to
     git repository main directory
     """
-    return path.join(_REPOSITORY_DIR_PATH, rel_path)
+    return path.join(_repository_dir_path(), rel_path)
 
 
-def get_staged_files():
-    """Return files in git staging area."""
+def get_staged_files(deleted=False):
+    """Return files in git staging area.
+
+    :param deleted: if true, files deleted from working tree are included
+    """
     def normpath(file_relpath):
         """Get absolute path."""
         return file_relpath
@@ -69,5 +121,548 @@ def get_staged_files():
     # read staged files and filter deleted ones
     file_list = [f for f in [normpath(f.decode(sys.stdout.encoding).strip())
                              for f in git_process.stdout.readlines()]
-                 if os.path.exists(f)]
+                 if deleted or os.path.exists(f)]
     return file_list
+
+
+def get_staged_blobs():
+    """Return dict mapping staged file path to its blob id.
+
+    Only files which working tree contents are equal to staged contents are
+    returned, so returned blob id identifies contents seen by checkers.
+    """
+    return {file_relpath: blob_id
+            for file_relpath, blob_id in iter_tracked_files()
+            if blob_id is not None}
+
+
+def iter_tracked_files():
+    """Iterate over files in git index.
+
+    Index is streamed, so memory usage does not depend on repository size.
+    Yields tuples of file path and blob id, blob id is None if working tree
+    contents of file differ from staged contents. Files deleted from working
+    tree, unmerged files and submodules are skipped.
+    """
+    for file_relpath, _, blob_id, is_modified in _iter_index_entries():
+        if is_modified:
+            if not path.exists(file_relpath):
+                continue
+            blob_id = None
+        yield file_relpath, blob_id
+
+
+def get_index_blobs(file_relpaths):
+    """Return dict mapping files to blob ids of their staged contents.
+
+    Unlike :func:`get_staged_blobs`, files with unstaged changes are
+    included, returned blob ids identify contents which will be committed.
+
+    :param file_relpaths: iterable of file paths, files which are not in
+        index are not returned
+    """
+    file_relpaths = set(file_relpaths)
+    return {
+        file_relpath: blob_id
+        for file_relpath, _, blob_id, _ in _iter_index_entries(False)
+        if file_relpath in file_relpaths
+    }
+
+
+def _iter_index_entries(detect_modified=True):
+    """Stream merged entries of git index, submodules are skipped.
+
+    :param detect_modified: compare working tree with index, otherwise
+        modified flag is None
+    :returns: iterator of tuples of file path, mode, blob id and flag
+        telling if working tree contents differ from staged contents
+    """
+    modified_files = None
+    if detect_modified:
+        git_process = Popen(['git', 'diff', '--name-only', '-z'],
+                            stdout=PIPE)
+        modified_files, _ = git_process.communicate()
+        modified_files = set(modified_files.decode('utf-8').split('\0'))
+
+    git_process = Popen(['git', 'ls-files', '--stage', '-z'], stdout=PIPE)
+    try:
+        for each_entry in _iter_null_terminated(git_process.stdout):
+            entry_info, file_relpath = each_entry.split('\t', 1)
+            mode, blob_id, stage = entry_info.split()
+            if stage != '0' or mode == _GITLINK_MODE:
+                continue
+            is_modified = None if modified_files is None else \
+                file_relpath in modified_files
+            yield file_relpath, mode, blob_id, is_modified
+    finally:
+        git_process.stdout.close()
+        git_process.wait()
+
+
+class IndexEntry(collections.namedtuple(
+        'IndexEntry', 'path status blob size mode binary attributes')):
+    """Metadata of staged file.
+
+    status is git diff status letter (``A``, ``M``, ``D``, ``T``), blob
+    and size are None for deleted files, mode is octal string (e.g.
+    ``100644``), attributes maps specified git attributes to True (set),
+    False (unset) or value. binary is None if contents were not read
+    because blob is larger than size limit.
+    """
+
+    __slots__ = ()
+
+    @property
+    def is_symlink(self):
+        """Staged file is symbolic link."""
+        return self.mode == _SYMLINK_MODE
+
+    @property
+    def is_generated(self):
+        """File is marked as generated by ``linguist-generated``."""
+        return self.attributes.get('linguist-generated') in (True, 'true')
+
+
+def get_staged_index(file_relpaths=None, size_limits=None):
+    """Return metadata of files in git staging area.
+
+    Binary flag is taken from ``binary``, ``diff`` and ``text`` attributes,
+    blobs without them are binary if they contain NUL byte in first 8000
+    bytes. Attributes are read from ``.gitattributes`` files in index.
+    Sizes are read before contents, so contents of blobs larger than limit
+    of their file are not read and their binary flag is None.
+
+    :param file_relpaths: iterable of file paths, all staged files are
+        returned if it is None
+    :param size_limits: dict mapping file paths to max size of checked
+        contents, size of files not in dict is not limited
+    :returns: dict mapping file path to :class:`IndexEntry`
+    """
+    if file_relpaths is not None:
+        file_relpaths = set(file_relpaths)
+    size_limits = size_limits or {}
+    git_process = Popen(['git', 'diff', '--cached', '--raw', '-z',
+                         '--no-renames', '--no-abbrev'], stdout=PIPE)
+    output, _ = git_process.communicate()
+    fields = output.decode('utf-8').split('\0')
+    raw_entries = []
+    for each_info, each_file in zip(fields[0::2], fields[1::2]):
+        if file_relpaths is not None and each_file not in file_relpaths:
+            continue
+        _, mode, _, blob_id, status = each_info.split()
+        if blob_id == _NULL_BLOB_ID:
+            blob_id = None
+        raw_entries.append((each_file, status, blob_id, mode))
+    if not raw_entries:
+        return {}
+
+    attributes = _get_index_attributes(
+        [each_file for each_file, _, _, _ in raw_entries]
+    )
+    sizes = _get_blob_sizes([blob_id for _, _, blob_id, mode in raw_entries
+                             if blob_id and mode != _GITLINK_MODE])
+    binary_flags = {}
+    sniffed_blobs = []
+    for each_file, _, blob_id, mode in raw_entries:
+        size = sizes.get(blob_id)
+        if size is None:
+            binary_flags[each_file] = False
+        elif mode == _SYMLINK_MODE:
+            # contents are link target
+            binary_flags[each_file] = False
+        else:
+            binary_flags[each_file] = _get_binary_attribute(
+                attributes.get(each_file, {})
+            )
+            size_limit = size_limits.get(each_file)
+            if binary_flags[each_file] is None and \
+                    (size_limit is None or size <= size_limit):
+                sniffed_blobs.append(blob_id)
+    heads = _read_blob_heads(sniffed_blobs, sizes)
+    index = {}
+    for each_file, status, blob_id, mode in raw_entries:
+        binary = binary_flags[each_file]
+        if binary is None and blob_id in heads:
+            binary = b'\0' in heads[blob_id]
+        index[each_file] = IndexEntry(
+            each_file, status, blob_id, sizes.get(blob_id), mode, binary,
+            attributes.get(each_file, {})
+        )
+    return index
+
+
+def _get_blob_sizes(blob_ids):
+    """Read sizes of blobs without reading their contents.
+
+    :returns: dict mapping blob ids to sizes, missing blobs are left out
+    """
+    if not blob_ids:
+        return {}
+    git_process = Popen(['git', 'cat-file', '--batch-check'],
+                        stdin=PIPE, stdout=PIPE)
+    output, _ = git_process.communicate(
+        ''.join(each_blob + '\n' for each_blob in set(blob_ids))
+        .encode('ascii')
+    )
+    sizes = {}
+    for each_line in output.decode('ascii').splitlines():
+        blob_info = each_line.split()
+        if len(blob_info) == 3:
+            sizes[blob_info[0]] = int(blob_info[2])
+    return sizes
+
+
+def _read_blob_heads(blob_ids, sizes):
+    """Read first :data:`_BINARY_SNIFF_SIZE` bytes of blobs.
+
+    Blobs are read by single git process, rest of contents is discarded,
+    blob ids are written by separate thread, so git process does not wait
+    for reads of every blob. Blobs larger than :data:`_LARGE_BLOB_SIZE`
+    are read by own process killed after first bytes are read, so their
+    remaining contents are never read.
+
+    :param sizes: dict mapping blob ids to sizes
+    :returns: dict mapping blob ids to first bytes
+    """
+    blob_ids = list(dict.fromkeys(blob_ids))
+    small_blobs = [each_blob for each_blob in blob_ids
+                   if sizes[each_blob] <= _LARGE_BLOB_SIZE]
+    heads = {}
+    if small_blobs:
+        git_process = Popen(['git', 'cat-file', '--batch'],
+                            stdin=PIPE, stdout=PIPE)
+        writer = threading.Thread(target=_write_blob_ids,
+                                  args=(git_process.stdin, small_blobs))
+        writer.start()
+        for _ in small_blobs:
+            blob_info = git_process.stdout.readline().split()
+            if len(blob_info) != 3:
+                # missing object
+                continue
+            size = int(blob_info[2])
+            head = git_process.stdout.read(min(size, _BINARY_SNIFF_SIZE))
+            # skip rest of contents and newline following them
+            git_process.stdout.read(size - len(head) + 1)
+            heads[blob_info[0].decode('ascii')] = head
+        writer.join()
+        git_process.stdout.close()
+        git_process.wait()
+    for each_blob in blob_ids:
+        if sizes[each_blob] > _LARGE_BLOB_SIZE:
+            git_process = Popen(['git', 'cat-file', 'blob', each_blob],
+                                stdout=PIPE)
+            heads[each_blob] = git_process.stdout.read(_BINARY_SNIFF_SIZE)
+            git_process.kill()
+            git_process.stdout.close()
+            git_process.wait()
+    return heads
+
+
+def _write_blob_ids(stream, blob_ids):
+    try:
+        for each_blob in blob_ids:
+            stream.write(each_blob.encode('ascii') + b'\n')
+        stream.close()
+    except BrokenPipeError:
+        pass
+
+
+def _get_index_attributes(file_relpaths):
+    """Return dict mapping files to dicts of their specified attributes."""
+    git_process = Popen(['git', 'check-attr', '-z', '--cached', '--stdin'] +
+                        list(_INDEX_ATTRIBUTES), stdin=PIPE, stdout=PIPE)
+    output, _ = git_process.communicate(
+        ''.join(each_file + '\0' for each_file in file_relpaths)
+        .encode('utf-8')
+    )
+    fields = output.decode('utf-8').split('\0')
+    attributes = {}
+    for each_file, each_name, each_info in zip(fields[0::3], fields[1::3],
+                                               fields[2::3]):
+        if each_info == 'unspecified':
+            continue
+        value = {'set': True, 'unset': False}.get(each_info, each_info)
+        attributes.setdefault(each_file, {})[each_name] = value
+    return attributes
+
+
+def _get_binary_attribute(attributes):
+    """Get binary flag set by attributes like git does.
+
+    :returns: True or False, None if contents decide
+    """
+    if attributes.get('binary') is True or attributes.get('diff') is False \
+            or attributes.get('text') is False:
+        return True
+    if attributes.get('text') is True:
+        return False
+    return None
+
+
+def _iter_null_terminated(stream, chunk_size=65536):
+    """Read null terminated strings from binary stream."""
+    remainder = b''
+    for chunk in iter(lambda: stream.read(chunk_size), b''):
+        entries = (remainder + chunk).split(b'\0')
+        remainder = entries.pop()
+        for each_entry in entries:
+            if each_entry:
+                yield each_entry.decode('utf-8')
+    if remainder:
+        yield remainder.decode('utf-8')
+
+
+def read_blob(blob_id):
+    """Return contents of blob stored in git object database.
+
+    :rtype: bytes
+    """
+    git_process = Popen(['git', 'cat-file', 'blob', blob_id], stdout=PIPE)
+    contents, _ = git_process.communicate()
+    if git_process.returncode != 0:
+        raise LookupError('Blob {} can not be read'.format(blob_id))
+    return contents
+
+
+def get_range_blobs(revrange):
+    """Return dict mapping files changed in commits range to blob ids.
+
+    Result contains union of files changed by every commit in range, which
+    exist in range tip commit. Blob ids identify file contents in tip commit.
+
+    :param revrange: commits range in "<base>..<tip>" format or single
+        revision, then range contains commits not present on any remote
+    """
+    if '..' in revrange:
+        tip = revrange.rsplit('..', 1)[1].lstrip('.') or 'HEAD'
+        log_args = [revrange]
+    else:
+        tip = revrange
+        log_args = [revrange, '--not', '--remotes']
+    git_process = Popen(['git', 'log', '--format=', '--name-only', '-z',
+                         '--no-renames'] + log_args, stdout=PIPE)
+    changed_files, _ = git_process.communicate()
+    if git_process.returncode != 0:
+        raise ValueError('Invalid commits range "{}"'.format(revrange))
+    changed_files = set(changed_files.decode('utf-8').split('\0'))
+
+    git_process = Popen(['git', 'ls-tree', '-r', '-z', tip], stdout=PIPE)
+    tree_entries, _ = git_process.communicate()
+    blobs = {}
+    for each_entry in tree_entries.decode('utf-8').split('\0'):
+        if not each_entry:
+            continue
+        entry_info, file_relpath = each_entry.split('\t', 1)
+        _, object_type, blob_id = entry_info.split()
+        if object_type == 'blob' and file_relpath in changed_files:
+            blobs[file_relpath] = blob_id
+    return blobs
+
+
+def checkout_blobs(blobs, directory):
+    """Write blobs to files in directory.
+
+    :param blobs: dict mapping file path relative to directory to blob id
+    """
+    with BlobReader() as reader:
+        for file_relpath, blob_id in blobs.items():
+            file_path = path.join(directory, file_relpath)
+            os.makedirs(path.dirname(file_path), exist_ok=True)
+            with open(file_path, 'wb') as blob_file:
+                blob_file.write(reader.read(blob_id))
+
+
+def get_changed_files():
+    """Return files which working tree contents differ from HEAD commit.
+
+    Untracked files which are not ignored are included, deleted files are
+    not.
+    """
+    git_process = Popen(['git', 'diff', 'HEAD', '--name-only', '-z'],
+                        stdout=PIPE, stderr=PIPE)
+    changed_files, _ = git_process.communicate()
+    if git_process.returncode != 0:
+        # repository without commits, every file is new
+        git_process = Popen(['git', 'ls-files', '-z'], stdout=PIPE)
+        changed_files, _ = git_process.communicate()
+    changed_files = changed_files.decode('utf-8').split('\0')
+    return sorted({
+        each_file for each_file in changed_files + get_untracked_files()
+        if each_file and path.isfile(each_file)
+    })
+
+
+def get_untracked_files():
+    """Return files which are neither tracked nor ignored."""
+    git_process = Popen(['git', 'ls-files', '-z', '--others',
+                         '--exclude-standard'], stdout=PIPE)
+    untracked_files, _ = git_process.communicate()
+    return [each_file for each_file in untracked_files.decode('utf-8')
+            .split('\0') if each_file]
+
+
+def get_worktree_files(paths):
+    """Return passed paths of existing files which are not ignored.
+
+    :param paths: file paths relative to repository directory
+    """
+    if not paths:
+        return []
+    git_process = Popen(['git', '--literal-pathspecs', 'ls-files', '-z',
+                         '--cached', '--others', '--exclude-standard',
+                         '--'] + list(paths), stdout=PIPE)
+    files, _ = git_process.communicate()
+    return sorted({each_file for each_file in files.decode('utf-8')
+                   .split('\0')
+                   if each_file and path.isfile(each_file)})
+
+
+def hash_worktree_files(paths):
+    """Return dict mapping file path to blob id of its working tree contents.
+
+    Blob id equals id of blob which is created when file is staged, so
+    results of checking working tree can be reused for staged file.
+    """
+    if not paths:
+        return {}
+    git_process = Popen(['git', 'hash-object', '--stdin-paths'],
+                        stdin=PIPE, stdout=PIPE)
+    blob_ids, _ = git_process.communicate(
+        ''.join(each_path + '\n' for each_path in paths).encode('utf-8')
+    )
+    if git_process.returncode != 0:
+        raise LookupError('Files can not be hashed')
+    return dict(zip(paths, blob_ids.decode('ascii').split()))
+
+
+def get_staged_tree():
+    """Return id of tree object of git index.
+
+    Tree is written to object database (``git write-tree``). Tree id
+    identifies contents seen by project checkers only if working tree does
+    not contain unstaged changes or untracked files, otherwise None is
+    returned.
+
+    :returns: tree id or None
+    """
+    git_process = Popen(['git', 'diff', '--quiet'])
+    git_process.wait()
+    if git_process.returncode != 0:
+        return None
+    if get_untracked_files():
+        return None
+    return write_tree()
+
+
+def write_tree():
+    """Write git index to tree object and return its id.
+
+    :returns: tree id or None if index contains unmerged entries
+    """
+    git_process = Popen(['git', 'write-tree'], stdout=PIPE, stderr=PIPE)
+    tree_id, _ = git_process.communicate()
+    if git_process.returncode != 0:
+        return None
+    return tree_id.decode('ascii').strip()
+
+
+def create_snapshot(directory):
+    """Write exact contents of git index to directory.
+
+    Files which working tree contents equal staged contents are symbolic
+    links to working tree files, other files (partially staged or deleted
+    from working tree) are written by ``git checkout-index``. Untracked and
+    ignored files and submodules are not part of snapshot.
+
+    :returns: dict mapping file path to blob id of every file in snapshot
+    """
+    blobs = {}
+    checked_out = []
+    created_dirs = set()
+    for file_relpath, _, blob_id, is_modified in _iter_index_entries():
+        blobs[file_relpath] = blob_id
+        if is_modified:
+            checked_out.append(file_relpath)
+            continue
+        dir_relpath = path.dirname(file_relpath)
+        if dir_relpath not in created_dirs:
+            os.makedirs(path.join(directory, dir_relpath), exist_ok=True)
+            created_dirs.add(dir_relpath)
+        os.symlink(abspath(file_relpath), path.join(directory, file_relpath))
+
+    if checked_out:
+        git_process = Popen(['git', 'checkout-index', '-z', '--stdin',
+                             '--prefix', path.join(directory, '')],
+                            stdin=PIPE)
+        git_process.communicate(
+            ''.join(each_file + '\0' for each_file in checked_out)
+            .encode('utf-8')
+        )
+        if git_process.returncode != 0:
+            raise LookupError('Staged files can not be checked out')
+    return blobs
+
+
+class BlobReader:
+    """Read blobs using single long-lived ``git cat-file --batch`` process.
+
+    Reader can be shared between threads.
+    """
+
+    def __init__(self):
+        """Start git process."""
+        self._process = Popen(['git', 'cat-file', '--batch'],
+                              stdin=PIPE, stdout=PIPE)
+        self._lock = threading.Lock()
+
+    def read(self, blob_id):
+        """Return contents of blob.
+
+        :rtype: bytes
+        :raises: :exc:`LookupError` if blob does not exist
+        """
+        with self._lock:
+            self._process.stdin.write(blob_id.encode('ascii') + b'\n')
+            self._process.stdin.flush()
+            header = self._process.stdout.readline().decode('ascii').split()
+            if len(header) != 3:
+                raise LookupError('Blob {} can not be read'.format(blob_id))
+            contents = self._process.stdout.read(int(header[2]))
+            # contents are followed by newline
+            self._process.stdout.read(1)
+        return contents
+
+    def close(self):
+        """Stop git process."""
+        self._process.stdin.close()
+        self._process.wait()
+        self._process.stdout.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+def get_shared_blob_reader():
+    """Get :class:`BlobReader` shared by every caller in current process.
+
+    Reader is started on first use and stopped when process exits, so
+    checkers executed by the same worker process do not start git process
+    for every blob. Forked processes start their own reader, reader is
+    replaced when working directory changes.
+    """
+    # pylint: disable=global-statement
+    global _shared_reader, _shared_reader_key
+    reader_key = os.getpid(), os.getcwd()
+    with _shared_reader_lock:
+        if _shared_reader_key != reader_key:
+            if _shared_reader is not None and \
+                    _shared_reader_key[0] == reader_key[0]:
+                atexit.unregister(_shared_reader.close)
+                _shared_reader.close()
+            _shared_reader = BlobReader()
+            _shared_reader_key = reader_key
+            atexit.register(_shared_reader.close)
+        return _shared_reader
@@ -0,0 +1,145 @@
+"""Share worker slots with tools parallelizing themselves.
+
+GNU make jobserver protocol: every process running jobs owns one implicit
+slot, every other slot is token (single byte) read from shared pipe and
+written back when slot is released. If ``check-code`` runs under ``make
+-j``, slots of checkers are taken from make jobserver found in MAKEFLAGS.
+Otherwise check-code can create its own jobserver (named pipe) holding
+workers count tokens and pass it to checkers in MAKEFLAGS, so checkers
+understanding jobserver (make, ninja, cargo and others) share its budget.
+
+Exports:
+
+* :class:`JobServer` - acquire and release jobserver tokens
+* :func:`find_jobserver_auth` - get jobserver address from MAKEFLAGS
+"""
+import os
+import shutil
+import stat
+import tempfile
+from os import path
+
+
+ENVIRONMENT_VARIABLE = 'MAKEFLAGS'
+# token written by created jobserver, make accepts any byte
+TOKEN = b'+'
+
+
+class JobServer:
+    """Acquire and release tokens of jobserver without blocking."""
+
+    def __init__(self, read_fd, write_fd, makeflags=None, owned_dir=None):
+        """Set jobserver file descriptors.
+
+        :param read_fd: non-blocking descriptor tokens are read from
+        :param makeflags: MAKEFLAGS passed to checkers, None if checkers
+            inherit MAKEFLAGS of check-code
+        :param owned_dir: directory removed when jobserver is closed
+        """
+        self._read_fd = read_fd
+        self._write_fd = write_fd
+        self.makeflags = makeflags
+        self._owned_dir = owned_dir
+
+    @classmethod
+    def from_environ(cls, environ=None):
+        """Connect to jobserver of make running check-code.
+
+        Descriptors which are not pipes are not used, make does not pass
+        jobserver descriptors to commands of rules which are not recursive,
+        so their numbers can belong to unrelated files.
+
+        :returns: :class:`JobServer` or None if MAKEFLAGS contains no
+            usable jobserver
+        """
+        auth = find_jobserver_auth((environ or os.environ).get(
+            ENVIRONMENT_VARIABLE, ''
+        ))
+        if auth is None:
+            return None
+        try:
+            if auth.startswith('fifo:'):
+                fifo_fd = os.open(auth[len('fifo:'):],
+                                  os.O_RDWR | os.O_NONBLOCK)
+                if not _is_fifo(fifo_fd):
+                    os.close(fifo_fd)
+                    return None
+                return cls(fifo_fd, fifo_fd)
+            read_fd, write_fd = (int(each) for each in auth.split(','))
+            if not (_is_fifo(read_fd) and _is_fifo(write_fd)):
+                return None
+            # pipe is shared with make, reopen it, so non-blocking mode
+            # does not change make's file description (Linux only)
+            read_fd = os.open('/proc/self/fd/{}'.format(read_fd),
+                              os.O_RDONLY | os.O_NONBLOCK)
+            return cls(read_fd, os.dup(write_fd))
+        except (OSError, ValueError):
+            return None
+
+    @classmethod
+    def create(cls, slots):
+        """Create jobserver with slots shared by check-code and checkers.
+
+        :param slots: total number of slots, check-code owns implicit one
+        """
+        fifo_dir = tempfile.mkdtemp(prefix='code-checker-jobserver-')
+        fifo_path = path.join(fifo_dir, 'fifo')
+        os.mkfifo(fifo_path, 0o600)
+        fifo_fd = os.open(fifo_path, os.O_RDWR | os.O_NONBLOCK)
+        os.write(fifo_fd, TOKEN * (slots - 1))
+        makeflags = '-j{} --jobserver-auth=fifo:{}'.format(slots, fifo_path)
+        return cls(fifo_fd, fifo_fd, makeflags, fifo_dir)
+
+    def try_acquire(self):
+        """Read token if some is available.
+
+        :returns: token (bytes) or None
+        """
+        try:
+            token = os.read(self._read_fd, 1)
+        except BlockingIOError:
+            return None
+        return token or None
+
+    def release(self, token):
+        """Return token to jobserver."""
+        os.write(self._write_fd, token)
+
+    def close(self):
+        """Close jobserver descriptors, remove created named pipe."""
+        os.close(self._read_fd)
+        if self._write_fd != self._read_fd:
+            os.close(self._write_fd)
+        if self._owned_dir is not None:
+            shutil.rmtree(self._owned_dir, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+def _is_fifo(file_descriptor):
+    """Check that descriptor is open pipe."""
+    try:
+        return stat.S_ISFIFO(os.fstat(file_descriptor).st_mode)
+    except OSError:
+        return False
+
+
+def find_jobserver_auth(makeflags):
+    """Get jobserver address from MAKEFLAGS.
+
+    :returns: "R,W" descriptors, "fifo:PATH" or None if make runs without
+        jobserver
+    """
+    auth = None
+    for each_flag in makeflags.split():
+        for each_prefix in ('--jobserver-auth=', '--jobserver-fds='):
+            if each_flag.startswith(each_prefix):
+                # last flag wins, like in make
+                auth = each_flag[len(each_prefix):]
+    if auth is None or auth in ('-1,-1', '-2,-2'):
+        return None
+    return auth
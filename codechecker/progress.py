@@ -0,0 +1,211 @@
+"""Show progress of checkers execution.
+
+Progress line shows numbers of done, running and queued tasks, slowest
+running tasks and estimated remaining time. Estimate is computed from
+durations of checkers recorded by previous runs.
+
+Exports:
+
+* :class:`ProgressMonitor` - draw progress line while tasks are running
+* :class:`DurationHistory` - average durations of checkers tasks
+"""
+import collections
+import json
+import os
+import shutil
+import sys
+import time
+from os import path
+
+from codechecker.worker import Monitor
+
+
+HISTORY_FILE = '.git/code-checker/durations.json'
+# weight of last duration in average duration of checker
+HISTORY_WEIGHT = 0.3
+# expected duration of task of checker without history
+DEFAULT_DURATION = 1.0
+# min seconds between redraws on terminal and other streams
+TERMINAL_INTERVAL = 0.25
+LOG_INTERVAL = 10.0
+# running tasks shorter than this are not shown as slow
+SLOW_TASK_THRESHOLD = 2.0
+SLOW_TASKS_SHOWN = 2
+
+
+class DurationHistory:
+    """Average durations of checkers tasks stored in JSON file."""
+
+    def __init__(self, file_path):
+        """Load durations, missing or invalid file is treated as empty."""
+        self._file_path = file_path
+        try:
+            with open(file_path) as history_file:
+                self._durations = dict(json.load(history_file))
+        except (OSError, ValueError, TypeError):
+            self._durations = {}
+
+    def expected(self, checkername):
+        """Get expected duration of checker task in seconds."""
+        return self._durations.get(checkername, DEFAULT_DURATION)
+
+    def record(self, checkername, duration):
+        """Add measured duration of checker task to average."""
+        if checkername not in self._durations:
+            self._durations[checkername] = duration
+        else:
+            self._durations[checkername] += \
+                HISTORY_WEIGHT * (duration - self._durations[checkername])
+
+    def save(self):
+        """Write durations to file."""
+        os.makedirs(path.dirname(self._file_path), exist_ok=True)
+        temporary_path = self._file_path + '.tmp'
+        with open(temporary_path, 'w') as history_file:
+            json.dump(self._durations, history_file, indent=2,
+                      sort_keys=True)
+        os.replace(temporary_path, self._file_path)
+
+
+class ProgressMonitor(Monitor):
+    """Draw progress line while tasks are running.
+
+    On terminal single line is redrawn in place and it is cleared before
+    results are printed, other streams receive new line at most every
+    :data:`LOG_INTERVAL` seconds.
+    """
+
+    def __init__(self, jobs, history, stream=None):
+        """Set executed jobs.
+
+        :param jobs: executed jobs, numbers of queued jobs and remaining
+            time are shown only if jobs is list
+        :param history: :class:`DurationHistory` used for estimates, it is
+            updated and saved when run finishes
+        """
+        self._stream = stream or sys.stderr
+        self._history = history
+        self._is_terminal = self._stream.isatty()
+        self.interval = TERMINAL_INTERVAL if self._is_terminal \
+            else LOG_INTERVAL
+        if isinstance(jobs, list):
+            self._queued = collections.Counter(
+                each_job.checkername for each_job in jobs
+            )
+        else:
+            self._queued = None
+        self._running = {}
+        self._done = 0
+        self._total_slots = 1
+        self._start = time.monotonic()
+        self._last_draw = self._start
+        self._is_drawn = False
+
+    def job_started(self, job, used_slots, total_slots):
+        """Count running job."""
+        self._dequeue(job)
+        self._running[id(job)] = (job, time.monotonic())
+        self._total_slots = max(total_slots, 1)
+        self._draw()
+
+    def job_finished(self, job, result, duration):
+        """Count done job and record its duration."""
+        self._running.pop(id(job), None)
+        self._done += 1
+        self._history.record(job.checkername, duration)
+        self._clear()
+
+    def job_cached(self, job, result):
+        """Count done job."""
+        self._dequeue(job)
+        self._done += 1
+        self._clear()
+
+    def job_skipped(self, job):
+        """Forget job."""
+        self._dequeue(job)
+
+    def tick(self):
+        """Redraw progress line."""
+        self._draw()
+
+    def run_finished(self):
+        """Clear progress line and save durations."""
+        self._clear()
+        try:
+            self._history.save()
+        except OSError:
+            pass
+
+    def format_line(self):
+        """Format progress line.
+
+        :rtype: string
+        """
+        now = time.monotonic()
+        parts = ['done {}'.format(self._done),
+                 'running {}'.format(len(self._running))]
+        if self._queued is not None:
+            parts.append('queued {}'.format(sum(self._queued.values())))
+            parts.append('ETA {}'.format(_format_duration(
+                self.estimate_remaining(now)
+            )))
+        line = '[{}] {}'.format(_format_duration(now - self._start),
+                                ', '.join(parts))
+        slow_tasks = sorted(
+            ((now - started, each_job.taskname)
+             for each_job, started in self._running.values()
+             if now - started >= SLOW_TASK_THRESHOLD),
+            reverse=True
+        )[:SLOW_TASKS_SHOWN]
+        if slow_tasks:
+            line += ' | ' + ', '.join(
+                '{} ({})'.format(taskname, _format_duration(elapsed))
+                for elapsed, taskname in slow_tasks
+            )
+        return line
+
+    def estimate_remaining(self, now):
+        """Estimate seconds until queued and running jobs finish."""
+        remaining = sum(self._history.expected(checkername) * count
+                        for checkername, count in self._queued.items())
+        for each_job, started in self._running.values():
+            remaining += max(
+                self._history.expected(each_job.checkername)
+                - (now - started), 0
+            )
+        return remaining / self._total_slots
+
+    def _dequeue(self, job):
+        if self._queued is not None and self._queued[job.checkername] > 0:
+            self._queued[job.checkername] -= 1
+
+    def _draw(self):
+        now = time.monotonic()
+        if now - self._last_draw < self.interval:
+            return
+        self._last_draw = now
+        line = self.format_line()
+        if self._is_terminal:
+            width = shutil.get_terminal_size().columns
+            self._stream.write('\r' + line[:width - 1] + '\033[K')
+            self._is_drawn = True
+        else:
+            self._stream.write(line + '\n')
+        self._stream.flush()
+
+    def _clear(self):
+        if self._is_drawn:
+            self._stream.write('\r\033[K')
+            self._stream.flush()
+            self._is_drawn = False
+
+
+def _format_duration(seconds):
+    """Format seconds as 1h02m, 3m05s or 12s."""
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return '{}h{:02d}m'.format(seconds // 3600, seconds % 3600 // 60)
+    if seconds >= 60:
+        return '{}m{:02d}s'.format(seconds // 60, seconds % 60)
+    return '{}s'.format(seconds)
@@ -4,4 +4,5 @@ Exports:
 
 - :mod:`codechecker.scripts.runner` - run code checkers
 - :mod:`codechecker.scripts.hooksetup` - setup pre-commit hook
+- :mod:`codechecker.scripts.cacheserver` - run reference results cache server
 """
@@ -0,0 +1,31 @@
+"""Run reference results cache server.
+
+see :class:`codechecker.cache.CacheServer`
+"""
+import argparse
+
+from codechecker.cache import CacheServer
+
+
+def main():
+    """Serve results cache until interrupted.
+
+    Results are kept in memory, so server is suitable for tests and local
+    experiments only.
+    """
+    parser = argparse.ArgumentParser(
+        prog='check-code-cache-server',
+        description='Serve code-checker results cache over HTTP'
+    )
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    args = parser.parse_args()
+
+    server = CacheServer(args.host, args.port)
+    print('Serving results cache on {}'.format(server.url))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -1,26 +1,32 @@
 """Setup git pre-commit hooks in repository."""
+import argparse
 import os
 import stat
 from codechecker import git
 
 
-def main():
+def main(argv=None):
     """Create pre-commit hook and checkers config.
 
     - Create pre-commit hook, if pre-commit hook already exists raise exception
+    - With --pre-push option create pre-push hook checking pushed commits
+      instead
     - Create precommit-checkers.yml if does not exists yet
     """
+    parser = argparse.ArgumentParser(
+        prog='setup-githook',
+        description='Setup git hook running code checkers'
+    )
+    parser.add_argument('--pre-push', action='store_true',
+                        help='create pre-push hook checking files changed'
+                        ' in pushed commits')
+    args = parser.parse_args(argv)
+
     repo_dir = git.find_repository_dir(os.getcwd())
-    precommit_hook_path = os.path.join(repo_dir, '.git/hooks/pre-commit')
-    if os.path.isfile(precommit_hook_path):
-        raise RuntimeError('".git/hooks/pre-commit" already exists'
-                           ' Remove existing pre-commit hook'
-                           ' if you want create new')
-    hook_file = open(precommit_hook_path, 'w')
-    hook_file.write(PRECOMMIT_HOOK_CONTENTS)
-    hook_file.close()
-    hook_file_stat = os.stat(precommit_hook_path)
-    os.chmod(precommit_hook_path, hook_file_stat.st_mode | stat.S_IEXEC)
+    if args.pre_push:
+        _create_hook(repo_dir, 'pre-push', PREPUSH_HOOK_CONTENTS)
+    else:
+        _create_hook(repo_dir, 'pre-commit', PRECOMMIT_HOOK_CONTENTS)
 
     checkers_config_path = os.path.join(repo_dir, 'precommit-checkers.yml')
     if not os.path.isfile(checkers_config_path):
@@ -29,5 +35,35 @@ def main():
         checkers_config.close()
 
 
+def _create_hook(repo_dir, hook_name, contents):
+    """Create executable hook, raise exception if hook already exists."""
+    hook_path = os.path.join(repo_dir, '.git/hooks', hook_name)
+    if os.path.isfile(hook_path):
+        raise RuntimeError('".git/hooks/{0}" already exists'
+                           ' Remove existing {0} hook'
+                           ' if you want create new'.format(hook_name))
+    hook_file = open(hook_path, 'w')
+    hook_file.write(contents)
+    hook_file.close()
+    hook_file_stat = os.stat(hook_path)
+    os.chmod(hook_path, hook_file_stat.st_mode | stat.S_IEXEC)
+
+
 PRECOMMIT_HOOK_CONTENTS = """check-code;
 exit $?;"""
+
+# git passes pushed refs on stdin, check each pushed range
+PREPUSH_HOOK_CONTENTS = """#!/bin/sh
+zero=0000000000000000000000000000000000000000
+while read local_ref local_sha remote_ref remote_sha; do
+    if [ "$local_sha" = "$zero" ]; then
+        continue;
+    fi
+    if [ "$remote_sha" = "$zero" ]; then
+        range="$local_sha";
+    else
+        range="$remote_sha..$local_sha";
+    fi
+    check-code --range "$range" || exit 1;
+done
+exit 0;"""
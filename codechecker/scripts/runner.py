@@ -2,130 +2,172 @@
 
 see :func:`codechecker.scripts.runner.main`
 """
+import argparse
+import contextlib
+import os
 import sys
-import fnmatch
 
-import yaml
-
-from codechecker import worker
+from codechecker import api
 from codechecker import git
-from codechecker.checker.builder import (CheckListBuilder,
-                                         TaskCreator)
-from codechecker.checkers_spec import (PROJECT_CHECKERS,
-                                       FILE_CHECKERS)
+from codechecker import progress
+from codechecker import worker
+from codechecker.agent import AgentServer
+from codechecker.worker import (LAST_RUN_DIR,
+                                WORKERS_COUNT)
 
 
-def main():
-    """Run checkers.
+DEFAULT_AGENT_PORT = 7070
 
-    1. Load checkers configuration from precommit-checkers.yml
 
-    2. Use :py:class:`codechecker.checker.builder.CheckListBuilder` to create
-    list of all configured checkers for project and staged files
+def main(argv=None):
+    """Run checkers.
+
+    1. Load checkers configuration from precommit-checkers.yml and create
+    checker tasks for project and staged files, see
+    :py:func:`codechecker.api.prepare`
 
-    3. Next call :py:func:`codechecker.worker.execute_checkers` to
+    2. Next call :py:func:`codechecker.worker.execute_checkers` to
     execute created checker tasks and print checkers result
 
-    4. If :py:func:`codechecker.worker.execute_checkers` return non
+    3. If :py:func:`codechecker.worker.execute_checkers` return non
     empty value script exits with status 1 so commit is aborted
+
+    ``check-code agent`` runs agent executing checkers sent by other
+    machines instead, see :mod:`codechecker.agent`
     """
-    checkers_data = yaml.load(open('precommit-checkers.yml', 'r'))
-    _validate_checkers_data(checkers_data)
-    checklist_builder = _init_checkers_builder()
-    if 'config' in checkers_data:
-        _set_checkers_config(checklist_builder, checkers_data['config'])
-    if 'project-checkers' in checkers_data:
-        _create_project_checkers(checklist_builder,
-                                 checkers_data['project-checkers'])
-    if 'file-checkers' in checkers_data:
-        _create_file_checkers(checklist_builder,
-                              checkers_data['file-checkers'])
-
-    return _execute_checkers(checklist_builder.get_result())
-
-
-def _init_checkers_builder():
-    project_chekcers = {}
-    for each_checker in PROJECT_CHECKERS:
-        project_chekcers[each_checker] = TaskCreator(
-            each_checker,
-            **PROJECT_CHECKERS[each_checker]
-        )
-    file_checkers = {}
-    for each_checker in FILE_CHECKERS:
-        file_checkers[each_checker] = TaskCreator(
-            each_checker,
-            **FILE_CHECKERS[each_checker]
-        )
-    checklist_builder = CheckListBuilder(
-        project_chekcers,
-        file_checkers
+    args = _parse_args(argv)
+    if args.command == 'agent':
+        return _serve_agent(args)
+    timer = api.PhaseTimer()
+    with contextlib.ExitStack() as context:
+        if args.all:
+            context.callback(_report_throughput, timer)
+        if args.timings or args.timings_json:
+            context.callback(timer.report, args.timings, args.timings_json)
+        if args.watch:
+            return api.watch(jobs=args.jobs, agents=args.agents)
+        plan = context.enter_context(api.prepare(
+            revrange=args.range, all_files=args.all, jobs=args.jobs,
+            agents=args.agents, timer=timer, snapshot=args.snapshot
+        ))
+        monitor = _create_monitor(plan.tasks, args.timings, args.progress)
+        with timer.measure('execute'):
+            return _execute_checkers(plan.tasks, monitor=monitor,
+                                     compact=args.compact, **plan.options)
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog='check-code',
+        description='Run checkers defined in precommit-checkers.yml'
+    )
+    mode_group = parser.add_mutually_exclusive_group()
+    mode_group.add_argument('--range', metavar='REVRANGE',
+                            help='check files changed in commits range'
+                            ' (e.g. origin/main..HEAD) instead of staged'
+                            ' files, files are checked as they are in range'
+                            ' tip')
+    mode_group.add_argument('--all', action='store_true',
+                            help='check all files in repository')
+    mode_group.add_argument('--watch', action='store_true',
+                            help='check files again whenever they change,'
+                            ' results are stored in results cache')
+    mode_group.add_argument('--snapshot', action='store_true',
+                            help='check staged files exactly as they will'
+                            ' be committed, checkers are executed in'
+                            ' temporary snapshot of git index')
+    output_group = parser.add_mutually_exclusive_group()
+    output_group.add_argument('--compact', dest='compact',
+                              action='store_const', const=True,
+                              help='print only failed checkers, write full'
+                              ' messages to ' + LAST_RUN_DIR +
+                              ' (default when output is not terminal)')
+    output_group.add_argument('--full', dest='compact',
+                              action='store_const', const=False,
+                              help='print every checker result with full'
+                              ' message (default on terminal)')
+    parser.add_argument('-j', '--jobs', type=int,
+                        help='number of checkers executed at once, number'
+                        ' of available CPUs by default')
+    parser.add_argument('--timings', action='store_true',
+                        help='print slowest checkers, worker slots usage'
+                        ' and duration of run phases')
+    parser.add_argument('--timings-json', metavar='PATH',
+                        help='write duration of run phases to JSON file')
+    progress_group = parser.add_mutually_exclusive_group()
+    progress_group.add_argument('--progress', dest='progress',
+                                action='store_const', const=True,
+                                help='show progress line (default on'
+                                ' terminal or when CI variable is set)')
+    progress_group.add_argument('--no-progress', dest='progress',
+                                action='store_const', const=False,
+                                help='do not show progress line')
+    parser.add_argument('--agents',
+                        help='comma separated addresses (host:port) of'
+                        ' agents executing file checkers')
+    subparsers = parser.add_subparsers(dest='command')
+    agent_parser = subparsers.add_parser(
+        'agent',
+        help='execute checkers sent by other machines'
     )
-    return checklist_builder
-
-
-def _validate_checkers_data(checkers_data):
-    """Check if precommit-checkers.yml contains valid options only."""
-    for each_option in checkers_data:
-        if each_option not in ('config', 'project-checkers', 'file-checkers'):
-            raise ValueError('precommit-checkers.yml contains'
-                             ' invalid option "{}"'.format(each_option))
-
-
-def _set_checkers_config(checklist_builder, config):
-    """Configure checker factories."""
-    for each_checker, each_conf in list(config.items()):
-        checklist_builder.configure_checker(each_checker, each_conf)
-
-
-def _create_project_checkers(checklist_builder, checkers):
-    """Create project checkers."""
-    if isinstance(checkers, str):
-        checkers = [checkers]
-    for each_checker in checkers:
-        checklist_builder.add_project_checker(each_checker)
-
-
-def _create_file_checkers(checklist_builder, checkers):
-    """Create file checkers."""
-    staged_files = git.get_staged_files()
-    files_previously_matched = set()
-    patterns_sorted = _sort_file_patterns(list(checkers.keys()))
-    for path_pattern in patterns_sorted:
-        checkers_list = checkers[path_pattern]
-        if isinstance(checkers_list, str):
-            checkers_list = [checkers_list]
-        matched_files = set(fnmatch.filter(staged_files, path_pattern))
-        # Exclude files that match more specific pattern
-        files_to_check = matched_files - files_previously_matched
-        files_previously_matched.update(files_to_check)
-        for each_file in files_to_check:
-            checklist_builder.add_checkers_for_file(each_file, checkers_list)
-
-
-def _execute_checkers(checker_tasks):
-    if worker.execute_checkers(checker_tasks):
+    agent_parser.add_argument('--host', default='127.0.0.1')
+    agent_parser.add_argument('--port', type=int,
+                              default=DEFAULT_AGENT_PORT)
+    agent_parser.add_argument('--capacity', type=int,
+                              default=WORKERS_COUNT,
+                              help='number of concurrently executed tasks')
+    return parser.parse_args(argv)
+
+
+def _serve_agent(args):
+    """Execute tasks sent by other machines until interrupted."""
+    server = AgentServer(args.host, args.port, args.capacity)
+    print('Agent listening on {}'.format(server.address))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+def _execute_checkers(checker_tasks, **options):
+    options = {name: value for name, value in options.items()
+               if value is not None}
+    if worker.execute_checkers(checker_tasks, **options):
         sys.exit(1)
     else:
         return 0
 
 
-def _sort_file_patterns(pattern_list):
-    """Sort file patterns.
+def _create_monitor(checker_tasks, timings, show_progress):
+    """Create monitor of executed tasks.
 
-    Sort file patterns so that more specific patterns are before more generic
-    patterns. For example if we have patterns ['*.py', 'tests/*.py'] result
-    should be ['tests/*.py', '*.py']
+    :param show_progress: show progress line, None shows it if stderr is
+        terminal or CI environment variable is set
+    :returns: monitor or None if nothing is monitored
     """
-    patterns_sorted = []
-    for pattern_to_insert in pattern_list:
-        for index, pattern_inserted in enumerate(patterns_sorted):
-            if fnmatch.fnmatch(pattern_to_insert, pattern_inserted):
-                # more generic pattern is already inserted into result list
-                # so pattern_to_insert must by inserted before
-                patterns_sorted.insert(index, pattern_to_insert)
-                break
-        else:
-            # there is not more generic patterns in result list
-            patterns_sorted.append(pattern_to_insert)
-    return patterns_sorted
+    if show_progress is None:
+        show_progress = sys.stderr.isatty() or 'CI' in os.environ
+    monitors = []
+    if timings:
+        monitors.append(worker.TimingsMonitor())
+    if show_progress:
+        monitors.append(progress.ProgressMonitor(
+            checker_tasks,
+            progress.DurationHistory(git.abspath(progress.HISTORY_FILE))
+        ))
+    if not monitors:
+        return None
+    if len(monitors) == 1:
+        return monitors[0]
+    return worker.MonitorGroup(monitors)
+
+
+def _report_throughput(timer):
+    """Print number of checked files per second."""
+    elapsed_time = max(timer.elapsed(), 1e-9)
+    print('Scanned {} files in {:.2f}s ({:.1f} files/s)'.format(
+        timer.files_count, elapsed_time, timer.files_count / elapsed_time
+    ))
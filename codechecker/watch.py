@@ -0,0 +1,364 @@
+"""Check files continuously while they are edited.
+
+Working tree is watched with inotify (or polled where inotify is not
+available). Changes are debounced and only file checkers of changed files
+are executed. Working tree contents are hashed with ``git hash-object``,
+so results are stored in results cache under ids of blobs which are
+created when files are staged and pre-commit hook finds them in cache.
+
+Exports:
+
+* :func:`watch` - check changed files until interrupted
+* :func:`create_watcher` - create best available watcher
+* :func:`wait_for_changes` - wait for debounced batch of changes
+* :class:`InotifyWatcher` - watch directory tree using inotify
+* :class:`PollingWatcher` - watch directory tree by polling
+* :class:`ResultTable` - continuously updated table of results
+"""
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import time
+from os import path
+
+from codechecker import git
+from codechecker import worker
+from codechecker.checker.task import CheckResult
+
+
+DEBOUNCE = 0.3
+POLL_INTERVAL = 1.0
+# max number of message lines of failed task shown in table
+MESSAGE_LINES = 10
+
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = getattr(os, 'O_CLOEXEC', 0o2000000)
+_WATCH_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | \
+    _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_EVENT_HEADER = struct.Struct('iIII')
+
+# directories never containing checked files
+_EXCLUDED_DIRS = frozenset(['.git'])
+
+
+def watch(create_tasks, cache, debounce=DEBOUNCE, **options):
+    """Check changed files until interrupted.
+
+    Files changed since last commit are checked first, then files changed
+    in working tree. Results of tasks which checked file has changed again
+    before task finished are dropped and file is checked again.
+
+    :param create_tasks: function creating tasks for iterable of tuples of
+        file path and blob id
+    :param cache: results cache, see :mod:`codechecker.cache`
+    :param options: options passed to
+        :func:`codechecker.worker.iter_results`
+    :returns: 0 when interrupted
+    """
+    table = ResultTable()
+    watcher = create_watcher(os.getcwd())
+    try:
+        changed_files = set(git.get_changed_files())
+        table.draw()
+        while True:
+            if watcher.overflowed:
+                # some events were lost
+                watcher.overflowed = False
+                changed_files.update(git.get_changed_files())
+            if changed_files:
+                changed_files = _check_files(changed_files, create_tasks,
+                                             cache, watcher, table, options)
+            else:
+                changed_files = wait_for_changes(watcher, debounce)
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        watcher.close()
+
+
+def _check_files(changed_files, create_tasks, cache, watcher, table,
+                 options):
+    # pylint: disable=too-many-arguments
+    """Check changed files.
+
+    :returns: files which changed again while they were checked
+    """
+    checked_files = git.get_worktree_files(changed_files)
+    table.remove_files(changed_files)
+    file_stats = {each_file: _stat(each_file) for each_file in checked_files}
+    blob_ids = git.hash_worktree_files(checked_files)
+    tasks = create_tasks(
+        (each_file, blob_ids.get(each_file)) for each_file in checked_files
+    )
+    table.add_tasks(tasks)
+    table.draw()
+
+    def is_cancelled(task):
+        """Check if checked file changed since it was hashed.
+
+        Only checked file is stat-ed, watcher is read once all tasks are
+        done, because polling watcher scans whole working tree.
+        """
+        return _stat(task.relpath) != file_stats.get(task.relpath)
+
+    for result in worker.iter_results(tasks, cache,
+                                      is_cancelled=is_cancelled, **options):
+        table.update(result)
+        table.draw()
+    return watcher.read_changes(0)
+
+
+def _stat(file_relpath):
+    """Get data identifying version of file."""
+    try:
+        file_stat = os.stat(file_relpath)
+    except OSError:
+        return None
+    return file_stat.st_mtime_ns, file_stat.st_size
+
+
+def create_watcher(root):
+    """Create inotify watcher, or polling watcher if inotify is missing."""
+    try:
+        return InotifyWatcher(root)
+    except OSError:
+        return PollingWatcher(root)
+
+
+def wait_for_changes(watcher, debounce=DEBOUNCE):
+    """Wait for changes and return them when files are quiet.
+
+    Changes are collected until no file changes for debounce seconds, so
+    files saved at once (e.g. by editor or git checkout) are checked
+    together.
+
+    :returns: set of changed files paths relative to watched directory
+    """
+    changed_files = set()
+    while not (changed_files or watcher.overflowed):
+        changed_files = watcher.read_changes(None)
+    while True:
+        new_changes = watcher.read_changes(debounce)
+        if not new_changes:
+            return changed_files
+        changed_files.update(new_changes)
+
+
+class InotifyWatcher:
+    """Watch directory tree using Linux inotify.
+
+    Every directory is watched separately, watches are added to created
+    directories.
+    """
+
+    def __init__(self, root):
+        """Start watching directory tree.
+
+        :raises: :exc:`OSError` if inotify is not available
+        """
+        libc_name = ctypes.util.find_library('c')
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self._libc, 'inotify_init1'):
+            raise OSError(errno.ENOSYS, 'inotify is not available')
+        self._fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self._root = root
+        self._dirs = {}
+        self.overflowed = False
+        self._add_tree('')
+
+    def read_changes(self, timeout):
+        """Wait for changes at most timeout seconds.
+
+        :param timeout: seconds, None waits until some file changes
+        :returns: set of changed files paths relative to watched directory
+        """
+        changed_files = set()
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return changed_files
+        try:
+            data = os.read(self._fd, 65536)
+        except BlockingIOError:
+            return changed_files
+        offset = 0
+        while offset < len(data):
+            watch_descriptor, mask, _, name_length = \
+                _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + name_length].rstrip(b'\0')
+            offset += name_length
+            if mask & _IN_Q_OVERFLOW:
+                self.overflowed = True
+                continue
+            dir_relpath = self._dirs.get(watch_descriptor)
+            if dir_relpath is None or not name:
+                continue
+            relpath = path.join(dir_relpath, os.fsdecode(name))
+            if mask & _IN_ISDIR:
+                if mask & (_IN_CREATE | _IN_MOVED_TO):
+                    # files could be created before watch was added
+                    changed_files.update(self._add_tree(relpath))
+            else:
+                changed_files.add(relpath)
+        return changed_files
+
+    def close(self):
+        """Stop watching."""
+        os.close(self._fd)
+
+    def _add_tree(self, dir_relpath):
+        """Watch directory and its subdirectories.
+
+        :returns: files found in directories
+        """
+        found_files = []
+        for dir_path, dir_names, file_names in os.walk(
+                path.join(self._root, dir_relpath)):
+            dir_names[:] = [each_dir for each_dir in dir_names
+                            if each_dir not in _EXCLUDED_DIRS]
+            relpath = path.relpath(dir_path, self._root)
+            relpath = '' if relpath == os.curdir else relpath
+            watch_descriptor = self._libc.inotify_add_watch(
+                self._fd, os.fsencode(dir_path), _WATCH_MASK
+            )
+            if watch_descriptor >= 0:
+                self._dirs[watch_descriptor] = relpath
+            found_files.extend(path.join(relpath, each_file)
+                               for each_file in file_names)
+        return found_files
+
+
+class PollingWatcher:
+    """Watch directory tree by comparing files modification times."""
+
+    def __init__(self, root, interval=POLL_INTERVAL):
+        """Remember current state of files."""
+        self._root = root
+        self._interval = interval
+        self.overflowed = False
+        self._state = self._scan()
+
+    def read_changes(self, timeout):
+        """Wait for changes at most timeout seconds.
+
+        :param timeout: seconds, None waits until some file changes
+        :returns: set of changed files paths relative to watched directory
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            state = self._scan()
+            changed_files = {
+                each_file for each_file in set(state) | set(self._state)
+                if state.get(each_file) != self._state.get(each_file)
+            }
+            self._state = state
+            if changed_files:
+                return changed_files
+            if deadline is None:
+                time.sleep(self._interval)
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return changed_files
+            time.sleep(min(self._interval, remaining))
+
+    def close(self):
+        """Stop watching."""
+        pass
+
+    def _scan(self):
+        state = {}
+        for dir_path, dir_names, file_names in os.walk(self._root):
+            dir_names[:] = [each_dir for each_dir in dir_names
+                            if each_dir not in _EXCLUDED_DIRS]
+            for each_file in file_names:
+                file_path = path.join(dir_path, each_file)
+                try:
+                    file_stat = os.stat(file_path)
+                except OSError:
+                    continue
+                state[path.relpath(file_path, self._root)] = \
+                    (file_stat.st_mtime_ns, file_stat.st_size)
+        return state
+
+
+class ResultTable:
+    """Table of latest results of checked files.
+
+    Table is redrawn after every change, on terminal it replaces previous
+    table.
+    """
+
+    def __init__(self, stream=None):
+        """Set output stream, stdout by default."""
+        self._stream = stream or sys.stdout
+        self._rows = {}
+        self._relpaths = {}
+
+    def add_tasks(self, tasks):
+        """Show tasks as pending."""
+        for each_task in tasks:
+            self._rows[each_task.taskname] = None
+            self._relpaths[each_task.taskname] = each_task.relpath
+
+    def update(self, result):
+        """Show task result."""
+        self._rows[result.taskname] = result
+
+    def remove_files(self, relpaths):
+        """Remove rows of tasks checking passed files."""
+        relpaths = set(relpaths)
+        for each_taskname in list(self._rows):
+            if self._relpaths.get(each_taskname) in relpaths:
+                del self._rows[each_taskname]
+                del self._relpaths[each_taskname]
+
+    def draw(self):
+        """Print table.
+
+        If output is not terminal, table is printed only when every task
+        has finished.
+        """
+        lines = []
+        pending = 0
+        failed = 0
+        for each_taskname in sorted(self._rows):
+            result = self._rows[each_taskname]
+            if result is None:
+                pending += 1
+                lines.append('* {}: ...'.format(each_taskname))
+                continue
+            lines.append(worker.format_result(result))
+            if result.status == CheckResult.ERROR:
+                failed += 1
+                if result.message:
+                    lines.extend(
+                        '    ' + each_line for each_line in
+                        result.message.splitlines()[:MESSAGE_LINES]
+                    )
+        if pending and not self._stream.isatty():
+            # table can not be redrawn, print only complete table
+            return
+        lines.append('-' * 80)
+        lines.append('{} tasks, {} pending, {} failed, watching for'
+                     ' changes (Ctrl+C to stop)'
+                     .format(len(self._rows), pending, failed))
+        if self._stream.isatty():
+            # clear screen and move cursor to top left corner
+            self._stream.write('\033[H\033[2J')
+        self._stream.write('\n'.join(lines) + '\n')
+        self._stream.flush()
@@ -2,53 +2,718 @@
 
 Exports:
 
-- :py:func:`execute_checkers` - Execute checkers
+- :py:func:`execute_checkers` - Execute checkers and print results
+- :py:func:`iter_results` - Execute checkers and yield results
+- :py:func:`format_result` - Format check result summary line
+- :py:class:`Monitor` - Receive notifications about executed jobs
+- :py:class:`TimingsMonitor` - Print slowest jobs and slot usage
+- :py:class:`MonitorGroup` - Notify several monitors
+- :py:class:`ResultSummary` - Count results, keep details of problems
+- :py:class:`FullReport` - Print every result with message
+- :py:class:`CompactReport` - Print failures only, write messages to logs
 """
-import multiprocessing as mp
+import collections
+import concurrent.futures as futures
+import heapq
+import itertools
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+from os import path
 
+from codechecker import git
+from codechecker.agent import AgentUnavailableError
 from codechecker.checker.task import CheckResult
+from codechecker.concurrency import (available_cpus,
+                                     LoadController)
+from codechecker.jobserver import JobServer
 
 
-WORKERS_COUNT = mp.cpu_count()
+WORKERS_COUNT = available_cpus()
+# seconds between checks of cancel event while jobs are running
+_CANCEL_INTERVAL = 0.1
+# seconds between attempts to acquire jobserver tokens
+_TOKEN_INTERVAL = 0.1
+# number of cache lookups running at once, jobs are looked up ahead
+_CACHE_LOOKUPS = 8
+# logs of last run written in compact output mode
+LAST_RUN_DIR = '.git/code-checker/last-run'
 
 
-def execute_checkers(jobs):
+def execute_checkers(jobs, cache=None, agents=None, workers_count=None,
+                     adaptive=True, monitor=None, speculative=False,
+                     compact=None, jobserver=False):
     """Execute checkers and return status information.
 
     Execute checkers passed as argument in couple of concurrent processes,
     for every job prints result information
     and return value indicating if all jobs succeed.
 
+    See :func:`iter_results` for parameters description.
+
+    :param compact: if true, only failed jobs are printed and messages are
+        written to :data:`LAST_RUN_DIR` (see :class:`CompactReport`), by
+        default compact output is used when stdout is not terminal
+    :param jobserver: if true, checkers share slots through jobserver
+        created by check-code (see :func:`iter_results`)
     :return: 0 if all checks passed, 1 if at least one does not
     :rtype: integer
     """
-    # Prepare workers and process jobs
-    pool = mp.Pool(processes=WORKERS_COUNT)
-    results = [pool.apply_async(job) for job in jobs]
-
-    # Check results
-    is_ok = True
-    for result in results:
-        result = result.get()
-        _print_result(result)
-        if result.status == CheckResult.ERROR:
-            is_ok = False
-    print(('-' * 80))
-    if is_ok:
-        print((_success('OK')))
+    # pylint: disable=too-many-arguments
+    if compact is None:
+        compact = not sys.stdout.isatty()
+    if compact:
+        report = CompactReport(git.abspath(LAST_RUN_DIR))
     else:
-        print((_error('Commit aborted')))
+        report = FullReport()
+    counters = collections.Counter()
+    jobs = _count_duplicates(jobs, counters)
+    with ResultSummary() as summary:
+        for result in iter_results(jobs, cache, agents, workers_count,
+                                   adaptive, monitor, speculative=speculative,
+                                   counters=counters, jobserver=jobserver):
+            report.add(result)
+            summary.add(result)
+        if monitor is not None:
+            monitor.run_finished()
+        notes = []
+        if counters['duplicates']:
+            notes.append('Deduplicated executions: {} (identical file'
+                         ' contents)'.format(counters['duplicates']))
+        if counters['skipped']:
+            notes.append('Skipped tasks: {} (earlier tier failed)'
+                         .format(counters['skipped']))
+        report.finish(summary, notes)
 
-    if is_ok:
+    if summary.is_ok:
         return 0
     else:
         return 1
 
 
-def _print_result(result):
-    """Print colorized check result.
+def iter_results(jobs, cache=None, agents=None, workers_count=None,
+                 adaptive=True, monitor=None, is_cancelled=None,
+                 executor=None, cancel=None, speculative=False,
+                 counters=None, jobserver=False):
+    """Execute checkers and yield results in order of completion.
+
+    Jobs are consumed lazily, so only running jobs and small lookahead
+    buffer are kept in memory.
+
+    Job duplicates (see
+    :func:`codechecker.checker.builder.group_duplicate_tasks`) are not
+    executed, they reuse job result.
+
+    Local jobs share workers_count slots, every job consumes job.weight
+    slots and at most job.max_parallel jobs of one checker run at once.
+    Jobs are admitted in order, so heavy job is not starved by light ones,
+    only jobs of checker which reached its max_parallel are skipped.
+
+    Jobs are gated by job.tier: job starts only after jobs of lower tiers
+    finished (or, if speculative, when lower tiers leave free slots) and
+    when job of some tier fails, jobs of higher tiers are skipped and
+    results of already running ones are dropped. Jobs should be ordered by
+    tier.
+
+    :param cache: results cache, jobs which results are found in cache are
+        not executed, see :class:`codechecker.cache.RemoteResultCache`;
+        jobs are looked up by several threads, jobs which results are not
+        cached are started in order while next jobs are looked up
+    :param agents: remote agents executing file checkers, see
+        :class:`codechecker.agent.AgentPool`
+    :param workers_count: max number of slots used locally at once,
+        :data:`WORKERS_COUNT` by default
+    :param adaptive: if true, number of slots used at once is reduced
+        when system is loaded, see
+        :class:`codechecker.concurrency.LoadController`
+    :param monitor: receives notifications about started and finished
+        jobs, see :class:`Monitor`
+    :param is_cancelled: function called with job before it is started and
+        when it finishes, if it returns true job is not started or its
+        result is dropped (e.g. checked file has changed meanwhile)
+    :param executor: :class:`concurrent.futures.Executor` executing local
+        jobs instead of new process pool, it is not shut down
+    :param cancel: object with ``is_set()`` method (e.g.
+        :class:`threading.Event`), when it is set no more jobs are started
+        and iteration ends
+    :param speculative: start jobs of higher tiers while lower tiers are
+        running
+    :param counters: :class:`collections.Counter` counting jobs (with
+        duplicates) skipped because lower tier failed (``'skipped'``)
+    :param jobserver: if true, jobserver holding workers_count slots is
+        created and passed to checkers in MAKEFLAGS, so checkers
+        parallelizing themselves share slots with check-code; jobserver of
+        make running check-code is used if MAKEFLAGS contains it
+    :rtype: iterator of :class:`codechecker.checker.task.CheckResult`
+    """
+    # pylint: disable=too-many-arguments,too-many-branches,too-many-locals
+    # pylint: disable=too-many-statements
+    workers_count = workers_count or WORKERS_COUNT
+    counters = collections.Counter() if counters is None else counters
+    controller = LoadController(workers_count) if adaptive else None
+    remote_capacity = agents.capacity if agents is not None else 0
+    token_server = JobServer.from_environ()
+    if token_server is None and jobserver:
+        token_server = JobServer.create(workers_count)
+    scheduler = _Scheduler(workers_count, controller, remote_capacity,
+                           speculative, token_server)
+    local_executor = executor or futures.ProcessPoolExecutor(workers_count)
+    remote_executor = None
+    if remote_capacity:
+        # dispatching threads only wait for agents responses
+        remote_executor = futures.ThreadPoolExecutor(remote_capacity)
+    # in-process jobs are executed in batches by single thread, so
+    # scheduling loop keeps submitting jobs to worker processes
+    in_process_executor = futures.ThreadPoolExecutor(1)
+    lookup_executor = futures.ThreadPoolExecutor(_CACHE_LOOKUPS) \
+        if cache else None
+    # jobs in order with futures of their cache lookups
+    lookups = collections.deque()
+    jobs = iter(jobs)
+    try:
+        while True:
+            if cancel is not None and cancel.is_set():
+                break
+            # fill lookahead buffer in order of jobs, cached results are
+            # yielded at once
+            while not scheduler.is_full():
+                # look up next jobs in cache
+                while jobs is not None and \
+                        len(lookups) < 2 * _CACHE_LOOKUPS:
+                    job = next(jobs, None)
+                    if job is None:
+                        jobs = None
+                    elif scheduler.is_skipped(job):
+                        _skip_jobs([job], counters, monitor)
+                    elif lookup_executor is None:
+                        lookups.append((job, None))
+                    else:
+                        lookups.append(
+                            (job, lookup_executor.submit(cache.get, job))
+                        )
+                if not lookups:
+                    break
+                job, lookup = lookups[0]
+                if lookup is not None and not lookup.done():
+                    break
+                lookups.popleft()
+                if scheduler.is_skipped(job):
+                    _skip_jobs([job], counters, monitor)
+                    continue
+                cached_result = lookup.result() if lookup else None
+                if cached_result is not None:
+                    if monitor is not None:
+                        monitor.job_cached(job, cached_result)
+                    yield cached_result
+                    yield from _adopt_results(job, cached_result, cache)
+                    if cached_result.status == CheckResult.ERROR:
+                        _skip_jobs(scheduler.fail(job.tier), counters,
+                                   monitor)
+                else:
+                    scheduler.add(job)
+
+            # submit jobs while there are free slots
+            in_process_batch = []
+            while True:
+                job, is_remote = scheduler.pop_admissible(
+                    remote_executor is not None
+                )
+                if job is None:
+                    break
+                if is_cancelled is not None and is_cancelled(job):
+                    scheduler.discard(job)
+                    if monitor is not None:
+                        monitor.job_skipped(job)
+                    continue
+                if token_server is not None:
+                    job.makeflags = token_server.makeflags
+                lent_tokens = scheduler.lend_tokens(job, is_remote)
+                if job.in_process:
+                    future = futures.Future()
+                    in_process_batch.append((job, future))
+                elif is_remote:
+                    future = remote_executor.submit(
+                        _execute_remotely, agents, local_executor, job
+                    )
+                else:
+                    future = local_executor.submit(_execute_timed, job)
+                scheduler.start(future, job, is_remote, lent_tokens)
+                if monitor is not None:
+                    monitor.job_started(job, scheduler.used_slots,
+                                        scheduler.total_slots)
+            if in_process_batch:
+                in_process_executor.submit(_execute_in_process,
+                                           in_process_batch)
+
+            # wake up when next lookup is done
+            pending_lookup = lookups[0][1] if lookups and \
+                not scheduler.is_full() else None
+            if not scheduler.running:
+                if pending_lookup is not None:
+                    futures.wait([pending_lookup])
+                    continue
+                if scheduler.is_empty() and not lookups and jobs is None:
+                    break
+                continue
+            # wake up periodically, so concurrency limit can be raised
+            # and cancellation is noticed
+            timeout = controller.interval if controller else None
+            if cancel is not None:
+                timeout = min(timeout or _CANCEL_INTERVAL, _CANCEL_INTERVAL)
+            if monitor is not None and monitor.interval is not None:
+                timeout = min(timeout or monitor.interval, monitor.interval)
+            if token_server is not None and not scheduler.is_empty():
+                # tokens may be released by other processes
+                timeout = min(timeout or _TOKEN_INTERVAL, _TOKEN_INTERVAL)
+            waited_futures = list(scheduler.running)
+            if pending_lookup is not None:
+                waited_futures.append(pending_lookup)
+            done, _ = futures.wait(
+                waited_futures,
+                timeout=timeout,
+                return_when=futures.FIRST_COMPLETED
+            )
+            if monitor is not None:
+                monitor.tick()
+            for each_future in done:
+                if each_future is pending_lookup:
+                    continue
+                job = scheduler.finish(each_future)
+                result, duration = each_future.result()
+                if monitor is not None:
+                    monitor.job_finished(job, result, duration)
+                if is_cancelled is not None and is_cancelled(job):
+                    continue
+                if cache:
+                    cache.put(job, result)
+                if scheduler.is_skipped(job):
+                    # speculatively started, lower tier failed meanwhile
+                    counters['skipped'] += 1 + len(job.duplicates)
+                    continue
+                yield result
+                yield from _adopt_results(job, result, cache)
+                if result.status == CheckResult.ERROR:
+                    _skip_jobs(scheduler.fail(job.tier), counters, monitor)
+    finally:
+        for each_future, each_job in scheduler.running.items():
+            if each_job.in_process:
+                each_future.cancel()
+        in_process_executor.shutdown(cancel_futures=True)
+        if lookup_executor is not None:
+            lookup_executor.shutdown(cancel_futures=True)
+        if remote_executor is not None:
+            remote_executor.shutdown(cancel_futures=True)
+        if executor is None:
+            local_executor.shutdown(cancel_futures=True)
+        else:
+            # injected executor is owned by caller, only drop our jobs
+            for each_future in scheduler.running:
+                each_future.cancel()
+        if token_server is not None:
+            scheduler.release_tokens()
+            token_server.close()
+
+
+class Monitor:
+    """Receive notifications about executed jobs.
+
+    Base class does nothing, subclasses override methods they need.
+    """
+
+    # seconds between tick() calls while jobs are running, None if monitor
+    # does not need ticks
+    interval = None
+
+    def job_started(self, job, used_slots, total_slots):
+        """Job was submitted.
+
+        :param used_slots: local slots used including this job
+        :param total_slots: local slots available at this moment
+        """
+        pass
+
+    def job_finished(self, job, result, duration):
+        """Job finished in duration seconds."""
+        pass
+
+    def job_cached(self, job, result):
+        """Job result was found in cache, job is not executed."""
+        pass
+
+    def job_skipped(self, job):
+        """Job is not executed (earlier tier failed or job was cancelled)."""
+        pass
+
+    def tick(self):
+        """Called periodically while jobs are running."""
+        pass
+
+    def run_finished(self):
+        """All jobs finished."""
+        pass
+
+
+class MonitorGroup(Monitor):
+    """Pass notifications to several monitors."""
+
+    def __init__(self, monitors):
+        """Set notified monitors."""
+        self._monitors = list(monitors)
+        intervals = [each_monitor.interval for each_monitor in self._monitors
+                     if each_monitor.interval is not None]
+        self.interval = min(intervals) if intervals else None
+
+    def job_started(self, job, used_slots, total_slots):
+        """Notify every monitor."""
+        for each_monitor in self._monitors:
+            each_monitor.job_started(job, used_slots, total_slots)
+
+    def job_finished(self, job, result, duration):
+        """Notify every monitor."""
+        for each_monitor in self._monitors:
+            each_monitor.job_finished(job, result, duration)
+
+    def job_cached(self, job, result):
+        """Notify every monitor."""
+        for each_monitor in self._monitors:
+            each_monitor.job_cached(job, result)
+
+    def job_skipped(self, job):
+        """Notify every monitor."""
+        for each_monitor in self._monitors:
+            each_monitor.job_skipped(job)
+
+    def tick(self):
+        """Notify every monitor."""
+        for each_monitor in self._monitors:
+            each_monitor.tick()
 
-    :type value: checker.CheckResult
+    def run_finished(self):
+        """Notify every monitor."""
+        for each_monitor in self._monitors:
+            each_monitor.run_finished()
+
+
+class TimingsMonitor(Monitor):
+    """Print slowest jobs and slot usage after run."""
+
+    def __init__(self, limit=20):
+        """Set max number of printed jobs."""
+        self._limit = limit
+        self._started_slots = {}
+        # heap of slowest jobs, fastest first
+        self._timings = []
+        self._sequence = itertools.count()
+        self._peak_slots = 0
+        self._total_slots = 0
+        self._start = time.monotonic()
+
+    def job_started(self, job, used_slots, total_slots):
+        """Remember slot usage at job start."""
+        self._started_slots[id(job)] = (used_slots, total_slots)
+        self._peak_slots = max(self._peak_slots, used_slots)
+        self._total_slots = max(self._total_slots, total_slots)
+
+    def job_finished(self, job, result, duration):
+        """Remember job duration."""
+        slots = self._started_slots.pop(id(job), None)
+        timing = (duration, next(self._sequence), result.taskname,
+                  job.weight, slots)
+        if len(self._timings) < self._limit:
+            heapq.heappush(self._timings, timing)
+        else:
+            heapq.heappushpop(self._timings, timing)
+
+    def run_finished(self):
+        """Print slowest jobs."""
+        print(('-' * 80))
+        print(_bold('Slowest tasks:'))
+        slowest = sorted(self._timings, reverse=True)
+        for duration, _, taskname, weight, slots in slowest:
+            if slots is None:
+                slots_info = 'remote'
+            else:
+                slots_info = 'slots {}/{}'.format(*slots)
+            print('{:8.2f}s  [{}, weight {}]  {}'.format(
+                duration, slots_info, weight, taskname
+            ))
+        print('Wall time {:.2f}s, peak slot usage {}/{}'.format(
+            time.monotonic() - self._start, self._peak_slots,
+            self._total_slots
+        ))
+
+
+class _Scheduler:
+    """Decide which jobs can be started.
+
+    Keep bounded buffer of jobs waiting for execution and bookkeeping of
+    running jobs.
+    """
+
+    def __init__(self, workers_count, controller, remote_capacity,
+                 speculative=False, jobserver=None):
+        # pylint: disable=too-many-instance-attributes,too-many-arguments
+        self.running = {}
+        self.used_slots = 0
+        self._workers_count = workers_count
+        self._controller = controller
+        self._remote_capacity = remote_capacity
+        self._remote_running = 0
+        self._ready = collections.deque()
+        self._lookahead = 2 * workers_count + remote_capacity
+        self._per_checker = collections.Counter()
+        # future -> (job, consumed slots, is remote)
+        self._running_info = {}
+        self._speculative = speculative
+        # number of waiting and running jobs of every tier
+        self._tiers = collections.Counter()
+        self._failed_tier = None
+        # slots except first one are jobserver tokens
+        self._jobserver = jobserver
+        self._tokens = []
+        # tokens of running jobs written back to jobserver, so checkers
+        # taking slots from jobserver themselves can read them
+        self._lent_tokens = 0
+
+    @property
+    def total_slots(self):
+        """Number of local slots available at this moment."""
+        if self._controller is None:
+            return self._workers_count
+        return self._controller.limit(self.used_slots)
+
+    def is_full(self):
+        """Check if lookahead buffer is full."""
+        return len(self._ready) >= self._lookahead
+
+    def is_empty(self):
+        """Check if no job is waiting."""
+        return not self._ready
+
+    def add(self, job):
+        """Add job waiting for execution."""
+        self._ready.append(job)
+        self._tiers[job.tier] += 1
+
+    def discard(self, job):
+        """Forget job removed by :meth:`pop_admissible` and not started.
+
+        Jobserver tokens reserved for job are released.
+        """
+        self._tiers[job.tier] -= 1
+        self.release_tokens(self._needed_tokens())
+
+    def is_skipped(self, job):
+        """Check if job tier is higher than failed tier."""
+        return self._failed_tier is not None and job.tier > self._failed_tier
+
+    def fail(self, tier):
+        """Skip jobs of tiers higher than failed one.
+
+        :returns: list of removed waiting jobs
+        """
+        if self._failed_tier is None or tier < self._failed_tier:
+            self._failed_tier = tier
+        skipped_jobs = [each_job for each_job in self._ready
+                        if self.is_skipped(each_job)]
+        for each_job in skipped_jobs:
+            self._ready.remove(each_job)
+            self.discard(each_job)
+        return skipped_jobs
+
+    def pop_admissible(self, can_run_remotely):
+        """Remove and return first job which can be started now.
+
+        Jobs of checkers which reached max_parallel and jobs waiting for
+        lower tiers are skipped, first remaining job is started if it fits
+        into free slots or it can run on remote agent.
+
+        :returns: tuple (job, is_remote), job is None if no job can start
+        """
+        lowest_tier = min(+self._tiers, default=0)
+        for index, each_job in enumerate(self._ready):
+            if not self._speculative and each_job.tier > lowest_tier:
+                continue
+            if each_job.max_parallel is not None and \
+                    self._per_checker[each_job.checkername] >= \
+                    each_job.max_parallel:
+                continue
+            if can_run_remotely and each_job.relpath is not None and \
+                    each_job.content_hash and not each_job.in_process and \
+                    not each_job.cross_file and \
+                    self._remote_running < self._remote_capacity:
+                is_remote = True
+            else:
+                slots = self._reserve(each_job)
+                if slots is None:
+                    return None, False
+                # checkers parallelizing themselves use granted slots
+                each_job.jobs = max(slots, 1)
+                is_remote = False
+            del self._ready[index]
+            return each_job, is_remote
+        return None, False
+
+    def lend_tokens(self, job, is_remote):
+        """Write tokens reserved for popped job back to jobserver.
+
+        Checker which does not get granted slots in jobs option takes them
+        from jobserver passed in MAKEFLAGS, so tokens reserved for it
+        (except slot of checker process itself) must be readable before it
+        is executed. Slots stay reserved, so other jobs do not use them.
+
+        :returns: number of lent tokens to pass to :meth:`start`
+        """
+        slots = 0 if is_remote or job.in_process else job.jobs
+        if self._jobserver is None or slots <= 1 or \
+                (job.argv_template is not None and
+                 job.argv_template.passes_jobs):
+            return 0
+        lent_tokens = slots - 1
+        self.release_tokens(len(self._tokens) - lent_tokens)
+        self._lent_tokens += lent_tokens
+        return lent_tokens
+
+    def start(self, future, job, is_remote, lent_tokens=0):
+        """Register submitted job."""
+        slots = 0 if is_remote or job.in_process else job.jobs
+        self.running[future] = job
+        self._running_info[future] = slots, is_remote, lent_tokens
+        self.used_slots += slots
+        self._remote_running += is_remote
+        self._per_checker[job.checkername] += 1
+
+    def finish(self, future):
+        """Unregister finished job and return it."""
+        job = self.running.pop(future)
+        slots, is_remote, lent_tokens = self._running_info.pop(future)
+        self.used_slots -= slots
+        self._lent_tokens -= lent_tokens
+        self._remote_running -= is_remote
+        self._per_checker[job.checkername] -= 1
+        self._tiers[job.tier] -= 1
+        self.release_tokens(self._needed_tokens())
+        return job
+
+    def release_tokens(self, kept=0):
+        """Return jobserver tokens which are not needed by running jobs."""
+        while len(self._tokens) > kept:
+            self._jobserver.release(self._tokens.pop())
+
+    def _reserve(self, job):
+        """Reserve slots of job.
+
+        Job heavier than all slots (or than available jobserver tokens)
+        runs alone with slots which are available.
+
+        :returns: number of reserved slots or None if job must wait
+        """
+        slots = self._job_slots(job)
+        if self.used_slots and \
+                self.used_slots + slots > self.total_slots:
+            return None
+        if self._jobserver is None or not slots:
+            return slots
+        # check-code owns one slot, other slots are tokens
+        implicit_slot = 0 if self.used_slots else 1
+        while len(self._tokens) < \
+                self._needed_tokens() + slots - implicit_slot:
+            token = self._jobserver.try_acquire()
+            if token is None:
+                break
+            self._tokens.append(token)
+        available = len(self._tokens) - self._needed_tokens() + \
+            implicit_slot
+        if available >= slots:
+            return slots
+        if self.used_slots:
+            self.release_tokens(self._needed_tokens())
+            return None
+        return available
+
+    def _needed_tokens(self):
+        """Get number of tokens held for running jobs."""
+        return max(self.used_slots - self._lent_tokens - 1, 0)
+
+    def _job_slots(self, job):
+        if job.in_process:
+            return 0
+        return min(job.weight, self._workers_count)
+
+
+def _adopt_results(job, result, cache):
+    """Yield results of job duplicates created from job result."""
+    for each_duplicate in job.duplicates:
+        duplicate_result = each_duplicate.adopt_result(result, job)
+        if cache:
+            cache.put(each_duplicate, duplicate_result)
+        yield duplicate_result
+
+
+def _skip_jobs(jobs, counters, monitor):
+    """Count jobs (with duplicates) which are not executed."""
+    for each_job in jobs:
+        counters['skipped'] += 1 + len(each_job.duplicates)
+        if monitor is not None:
+            monitor.job_skipped(each_job)
+
+
+def _count_duplicates(jobs, counters):
+    """Count duplicates of consumed jobs."""
+    for each_job in jobs:
+        counters['duplicates'] += len(each_job.duplicates)
+        yield each_job
+
+
+def _execute_timed(job):
+    """Execute job and return tuple (result, duration in seconds)."""
+    start = time.monotonic()
+    result = job()
+    return result, time.monotonic() - start
+
+
+def _execute_in_process(batch):
+    """Execute batch of jobs in this process and complete their futures.
+
+    Native checkers are cheaper than submitting job to worker process, so
+    in-process jobs admitted in single pass of scheduling loop are
+    executed together. Jobs which futures were cancelled are skipped.
+
+    :param batch: list of tuples of job and its future
+    """
+    for each_job, each_future in batch:
+        if not each_future.set_running_or_notify_cancel():
+            continue
+        try:
+            each_future.set_result(_execute_timed(each_job))
+        except Exception as error:  # pylint: disable=broad-except
+            each_future.set_exception(error)
+
+
+def _execute_remotely(agents, executor, job):
+    """Execute job on agent, if agents are unavailable execute it locally.
+
+    :returns: tuple (result, duration in seconds)
+    """
+    start = time.monotonic()
+    try:
+        result = agents.execute(
+            job, git.get_shared_blob_reader().read(job.content_hash)
+        )
+    except AgentUnavailableError:
+        return executor.submit(_execute_timed, job).result()
+    return result, time.monotonic() - start
+
+
+def format_result(result):
+    """Format colorized task name and summary of check result.
+
+    :type result: checker.CheckResult
+    :rtype: string
     """
     if result.summary:
         summary_raw = result.summary
@@ -56,10 +721,204 @@ def _print_result(result):
         summary_raw = _DEFAULT_SUMMARY_TEXT[result.status]
     summary = _SUMMARY_FORMAT[result.status](summary_raw)
     taskname = _bold(result.taskname)
+    return '* {task}: {summary}'.format(task=taskname, summary=summary)
+
+
+class ResultSummary:
+    """Count results and keep details of warnings and errors.
+
+    Successful results are only counted. Details of other results are kept
+    in memory up to memory_limit characters, next ones are written to
+    temporary file, so memory used by summary of huge run stays bounded.
+    Summary can be used as context manager closing temporary file.
+    """
+
+    # max number of characters of results kept in memory
+    MEMORY_LIMIT = 4 * 1024 * 1024
+
+    def __init__(self, memory_limit=MEMORY_LIMIT):
+        """Create empty summary."""
+        self.counts = collections.Counter()
+        self._memory_limit = memory_limit
+        self._kept = []
+        self._kept_size = 0
+        self._overflow = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def is_ok(self):
+        """Check that no result is error."""
+        return not self.counts[CheckResult.ERROR]
+
+    @property
+    def total(self):
+        """Number of added results."""
+        return sum(self.counts.values())
+
+    def add(self, result):
+        """Count result and keep it if it is not successful."""
+        self.counts[result.status] += 1
+        if result.status == CheckResult.SUCCESS:
+            return
+        size = sum(len(each_field) for each_field in result
+                   if each_field is not None)
+        if self._overflow is None and \
+                self._kept_size + size <= self._memory_limit:
+            self._kept.append(result)
+            self._kept_size += size
+            return
+        if self._overflow is None:
+            self._overflow = tempfile.TemporaryFile('w+', encoding='utf-8')
+        self._overflow.write(json.dumps(result) + '\n')
+
+    def iter_problems(self, status=None):
+        """Iterate over kept results in order they were added.
+
+        :param status: return only results with status, warnings and errors
+            by default
+        """
+        for each_result in self._kept:
+            if status is None or each_result.status == status:
+                yield each_result
+        if self._overflow is None:
+            return
+        self._overflow.seek(0)
+        for each_line in self._overflow:
+            result = CheckResult(*json.loads(each_line))
+            if status is None or result.status == status:
+                yield result
+        self._overflow.seek(0, os.SEEK_END)
+
+    def close(self):
+        """Remove temporary file."""
+        if self._overflow is not None:
+            self._overflow.close()
+            self._overflow = None
+
+
+class FullReport:
+    """Print colorized summary and full message of every result."""
+
+    def __init__(self, stream=None):
+        """Set output stream, stdout by default."""
+        self._stream = stream or sys.stdout
+
+    def add(self, result):
+        """Print result."""
+        print(format_result(result), file=self._stream)
+        if result.message:
+            print(result.message, file=self._stream)
+
+    def finish(self, summary, notes):
+        """Print failed tasks, notes and overall status.
+
+        :type summary: :class:`ResultSummary`
+        """
+        print('-' * 80, file=self._stream)
+        if not summary.is_ok:
+            print(_bold('Failed tasks:'), file=self._stream)
+            for each_result in summary.iter_problems(CheckResult.ERROR):
+                print(format_result(each_result), file=self._stream)
+        print(_format_counts(summary), file=self._stream)
+        for each_note in notes:
+            print(each_note, file=self._stream)
+        if summary.is_ok:
+            print(_success('OK'), file=self._stream)
+        else:
+            print(_error('Commit aborted'), file=self._stream)
+
+
+class CompactReport:
+    """Print plain line per failed result and counts of results.
+
+    Output is buffered and written in large chunks. Messages of all results
+    are written to log files in log directory, log directory is cleaned
+    first, so it contains logs of last run only. ``results.txt`` lists
+    every result.
+    """
+
+    # max number of buffered characters
+    BUFFER_SIZE = 65536
+
+    def __init__(self, log_dir, stream=None):
+        """Prepare empty log directory."""
+        self._stream = stream or sys.stdout
+        self._log_dir = log_dir
+        self._buffer = []
+        self._buffered_size = 0
+        shutil.rmtree(log_dir, ignore_errors=True)
+        os.makedirs(log_dir)
+        self._index = open(path.join(log_dir, 'results.txt'), 'w')
+
+    def add(self, result):
+        """Log result message and print result if it failed."""
+        log_path = self._write_log(result) if result.message else None
+        summary = result.summary or _DEFAULT_SUMMARY_TEXT[result.status]
+        self._index.write('{} {}: {}{}\n'.format(
+            result.status, result.taskname, summary,
+            ' ({})'.format(path.basename(log_path)) if log_path else ''
+        ))
+        if result.status == CheckResult.ERROR:
+            self._write('FAILED {}: {}{}\n'.format(
+                result.taskname, summary,
+                ' (log: {})'.format(log_path) if log_path else ''
+            ))
+
+    def finish(self, summary, notes):
+        """Print counts, notes and overall status.
+
+        :type summary: :class:`ResultSummary`
+        """
+        self._index.close()
+        self._write(_format_counts(summary) + '\n')
+        for each_note in notes:
+            self._write(each_note + '\n')
+        self._write('Logs: {}\n'.format(self._log_dir))
+        self._write('OK\n' if summary.is_ok else 'Commit aborted\n')
+        self._flush()
+
+    def _write_log(self, result):
+        """Write result message to log file named after task.
+
+        :returns: log file path
+        """
+        log_name = re.sub(r'[^A-Za-z0-9._-]+', '_', result.taskname)
+        log_path = path.join(self._log_dir, log_name + '.log')
+        index = 1
+        # names are not remembered, so memory does not grow with results
+        while path.exists(log_path):
+            index += 1
+            log_path = path.join(self._log_dir,
+                                 '{}.{}.log'.format(log_name, index))
+        with open(log_path, 'w') as log_file:
+            log_file.write(result.message)
+        return log_path
+
+    def _write(self, text):
+        self._buffer.append(text)
+        self._buffered_size += len(text)
+        if self._buffered_size >= self.BUFFER_SIZE:
+            self._flush()
+
+    def _flush(self):
+        self._stream.write(''.join(self._buffer))
+        self._stream.flush()
+        self._buffer = []
+        self._buffered_size = 0
+
 
-    print(('* {task}: {summary}'.format(task=taskname, summary=summary)))
-    if result.message:
-        print((result.message))
+def _format_counts(summary):
+    """Format numbers of results by status."""
+    return '{} tasks: {} passed, {} warnings, {} failed'.format(
+        summary.total, summary.counts[CheckResult.SUCCESS],
+        summary.counts[CheckResult.WARNING],
+        summary.counts[CheckResult.ERROR]
+    )
 
 
 def _error(text):
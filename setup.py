@@ -4,7 +4,7 @@ from os import path
 from setuptools import setup
 from setuptools import find_packages
 
-packages = find_packages(exclude=['tests*'])
+packages = find_packages(exclude=['tests*', 'benchmarks*'])
 
 project_dir = path.abspath(path.dirname(__file__))
 with open(path.join(project_dir, 'README.rst'), encoding='utf-8') as f:
@@ -36,7 +36,8 @@ setup(
     entry_points={
         'console_scripts': [
             'check-code = codechecker.scripts.runner:main',
-            'setup-githook = codechecker.scripts.hooksetup:main'
+            'setup-githook = codechecker.scripts.hooksetup:main',
+            'check-code-cache-server = codechecker.scripts.cacheserver:main'
         ],
     }
 )
@@ -1,6 +1,8 @@
 """Test installation of pre-commit hook"""
 import os
+import sys
 from os import path
+from unittest import mock
 from tests.testsuite.scripts import FakeFSTestCase
 
 from codechecker.scripts import hooksetup as setup
@@ -12,6 +14,9 @@ class TestHookSetup(FakeFSTestCase):
     def setUp(self):
         self.setUpPyfakefs()
         self.repo_path = '/path/to/repo'
+        argv_patcher = mock.patch.object(sys, 'argv', ['setup-githook'])
+        self.addCleanup(argv_patcher.stop)
+        argv_patcher.start()
 
     def test_setup_creates_precommit_hook(self):
         git_hooks_dir = path.join(self.repo_path, '.git/hooks/')
@@ -44,6 +49,24 @@ class TestHookSetup(FakeFSTestCase):
         self.assertEqual(PRECOMMIT_HOOK_EXPECTED, precommit_hook_contents,
                          'Created pre-commit hook has invalid content')
 
+    def test_setup_creates_prepush_hook(self):
+        git_hooks_dir = path.join(self.repo_path, '.git/hooks/')
+        self._create_file_structure({git_hooks_dir: {}})
+        os.chdir(self.repo_path)
+
+        setup.main(['--pre-push'])
+
+        prepush_hook_path = path.join(self.repo_path, '.git/hooks/pre-push')
+        self.assertTrue(
+            os.access(prepush_hook_path, os.X_OK),
+            '.git/hooks/pre-push should be executable'
+        )
+        self.assertIn('check-code --range', open(prepush_hook_path).read())
+        self.assertFalse(
+            path.exists(path.join(git_hooks_dir, 'pre-commit')),
+            'setup-githook --pre-push should not create pre-commit hook'
+        )
+
     def test_setup_does_not_override_existing_checker_config(self):
         git_hooks_dir = path.join(self.repo_path, '.git/hooks/')
         checkers_conf_path = path.join(self.repo_path,
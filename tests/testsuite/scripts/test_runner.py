@@ -1,5 +1,8 @@
 """Checker runner test cases"""
+import contextlib
+import io
 import os
+import sys
 from os import path
 from unittest import mock
 import yaml
@@ -30,6 +33,9 @@ class RunnerTestCase(FakeFSTestCase):
         """Create virtual file structure"""
         self.setUpPyfakefs()
         self.repo_root = '/path/to/repository'
+        argv_patcher = mock.patch.object(sys, 'argv', ['check-code'])
+        self.addCleanup(argv_patcher.stop)
+        argv_patcher.start()
         # patch tasks execution
         worker_patcher = mock.patch(
             'codechecker.scripts.runner.worker',
@@ -427,6 +433,37 @@ class RunnerTestCase(FakeFSTestCase):
         self.assertEqual(1, exc.code,
                          'If checker fail script should exit with code 1')
 
+    def test_throughput_is_reported_when_all_files_are_checked(self):
+        """Number of checked files per second is printed after --all run"""
+        precommit_yaml_contents = yaml.dump({
+            'file-checkers': {'*.py': ['pep8']}
+        })
+        self.patch_git_repository(precommit_yaml_contents)
+        self.patch_file_checker('pep8', taskname='PEP8 ${file_relpath}',
+                                command='pep8 ${file_abspath}')
+        tracked_files_patch = mock.patch.object(
+            git,
+            'iter_tracked_files',
+            lambda: iter([('a.py', 'a' * 40), ('b.py', 'b' * 40)])
+        )
+        self.addCleanup(tracked_files_patch.stop)
+        tracked_files_patch.start()
+
+        def execute_checkers(checker_tasks, **options):
+            # pylint: disable=unused-argument
+            # streamed tasks are created while checkers are executed
+            list(checker_tasks)
+            return 0
+        self.worker.execute_checkers.side_effect = execute_checkers
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            runner.main(['--all', '--no-progress'])
+
+        self.assertRegex(output.getvalue(),
+                         r'Scanned 2 files in \d+\.\d{2}s '
+                         r'\(\d+\.\d files/s\)')
+
     def patch_git_repository(self, precommit_yaml_contents,
                              staged_files=None):
         """Prepare fake git repository and chdir to git repo
@@ -450,14 +487,35 @@ class RunnerTestCase(FakeFSTestCase):
             'get_staged_files',
             lambda: staged_files
         )
+        staged_blobs_patch = mock.patch.object(
+            git,
+            'get_staged_blobs',
+            lambda: {}
+        )
+        staged_index_patch = mock.patch.object(
+            git,
+            'get_staged_index',
+            lambda file_relpaths=None, size_limits=None: {}
+        )
+        index_blobs_patch = mock.patch.object(
+            git,
+            'get_index_blobs',
+            lambda file_relpaths: {}
+        )
         abspath_patch = mock.patch.object(
             git,
             'abspath',
             lambda rel_path: path.join(self.repo_root, rel_path)
         )
         self.addCleanup(staged_files_patch.stop)
+        self.addCleanup(staged_blobs_patch.stop)
+        self.addCleanup(staged_index_patch.stop)
+        self.addCleanup(index_blobs_patch.stop)
         self.addCleanup(abspath_patch.stop)
         staged_files_patch.start()
+        staged_blobs_patch.start()
+        staged_index_patch.start()
+        index_blobs_patch.start()
         abspath_patch.start()
 
     def patch_file_checker(self, checkername, taskname=None, command=None,
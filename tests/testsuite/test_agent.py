@@ -0,0 +1,121 @@
+"""Test :mod:`codechecker.agent`."""
+import sys
+import unittest
+from multiprocessing.pool import ThreadPool
+from shlex import quote
+
+from codechecker.agent import (AgentServer,
+                               AgentPool,
+                               AgentUnavailableError,
+                               serialize_task,
+                               deserialize_task)
+from codechecker.checker.task import (Task,
+                                      CheckResult)
+from codechecker.result_creators import create_pylint_result
+
+
+# fails if checked file contains "error"
+CHECK_COMMAND = '{} -c "import sys; sys.exit(\'error\' in open(sys.argv[1]).read())"' \
+    ' ${{file_abspath}}'.format(quote(sys.executable))
+
+
+def create_task(relpath='module.py'):
+    """Create file checker task."""
+    task = Task('check {}'.format(relpath), CHECK_COMMAND)
+    task.relpath = relpath
+    task.content_hash = 'a' * 40
+    return task
+
+
+class SerializationTestCase(unittest.TestCase):
+    """Test task serialization."""
+
+    def test_task_is_deserialized(self):
+        task = create_task('dir/module.py')
+        task.result_creator = create_pylint_result
+        task.config = {'accepted-code-rate': 8}
+
+        actual = deserialize_task(serialize_task(task))
+
+        # pylint: disable=protected-access
+        self.assertEqual(task._build_command(), actual._build_command())
+        self.assertEqual(task.config, actual.config)
+        self.assertIs(create_pylint_result, actual.result_creator)
+        self.assertEqual('dir/module.py', actual.relpath)
+
+    def test_stdin_task_checks_sent_contents(self):
+        agent = AgentServer().start()
+        self.addCleanup(agent.stop)
+        task = Task('check module.py',
+                    '{} -c "import sys; sys.exit(\'error\' in'
+                    ' sys.stdin.read())"'.format(quote(sys.executable)))
+        task.relpath = 'module.py'
+        task.content_hash = 'a' * 40
+        task.stdin = True
+
+        result = AgentPool([agent.address]).execute(task, b'error')
+
+        self.assertEqual(CheckResult.ERROR, result.status)
+
+    def test_unknown_result_creator_is_rejected(self):
+        data = serialize_task(create_task())
+        data['result_creator'] = 'system'
+        self.assertRaises(ValueError, deserialize_task, data)
+
+
+class AgentPoolTestCase(unittest.TestCase):
+    """Test dispatching tasks to agents on localhost."""
+
+    def start_agent(self, capacity=1):
+        """Start agent in background thread."""
+        agent = AgentServer(capacity=capacity).start()
+        self.addCleanup(agent.stop)
+        return agent
+
+    def test_agent_checks_sent_contents(self):
+        agent = self.start_agent()
+        pool = AgentPool([agent.address])
+
+        success = pool.execute(create_task('dir/ok.py'), b'ok')
+        failure = pool.execute(create_task('dir/bad.py'), b'error')
+
+        self.assertEqual(CheckResult.SUCCESS, success.status)
+        self.assertEqual(CheckResult.ERROR, failure.status)
+        self.assertEqual('check dir/bad.py', failure.taskname)
+
+    def test_tasks_are_spread_among_agents(self):
+        agents = [self.start_agent(capacity=2) for _ in range(3)]
+        pool = AgentPool([agent.address for agent in agents])
+        self.assertEqual(6, pool.capacity)
+
+        with ThreadPool(pool.capacity) as threads:
+            results = threads.map(
+                lambda index: pool.execute(create_task(), b'ok'), range(12)
+            )
+
+        self.assertEqual(12, len(results))
+        for each_agent in agents:
+            self.assertGreater(each_agent.executed, 0)
+
+    def test_unreachable_agent_is_skipped(self):
+        agent = self.start_agent()
+        dead_agent = AgentServer().start()
+        pool = AgentPool([dead_agent.address, agent.address])
+        dead_agent.stop()
+
+        for _ in range(3):
+            result = pool.execute(create_task(), b'ok')
+            self.assertEqual(CheckResult.SUCCESS, result.status)
+        self.assertEqual(3, agent.executed)
+
+    def test_error_is_raised_if_no_agent_is_available(self):
+        pool = AgentPool(['127.0.0.1:1'])
+        self.assertEqual(0, pool.capacity)
+        self.assertRaises(AgentUnavailableError, pool.execute,
+                          create_task(), b'ok')
+
+    def test_paths_outside_of_agent_directory_are_rejected(self):
+        agent = self.start_agent()
+        pool = AgentPool([agent.address])
+        self.assertRaises(AgentUnavailableError, pool.execute,
+                          create_task('../module.py'), b'ok')
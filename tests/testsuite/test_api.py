@@ -0,0 +1,412 @@
+"""Test :mod:`codechecker.api`."""
+import os
+import threading
+from concurrent import futures
+from unittest import mock
+
+import codechecker
+from codechecker import api
+from codechecker import git
+from codechecker import worker
+from codechecker.cache import decode_result
+from codechecker.checker.task import CheckResult
+from codechecker.checkers_spec import (FILE_CHECKERS,
+                                       TASKNAME,
+                                       COMMAND,
+                                       STDIN_COMMAND,
+                                       CROSS_FILE)
+from tests.testsuite.test_git import GitRepositoryTestCase
+
+
+CONFIG = {'file-checkers': {'*.py': ['stub']}}
+
+
+class StubCheckerTestCase(GitRepositoryTestCase):
+    """Base test case with stub checker failing on files containing bad."""
+
+    def setUp(self):
+        super().setUp()
+        file_checkers_patch = mock.patch.dict(FILE_CHECKERS, {'stub': {
+            TASKNAME: 'STUB ${file_relpath}',
+            COMMAND: 'sh -c "! grep -q bad ${file_abspath}"'
+        }})
+        self.addCleanup(file_checkers_patch.stop)
+        file_checkers_patch.start()
+        self.write('good.py', 'good')
+        self.write('bad.py', 'bad')
+        self.write('README.rst', 'bad')
+
+
+class RunTestCase(StubCheckerTestCase):
+    """Test :func:`codechecker.run`."""
+
+    def test_results_of_passed_files_are_yielded(self):
+        results = codechecker.run(paths=['good.py', 'bad.py', 'README.rst'],
+                                  config=CONFIG, jobs=2)
+
+        statuses = {result.taskname: result.status for result in results}
+
+        self.assertEqual({'STUB good.py': CheckResult.SUCCESS,
+                          'STUB bad.py': CheckResult.ERROR}, statuses)
+
+    def test_staged_files_are_checked_by_default(self):
+        self.git('add', 'bad.py')
+
+        results = list(api.run(config=CONFIG, jobs=1))
+
+        self.assertEqual(['STUB bad.py'],
+                         [result.taskname for result in results])
+
+    def test_repository_path_is_stripped_from_cached_messages(self):
+        FILE_CHECKERS['echo-path'] = {
+            TASKNAME: 'ECHO ${file_relpath}',
+            COMMAND: 'sh -c "echo ${file_abspath}: bad; false"'
+        }
+        self.git('add', 'bad.py')
+        config = {'file-checkers': {'*.py': ['echo-path']},
+                  'cache': {'local': True}}
+
+        result, = api.run(config=config, jobs=1)
+
+        self.assertEqual('bad.py: bad', result.message.strip())
+        cached_messages = []
+        for dir_path, _, file_names in os.walk(
+                git.abspath(api.LOCAL_CACHE_DIR)
+        ):
+            for each_name in file_names:
+                with open(os.path.join(dir_path, each_name), 'rb') \
+                        as result_file:
+                    cached_messages.append(
+                        decode_result(result_file.read()).message
+                    )
+        self.assertEqual(1, len(cached_messages))
+        self.assertNotIn(git.abspath(''), cached_messages[0])
+
+    def test_staged_binary_files_are_skipped(self):
+        with open('data.py', 'wb') as data_file:
+            data_file.write(b'bad\0')
+        self.git('add', 'bad.py', 'data.py')
+
+        results = list(api.run(config=CONFIG, jobs=1))
+
+        self.assertEqual(['STUB bad.py'],
+                         [result.taskname for result in results])
+
+    def test_cancelled_run_yields_no_more_results(self):
+        for index in range(10):
+            self.write('file{}.py'.format(index), 'good')
+        cancel = threading.Event()
+
+        results = api.run(paths=['.'], config=CONFIG, jobs=1, cancel=cancel)
+        next(results)
+        cancel.set()
+
+        self.assertEqual([], list(results))
+
+    def test_tasks_are_executed_by_passed_executor(self):
+        with futures.ThreadPoolExecutor(2) as executor:
+            results = list(api.run(paths=['good.py'], config=CONFIG,
+                                   executor=executor))
+            # executor is still usable
+            self.assertEqual(1, executor.submit(int, '1').result())
+
+        self.assertEqual(['STUB good.py'],
+                         [result.taskname for result in results])
+
+
+class SnapshotTestCase(StubCheckerTestCase):
+    """Test checking snapshot of git index."""
+
+    def test_staged_contents_are_checked(self):
+        self.git('add', 'good.py', 'bad.py')
+        self.write('good.py', 'bad')
+        self.write('bad.py', 'good')
+
+        results = api.run(config=CONFIG, jobs=1, snapshot=True)
+
+        statuses = {result.taskname: result.status for result in results}
+        self.assertEqual({'STUB good.py': CheckResult.SUCCESS,
+                          'STUB bad.py': CheckResult.ERROR}, statuses)
+
+    def test_tasks_are_executed_in_snapshot(self):
+        self.git('add', 'good.py')
+
+        with api.prepare(config=CONFIG, snapshot=True) as plan:
+            task = plan.tasks[0]
+            self.assertEqual(task.rootdir, task.workdir)
+            self.assertTrue(os.path.isfile(
+                os.path.join(task.rootdir, 'good.py')
+            ))
+        self.assertFalse(os.path.exists(task.rootdir))
+
+    def test_snapshot_of_paths_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            with api.prepare(paths=['good.py'], config=CONFIG,
+                             snapshot=True):
+                pass
+
+
+class AllFilesTestCase(StubCheckerTestCase):
+    """Test checking every tracked file."""
+
+    def setUp(self):
+        super().setUp()
+        self.commit({})
+        self.write('untracked.py', 'bad')
+
+    def test_tracked_files_are_streamed(self):
+        timer = api.PhaseTimer()
+
+        with api.prepare(config=CONFIG, all_files=True, timer=timer) \
+                as plan:
+            self.assertNotIsInstance(plan.tasks, list)
+            self.assertEqual(0, timer.files_count)
+            results = worker.iter_results(plan.tasks, workers_count=1)
+            statuses = {result.taskname: result.status for result in results}
+
+        self.assertEqual({'STUB good.py': CheckResult.SUCCESS,
+                          'STUB bad.py': CheckResult.ERROR}, statuses)
+        self.assertEqual(3, timer.files_count)
+
+    def test_results_are_cached(self):
+        config = dict(CONFIG, cache={'local': True})
+
+        class CachedMonitor(worker.Monitor):
+            """Record names of tasks with cached results."""
+
+            def __init__(self):
+                self.cached = []
+
+            def job_cached(self, job, result):
+                self.cached.append(job.taskname)
+
+        monitors = [CachedMonitor(), CachedMonitor()]
+        for each_monitor in monitors:
+            results = list(api.run(config=config, all_files=True, jobs=1,
+                                   monitor=each_monitor))
+            self.assertEqual(2, len(results))
+
+        self.assertEqual([], monitors[0].cached)
+        self.assertEqual(['STUB bad.py', 'STUB good.py'],
+                         sorted(monitors[1].cached))
+
+
+class StdinTestCase(StubCheckerTestCase):
+    """Test checking staged blobs passed to stdin."""
+
+    config = {'file-checkers': {'*.py': ['stdin-stub']}}
+
+    def setUp(self):
+        super().setUp()
+        file_checkers_patch = mock.patch.dict(FILE_CHECKERS, {'stdin-stub': {
+            TASKNAME: 'STDIN ${file_relpath}',
+            COMMAND: 'sh -c "! grep -q bad ${file_abspath}"',
+            STDIN_COMMAND: 'sh -c "! grep -q bad"'
+        }})
+        self.addCleanup(file_checkers_patch.stop)
+        file_checkers_patch.start()
+
+    def test_staged_contents_of_partially_staged_file_are_checked(self):
+        self.git('add', 'good.py', 'bad.py')
+        self.write('good.py', 'bad')
+        self.write('bad.py', 'good')
+
+        results = api.run(config=self.config, jobs=1)
+
+        statuses = {result.taskname: result.status for result in results}
+        self.assertEqual({'STDIN good.py': CheckResult.SUCCESS,
+                          'STDIN bad.py': CheckResult.ERROR}, statuses)
+
+    def test_tasks_reading_files_are_not_bound_to_staged_blobs(self):
+        self.git('add', 'good.py')
+        self.write('good.py', 'bad')
+        config = {'file-checkers': {'*.py': ['stub', 'stdin-stub']}}
+
+        with api.prepare(config=config) as plan:
+            content_hashes = {task.taskname: task.content_hash
+                              for task in plan.tasks}
+
+        self.assertIsNone(content_hashes['STUB good.py'])
+        self.assertIsNotNone(content_hashes['STDIN good.py'])
+
+
+class CrossFileTestCase(GitRepositoryTestCase):
+    """Test binding cross-file checkers to imported files."""
+
+    config = {'file-checkers': {'*.py': ['cross-stub']},
+              'cache': {'local': True}}
+
+    def setUp(self):
+        super().setUp()
+        file_checkers_patch = mock.patch.dict(FILE_CHECKERS, {'cross-stub': {
+            TASKNAME: 'CROSS ${file_relpath}',
+            COMMAND: 'true ${file_abspath}',
+            CROSS_FILE: True
+        }})
+        self.addCleanup(file_checkers_patch.stop)
+        file_checkers_patch.start()
+        self.main_version = 0
+
+    def get_dependencies_hash(self):
+        """Stage main.py importing util.py and get hash of its task."""
+        # main.py is committed with other files, it is changed to be staged
+        self.main_version += 1
+        self.write('main.py', 'import util\n# {}'.format(self.main_version))
+        self.git('add', 'main.py')
+        with api.prepare(config=self.config) as plan:
+            return plan.tasks[0].dependencies_hash
+
+    def test_hash_depends_on_imported_files(self):
+        self.commit({'util.py': 'a = 1', 'other.py': ''})
+        dependencies_hash = self.get_dependencies_hash()
+        self.commit({'other.py': 'b = 1'})
+
+        self.assertIsNotNone(dependencies_hash)
+        self.assertEqual(dependencies_hash, self.get_dependencies_hash())
+        self.commit({'util.py': 'a = 2'})
+        self.assertNotEqual(dependencies_hash, self.get_dependencies_hash())
+
+    def test_unstaged_dependency_is_not_cached(self):
+        self.commit({'util.py': 'a = 1'})
+        self.write('util.py', 'a = 2')
+
+        self.assertIsNone(self.get_dependencies_hash())
+
+    def test_watched_files_are_bound_to_imported_files(self):
+        self.commit({'util.py': 'a = 1', 'main.py': ''})
+        self.write('main.py', 'import util\n')
+        with mock.patch('codechecker.watch.watch') as watch_mock:
+            api.watch(config=self.config)
+        create_tasks = watch_mock.call_args[0][0]
+
+        def get_dependencies_hash():
+            blob_ids = git.hash_worktree_files(['main.py'])
+            return create_tasks(blob_ids.items())[0].dependencies_hash
+        dependencies_hash = get_dependencies_hash()
+
+        self.assertIsNotNone(dependencies_hash)
+        self.commit({'util.py': 'a = 2'})
+        self.assertNotEqual(dependencies_hash, get_dependencies_hash())
+
+
+class ProjectCheckersCacheTestCase(GitRepositoryTestCase):
+    """Test caching project checkers results by staged tree."""
+
+    config = {'project-checkers': ['unittest'], 'cache': {'local': True}}
+
+    def test_project_task_is_bound_to_staged_tree(self):
+        self.commit({'a.py': 'a'})
+
+        with api.prepare(config=self.config) as plan:
+            self.assertEqual([git.get_staged_tree()],
+                             [task.content_hash for task in plan.tasks])
+
+    def test_project_task_is_not_cached_with_unstaged_changes(self):
+        self.commit({'a.py': 'a'})
+        self.write('a.py', 'b')
+
+        with api.prepare(config=self.config) as plan:
+            self.assertEqual([None],
+                             [task.content_hash for task in plan.tasks])
+
+
+class ProjectCheckerInputsTestCase(GitRepositoryTestCase):
+    """Test caching project checkers results by declared inputs."""
+
+    config = {'project-checkers': ['phpunit'], 'cache': {'local': True},
+              'config': {'phpunit': {'inputs': ['src/*.php']}}}
+
+    def get_content_hash(self):
+        """Get content hash of phpunit task."""
+        with api.prepare(config=self.config) as plan:
+            return plan.tasks[0].content_hash
+
+    def test_hash_does_not_depend_on_other_files(self):
+        self.commit({'src/a.php': 'a', 'README.rst': 'a'})
+        content_hash = self.get_content_hash()
+        self.commit({'README.rst': 'b'})
+        self.write('docs.rst', 'untracked')
+
+        self.assertIsNotNone(content_hash)
+        self.assertEqual(content_hash, self.get_content_hash())
+
+    def test_hash_depends_on_input_files(self):
+        self.commit({'src/a.php': 'a'})
+        content_hash = self.get_content_hash()
+        self.commit({'src/a.php': 'b'})
+
+        self.assertNotEqual(content_hash, self.get_content_hash())
+
+    def test_unstaged_or_untracked_input_is_not_cached(self):
+        self.commit({'src/a.php': 'a'})
+        self.write('src/b.php', 'b')
+        self.assertIsNone(self.get_content_hash())
+
+        self.git('add', 'src/b.php')
+        self.write('src/a.php', 'b')
+        self.assertIsNone(self.get_content_hash())
+
+
+class ProjectCheckerTriggerTestCase(GitRepositoryTestCase):
+    """Test running project checkers only for matching staged files."""
+
+    config = {'project-checkers': ['phpunit', 'unittest'],
+              'config': {'phpunit': {'trigger': ['*.php', 'phpunit.xml']}}}
+
+    def get_checkernames(self):
+        """Get names of checkers of staged files."""
+        with api.prepare(config=self.config) as plan:
+            return [task.checkername for task in plan.tasks]
+
+    def test_checker_is_skipped_if_no_staged_file_matches(self):
+        self.write('README.rst', 'docs')
+        self.git('add', '-A')
+
+        self.assertEqual(['unittest'], self.get_checkernames())
+
+    def test_checker_runs_if_staged_file_matches(self):
+        self.write('src/a.php', 'a')
+        self.git('add', '-A')
+
+        self.assertEqual(['phpunit', 'unittest'], self.get_checkernames())
+
+    def test_deleted_file_triggers_checker(self):
+        self.commit({'src/a.php': 'a'})
+        self.git('rm', '-q', 'src/a.php')
+
+        self.assertEqual(['phpunit', 'unittest'], self.get_checkernames())
+
+
+class TiersTestCase(GitRepositoryTestCase):
+    """Test ordering tasks by configured tiers."""
+
+    def test_tasks_are_ordered_by_tier(self):
+        self.write('a.py', 'a')
+        self.git('add', '-A')
+        config = {'project-checkers': ['unittest'],
+                  'file-checkers': {'*.py': ['pep8', 'pylint']},
+                  'tiers': [['pep8'], ['pylint', 'unittest']]}
+
+        with api.prepare(config=config) as plan:
+            tiers = [(task.checkername, task.tier) for task in plan.tasks]
+
+        self.assertEqual([('pep8', 0), ('unittest', 1), ('pylint', 1)],
+                         tiers)
+
+    def test_unknown_checker_in_tiers_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            with api.prepare(config={'tiers': [['missing']]}):
+                pass
+
+
+class LoadConfigTestCase(GitRepositoryTestCase):
+    """Test :func:`codechecker.api.load_config`."""
+
+    def test_config_file_is_read_by_default(self):
+        self.write('precommit-checkers.yml', 'file-checkers: {"*.py": pep8}')
+
+        self.assertEqual({'file-checkers': {'*.py': 'pep8'}},
+                         api.load_config())
+
+    def test_invalid_option_raises_value_error(self):
+        self.assertRaises(ValueError, api.load_config, {'checkers': []})
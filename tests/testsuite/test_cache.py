@@ -0,0 +1,113 @@
+"""Test :mod:`codechecker.cache`."""
+import socket
+import time
+import unittest
+from unittest import mock
+
+from codechecker.cache import (CacheServer,
+                               RemoteResultCache,
+                               result_key,
+                               encode_result,
+                               decode_result)
+from codechecker.checker.task import (Task,
+                                      CheckResult)
+from tests.testsuite.testcase import assert_checkresult_equal
+
+
+def create_task(content_hash='a' * 40, relpath='module.py'):
+    """Create task which result can be cached."""
+    task = Task('PEP8 {}'.format(relpath), 'pep8 {}'.format(relpath))
+    task.fingerprint = 'f' * 40
+    task.relpath = relpath
+    task.content_hash = content_hash
+    return task
+
+
+class ResultKeyTestCase(unittest.TestCase):
+    """Test cache key computation."""
+
+    def test_key_depends_on_content(self):
+        self.assertNotEqual(result_key(create_task('a' * 40)),
+                            result_key(create_task('b' * 40)))
+
+    def test_key_depends_on_path(self):
+        self.assertNotEqual(result_key(create_task(relpath='a.py')),
+                            result_key(create_task(relpath='b.py')))
+
+    def test_task_without_content_hash_is_not_cacheable(self):
+        self.assertIsNone(result_key(create_task(content_hash=None)))
+
+    def test_key_of_cross_file_task_depends_on_dependencies(self):
+        task = create_task()
+        task.cross_file = True
+        self.assertIsNone(result_key(task))
+
+        task.dependencies_hash = 'd' * 40
+        key = result_key(task)
+        task.dependencies_hash = 'e' * 40
+
+        self.assertNotEqual(key, result_key(task))
+
+    def test_payload_roundtrip(self):
+        result = CheckResult('task', CheckResult.ERROR, 'summary', 'message')
+        assert_checkresult_equal(result, decode_result(encode_result(result)))
+
+    def test_invalid_payload_raises_value_error(self):
+        self.assertRaises(ValueError, decode_result, b'invalid')
+
+
+class RemoteResultCacheTestCase(unittest.TestCase):
+    """Test cache client against reference server."""
+
+    def setUp(self):
+        self.server = CacheServer().start()
+        self.addCleanup(self.server.stop)
+
+    def test_stored_result_is_returned(self):
+        cache = RemoteResultCache(self.server.url, push=True)
+        task = create_task()
+        result = CheckResult(task.taskname, CheckResult.WARNING, 'summary')
+
+        cache.put(task, result)
+
+        assert_checkresult_equal(result, cache.get(task))
+
+    def test_missing_result_is_none(self):
+        cache = RemoteResultCache(self.server.url)
+        self.assertIsNone(cache.get(create_task()))
+        self.assertTrue(cache.is_available)
+
+    def test_result_is_not_stored_without_push(self):
+        cache = RemoteResultCache(self.server.url)
+        task = create_task()
+
+        cache.put(task, CheckResult(task.taskname))
+
+        self.assertEqual({}, self.server.results)
+
+    @mock.patch('sys.stderr')
+    def test_unavailable_cache_is_disabled(self, _):
+        closed_socket = socket.socket()
+        closed_socket.bind(('127.0.0.1', 0))
+        url = 'http://127.0.0.1:{}'.format(closed_socket.getsockname()[1])
+        closed_socket.close()
+        cache = RemoteResultCache(url)
+
+        self.assertIsNone(cache.get(create_task()))
+        self.assertFalse(cache.is_available)
+
+    @mock.patch('sys.stderr')
+    def test_slow_cache_is_disabled(self, _):
+        silent_socket = socket.socket()
+        self.addCleanup(silent_socket.close)
+        silent_socket.bind(('127.0.0.1', 0))
+        silent_socket.listen(1)
+        url = 'http://127.0.0.1:{}'.format(silent_socket.getsockname()[1])
+        cache = RemoteResultCache(url, timeout=0.1)
+
+        start = time.monotonic()
+        self.assertIsNone(cache.get(create_task()))
+        self.assertIsNone(cache.get(create_task('b' * 40)))
+
+        self.assertFalse(cache.is_available)
+        self.assertLess(time.monotonic() - start, 1)
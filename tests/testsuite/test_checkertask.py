@@ -2,7 +2,8 @@
 import unittest
 
 from codechecker.checker.task import (Task as CheckerTask,
-                                      CheckResult)
+                                      CheckResult,
+                                      ArgvTemplate)
 from tests.testsuite.testcase import (ShellTestCase,
                                       assert_checkresult_equal)
 
@@ -217,3 +218,32 @@ class CheckResultTestCase(unittest.TestCase):
             message=None
         )
         assert_checkresult_equal(expected_checker_result, checker_result)
+
+
+class ArgvTemplateTestCase(unittest.TestCase):
+    """Test :class:`codechecker.checker.task.ArgvTemplate`."""
+
+    def test_file_path_is_single_argument(self):
+        template = ArgvTemplate('jshint ${options} ${file_abspath}',
+                                {'config': '.jshint rc'},
+                                {'config': '--config ${value}'})
+
+        self.assertEqual(['jshint', '--config', '.jshint rc', '/a b/c.js'],
+                         template.build('/a b/c.js'))
+
+    def test_file_path_can_be_part_of_argument(self):
+        template = ArgvTemplate('checker --file=${file_abspath}')
+
+        self.assertEqual(['checker', '--file=/a/b.py'],
+                         template.build('/a/b.py'))
+
+    def test_template_is_not_changed_by_build(self):
+        template = ArgvTemplate('pep8 ${file_abspath}')
+        template.build('/a.py')
+
+        self.assertEqual(['pep8', '/b.py'], template.build('/b.py'))
+
+    def test_missing_file_path_raises_key_error(self):
+        template = ArgvTemplate('pep8 ${file_abspath}')
+
+        self.assertRaises(KeyError, template.build)
@@ -0,0 +1,122 @@
+"""Test :mod:`codechecker.concurrency`."""
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from codechecker import concurrency
+from codechecker.concurrency import (available_cpus,
+                                     available_memory,
+                                     resolve_workers_count,
+                                     LoadController)
+
+
+class CgroupTestCase(unittest.TestCase):
+    """Test reading limits from cgroup v2 hierarchy."""
+
+    def setUp(self):
+        root_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(root_dir.cleanup)
+        self.cgroup_root = root_dir.name
+        self.proc_cgroup = os.path.join(root_dir.name, 'proc-cgroup')
+        with open(self.proc_cgroup, 'w') as proc_file:
+            proc_file.write('0::/pod/container\n')
+        os.makedirs(os.path.join(self.cgroup_root, 'pod/container'))
+
+    def write_cgroup_file(self, cgroup, filename, contents):
+        """Write cgroup interface file."""
+        with open(os.path.join(self.cgroup_root, cgroup, filename),
+                  'w') as cgroup_file:
+            cgroup_file.write(contents)
+
+    @mock.patch('os.sched_getaffinity', return_value=set(range(64)))
+    def test_cpu_quota_limits_cpus(self, _):
+        self.write_cgroup_file('pod', 'cpu.max', '400000 100000\n')
+        self.write_cgroup_file('pod/container', 'cpu.max', 'max 100000\n')
+
+        self.assertEqual(4, available_cpus(self.cgroup_root,
+                                           self.proc_cgroup))
+
+    @mock.patch('os.sched_getaffinity', return_value=set(range(64)))
+    def test_fractional_quota_is_rounded_up(self, _):
+        self.write_cgroup_file('pod/container', 'cpu.max', '150000 100000')
+
+        self.assertEqual(2, available_cpus(self.cgroup_root,
+                                           self.proc_cgroup))
+
+    @mock.patch('os.sched_getaffinity', return_value={0, 1})
+    def test_affinity_limits_cpus(self, _):
+        self.write_cgroup_file('pod', 'cpu.max', '400000 100000')
+
+        self.assertEqual(2, available_cpus(self.cgroup_root,
+                                           self.proc_cgroup))
+
+    def test_memory_limit_is_used(self):
+        self.write_cgroup_file('pod', 'memory.max', '1000')
+        self.write_cgroup_file('pod', 'memory.current', '400')
+
+        memory = available_memory(self.cgroup_root, self.proc_cgroup,
+                                  proc_meminfo='/nonexistent')
+
+        self.assertEqual(600, memory)
+
+
+class ResolveWorkersCountTestCase(unittest.TestCase):
+    """Test precedence of concurrency settings."""
+
+    def test_command_line_has_highest_priority(self):
+        self.assertEqual(
+            2, resolve_workers_count(2, 8, {'CODECHECKER_JOBS': '4'})
+        )
+
+    def test_environment_overrides_config(self):
+        self.assertEqual(
+            4, resolve_workers_count(None, 8, {'CODECHECKER_JOBS': '4'})
+        )
+
+    def test_config_is_used(self):
+        self.assertEqual(8, resolve_workers_count(None, 8, {}))
+
+    def test_none_if_not_configured(self):
+        self.assertIsNone(resolve_workers_count(None, None, {}))
+
+    def test_invalid_value_raises_error(self):
+        self.assertRaises(ValueError, resolve_workers_count, 0, None, {})
+
+
+@mock.patch.object(concurrency, 'available_cpus', return_value=8)
+class LoadControllerTestCase(unittest.TestCase):
+    """Test adjusting concurrency to system load."""
+
+    @mock.patch('os.getloadavg', return_value=(2.0, 0, 0))
+    @mock.patch.object(concurrency, 'available_memory', return_value=None)
+    def test_own_load_does_not_reduce_limit(self, *_):
+        controller = LoadController(8)
+        self.assertEqual(8, controller.limit(running=2))
+
+    @mock.patch('os.getloadavg', return_value=(6.0, 0, 0))
+    @mock.patch.object(concurrency, 'available_memory', return_value=None)
+    def test_external_load_reduces_limit(self, *_):
+        controller = LoadController(8)
+        self.assertEqual(2, controller.limit(running=0))
+
+    @mock.patch('os.getloadavg', return_value=(0.0, 0, 0))
+    @mock.patch.object(concurrency, 'available_memory', return_value=None)
+    def test_max_jobs_above_cpus_count_is_kept_on_idle_system(self, *_):
+        with mock.patch.object(concurrency, 'available_cpus',
+                               return_value=1):
+            controller = LoadController(4)
+
+        self.assertEqual(4, controller.limit(running=0))
+
+    @mock.patch('os.getloadavg', return_value=(0.0, 0, 0))
+    @mock.patch.object(concurrency, 'available_memory', return_value=1024)
+    def test_low_memory_halves_limit(self, *_):
+        controller = LoadController(8)
+        self.assertEqual(4, controller.limit(running=0))
+
+    @mock.patch('os.getloadavg', return_value=(100.0, 0, 0))
+    @mock.patch.object(concurrency, 'available_memory', return_value=0)
+    def test_limit_is_not_lower_than_min_jobs(self, *_):
+        controller = LoadController(8, min_jobs=1)
+        self.assertEqual(1, controller.limit(running=0))
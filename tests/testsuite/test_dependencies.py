@@ -0,0 +1,109 @@
+"""Test :mod:`codechecker.dependencies`."""
+import os
+import tempfile
+import unittest
+
+from codechecker.dependencies import (DependencyGraph,
+                                      DependencyIndex,
+                                      parse_imports)
+
+
+SOURCES = {
+    'init': b'',
+    'a1': b'from . import b\n',
+    'b1': b'import json\n',
+    'b2': b'import json\nfrom pkg.c import name\n',
+    'c1': b'name = 1\n',
+    'main1': b'def main():\n    import pkg.a\n',
+    'other1': b'',
+}
+FILES = {
+    'src/pkg/__init__.py': 'init',
+    'src/pkg/a.py': 'a1',
+    'src/pkg/b.py': 'b1',
+    'src/pkg/c.py': 'c1',
+    'main.py': 'main1',
+    'other.py': 'other1',
+}
+
+
+class ParseImportsTestCase(unittest.TestCase):
+    """Test parsing imports of Python source."""
+
+    def test_nested_and_relative_imports_are_found(self):
+        source = (b'import os.path, sys\n'
+                  b'from .. import a\n'
+                  b'from .b import *\n'
+                  b'def f():\n'
+                  b'    from c import d\n')
+
+        self.assertEqual([[0, 'os.path', []], [0, 'sys', []],
+                          [2, '', ['a']], [1, 'b', []], [0, 'c', ['d']]],
+                         parse_imports(source))
+
+    def test_invalid_source_has_no_imports(self):
+        self.assertEqual([], parse_imports(b'import (\n'))
+
+
+class DependencyGraphTestCase(unittest.TestCase):
+    """Test digests of files imported by checked file."""
+
+    def setUp(self):
+        self.read_blobs = []
+        self.index = DependencyIndex(read_blob=self.read_blob)
+
+    def read_blob(self, blob_id):
+        """Read fake blob."""
+        self.read_blobs.append(blob_id)
+        return SOURCES[blob_id]
+
+    def digest(self, file_relpath, **changed_files):
+        """Compute digest of dependencies of file in changed tree."""
+        files = dict(FILES)
+        files.update({each_path.replace('__', '/') + '.py': each_blob
+                      for each_path, each_blob in changed_files.items()})
+        return DependencyGraph(files.items(), self.index).digest(
+            file_relpath, files[file_relpath]
+        )
+
+    def test_digest_depends_on_imported_files(self):
+        self.assertNotEqual(self.digest('src/pkg/a.py'),
+                            self.digest('src/pkg/a.py', src__pkg__b='b2'))
+
+    def test_digest_depends_on_indirectly_imported_files(self):
+        self.assertNotEqual(self.digest('main.py'),
+                            self.digest('main.py', src__pkg__b='b2'))
+
+    def test_digest_does_not_depend_on_other_files(self):
+        self.assertEqual(self.digest('main.py'),
+                         self.digest('main.py', other='a1'))
+
+    def test_unknown_dependency_contents_are_not_cached(self):
+        self.assertIsNone(self.digest('main.py', src__pkg__b=None))
+
+    def test_blob_is_parsed_once(self):
+        self.digest('main.py')
+        self.digest('src/pkg/a.py')
+
+        self.assertEqual(len(self.read_blobs), len(set(self.read_blobs)))
+
+
+class DependencyIndexTestCase(unittest.TestCase):
+    """Test persisting imports of blobs."""
+
+    def test_saved_imports_are_not_parsed_again(self):
+        with tempfile.TemporaryDirectory() as index_dir:
+            index_path = os.path.join(index_dir, 'cache', 'index.json')
+            index = DependencyIndex(index_path, read_blob=SOURCES.get)
+            imports = index.get_imports('a1')
+            index.save()
+
+            # reading blob fails
+            loaded_index = DependencyIndex(index_path,
+                                           read_blob={}.__getitem__)
+
+            self.assertEqual(imports, loaded_index.get_imports('a1'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,294 @@
+"""Test :mod:`codechecker.git` on temporary repositories."""
+import os
+import tempfile
+import unittest
+from unittest import mock
+from subprocess import (check_call,
+                        check_output,
+                        DEVNULL)
+
+from codechecker import git
+
+
+class GitRepositoryTestCase(unittest.TestCase):
+    """Base test case creating temporary git repository."""
+
+    def setUp(self):
+        repo_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(repo_dir.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(repo_dir.name)
+        self.repo_path = repo_dir.name
+        self.git('init', '-q')
+        self.git('config', 'user.email', 'tests@example.com')
+        self.git('config', 'user.name', 'tests')
+        # repository directory is remembered on first use
+        # pylint: disable=protected-access
+        git._repository_dir_path.cache_clear()
+        self.addCleanup(git._repository_dir_path.cache_clear)
+
+    def git(self, *args):
+        """Execute git command in repository."""
+        # pylint: disable=no-self-use
+        check_call(('git',) + args, stdout=DEVNULL)
+
+    def write(self, file_relpath, contents):
+        """Write file in working tree."""
+        # pylint: disable=no-self-use
+        dir_path = os.path.dirname(file_relpath)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
+        with open(file_relpath, 'w') as written_file:
+            written_file.write(contents)
+
+    def commit(self, files):
+        """Write and commit files."""
+        for file_relpath, contents in files.items():
+            self.write(file_relpath, contents)
+        self.git('add', '-A')
+        self.git('commit', '-q', '-m', 'commit')
+
+
+class StagedBlobsTestCase(GitRepositoryTestCase):
+    """Test :func:`codechecker.git.get_staged_blobs`."""
+
+    def test_files_with_unstaged_changes_are_skipped(self):
+        self.write('staged.py', 'staged')
+        self.write('modified.py', 'staged')
+        self.git('add', '-A')
+        self.write('modified.py', 'modified')
+
+        blobs = git.get_staged_blobs()
+
+        self.assertEqual(['staged.py'], list(blobs))
+        self.assertEqual(b'staged', git.read_blob(blobs['staged.py']))
+
+
+class RangeBlobsTestCase(GitRepositoryTestCase):
+    """Test :func:`codechecker.git.get_range_blobs`."""
+
+    def test_files_changed_in_range_are_returned_with_tip_contents(self):
+        self.commit({'base.py': 'base'})
+        self.commit({'a.py': 'first', 'dir/b.py': 'b', 'removed.py': 'x'})
+        self.git('rm', '-q', 'removed.py')
+        self.commit({'a.py': 'second'})
+
+        blobs = git.get_range_blobs('HEAD~2..HEAD')
+
+        self.assertEqual({'a.py', 'dir/b.py'}, set(blobs))
+        with git.BlobReader() as reader:
+            self.assertEqual(b'second', reader.read(blobs['a.py']))
+            self.assertEqual(b'b', reader.read(blobs['dir/b.py']))
+
+    def test_blobs_are_written_to_directory(self):
+        self.commit({'dir/a.py': 'contents'})
+        with tempfile.TemporaryDirectory() as directory:
+            git.checkout_blobs(git.get_range_blobs('HEAD'), directory)
+            with open(os.path.join(directory, 'dir/a.py')) as checked_file:
+                self.assertEqual('contents', checked_file.read())
+
+    def test_invalid_range_raises_error(self):
+        self.commit({'a.py': 'a'})
+        self.assertRaises(ValueError, git.get_range_blobs, 'missing..HEAD')
+
+
+class WorktreeFilesTestCase(GitRepositoryTestCase):
+    """Test inspecting working tree files."""
+
+    def test_changed_and_untracked_files_are_returned(self):
+        self.write('.gitignore', 'ignored.py\n')
+        self.commit({'unchanged.py': 'a', 'changed.py': 'a'})
+        self.write('changed.py', 'b')
+        self.write('new.py', 'new')
+        self.write('ignored.py', 'ignored')
+
+        self.assertEqual(['changed.py', 'new.py'], git.get_changed_files())
+
+    def test_ignored_and_deleted_files_are_filtered_out(self):
+        self.write('.gitignore', 'ignored.py\n')
+        self.commit({'deleted.py': 'a', 'kept.py': 'a'})
+        os.remove('deleted.py')
+        self.write('ignored.py', 'ignored')
+
+        self.assertEqual(
+            ['kept.py'],
+            git.get_worktree_files(['deleted.py', 'kept.py', 'ignored.py'])
+        )
+
+    def test_worktree_hash_is_staged_blob_id(self):
+        self.write('a.py', 'contents')
+
+        blob_ids = git.hash_worktree_files(['a.py'])
+        self.git('add', 'a.py')
+
+        self.assertEqual(git.get_staged_blobs(), blob_ids)
+
+
+class IndexBlobsTestCase(GitRepositoryTestCase):
+    """Test reading staged blobs of files with unstaged changes."""
+
+    def test_files_with_unstaged_changes_are_returned(self):
+        self.commit({'a.py': 'staged', 'b.py': 'b'})
+        self.write('a.py', 'unstaged')
+
+        blobs = git.get_index_blobs(['a.py', 'missing.py'])
+
+        self.assertEqual(['a.py'], list(blobs))
+        self.assertEqual(b'staged', git.read_blob(blobs['a.py']))
+
+    def test_submodules_are_skipped(self):
+        self.commit({'a.py': 'a'})
+        commit_id = check_output(['git', 'rev-parse', 'HEAD']).decode().strip()
+        self.git('update-index', '--add', '--cacheinfo',
+                 '160000,{},sub'.format(commit_id))
+        os.mkdir('sub')
+
+        self.assertEqual(['a.py'], [each_file for each_file, _ in
+                                    git.iter_tracked_files()])
+        self.assertEqual({}, git.get_index_blobs(['sub']))
+
+    def test_shared_reader_is_reused(self):
+        self.commit({'a.py': 'a'})
+        blob_id = git.get_index_blobs(['a.py'])['a.py']
+
+        reader = git.get_shared_blob_reader()
+
+        self.assertIs(reader, git.get_shared_blob_reader())
+        self.assertEqual(b'a', reader.read(blob_id))
+
+
+class StagedIndexTestCase(GitRepositoryTestCase):
+    """Test :func:`codechecker.git.get_staged_index`."""
+
+    def test_entries_describe_staged_files(self):
+        self.commit({'.gitattributes': 'gen/* linguist-generated\n',
+                     'deleted.py': 'a'})
+        self.write('a.py', 'text')
+        self.write('gen/b.py', 'generated')
+        with open('image.png', 'wb') as image_file:
+            image_file.write(b'PNG\0data')
+        os.symlink('a.py', 'link.py')
+        os.remove('deleted.py')
+        self.git('add', '-A')
+
+        index = git.get_staged_index()
+
+        self.assertEqual(('A', 4, '100644', False),
+                         (index['a.py'].status, index['a.py'].size,
+                          index['a.py'].mode, index['a.py'].binary))
+        self.assertEqual(b'text', git.read_blob(index['a.py'].blob))
+        self.assertTrue(index['gen/b.py'].is_generated)
+        self.assertFalse(index['a.py'].is_generated)
+        self.assertTrue(index['image.png'].binary)
+        self.assertTrue(index['link.py'].is_symlink)
+        self.assertEqual(('D', None), (index['deleted.py'].status,
+                                       index['deleted.py'].blob))
+
+    def test_binary_attribute_overrides_contents(self):
+        self.commit({'.gitattributes': '*.dat binary\n'})
+        self.write('a.dat', 'text')
+        self.write('b.py', 'text')
+        self.git('add', 'a.dat', 'b.py')
+
+        index = git.get_staged_index(['a.dat'])
+
+        self.assertEqual(['a.dat'], list(index))
+        self.assertTrue(index['a.dat'].binary)
+
+    def test_contents_larger_than_limit_are_not_read(self):
+        self.write('small.py', 'text')
+        self.write('large.py', 'x' * 100)
+        with open('large.bin', 'wb') as binary_file:
+            binary_file.write(b'\0' + b'x' * 20000)
+        self.git('add', '-A')
+
+        index = git.get_staged_index(['small.py', 'large.py', 'large.bin'],
+                                     {'small.py': 10, 'large.py': 10})
+
+        self.assertEqual((4, False),
+                         (index['small.py'].size, index['small.py'].binary))
+        self.assertEqual((100, None),
+                         (index['large.py'].size, index['large.py'].binary))
+        self.assertEqual((20001, True),
+                         (index['large.bin'].size, index['large.bin'].binary))
+
+    def test_heads_of_large_blobs_are_read_by_own_process(self):
+        with open('large.bin', 'wb') as binary_file:
+            binary_file.write(b'x' * 100 + b'\0' + b'x' * 20000)
+        self.write('large.py', 'x' * 20000)
+        self.git('add', '-A')
+
+        with mock.patch.object(git, '_LARGE_BLOB_SIZE', 10000):
+            index = git.get_staged_index()
+
+        self.assertTrue(index['large.bin'].binary)
+        self.assertFalse(index['large.py'].binary)
+
+
+class StagedTreeTestCase(GitRepositoryTestCase):
+    """Test :func:`codechecker.git.get_staged_tree`."""
+
+    def test_tree_id_depends_on_staged_contents_only(self):
+        self.commit({'a.py': 'a'})
+        tree_id = git.get_staged_tree()
+        self.git('commit', '-q', '--amend', '-m', 'amended')
+
+        self.assertEqual(tree_id, git.get_staged_tree())
+        self.commit({'a.py': 'b'})
+        self.assertNotEqual(tree_id, git.get_staged_tree())
+
+    def test_unstaged_changes_and_untracked_files_give_none(self):
+        self.commit({'a.py': 'a'})
+        self.write('a.py', 'b')
+        self.assertIsNone(git.get_staged_tree())
+
+        self.git('add', 'a.py')
+        self.write('new.py', 'new')
+        self.assertIsNone(git.get_staged_tree())
+
+
+class SnapshotTestCase(GitRepositoryTestCase):
+    """Test :func:`codechecker.git.create_snapshot`."""
+
+    def setUp(self):
+        super().setUp()
+        snapshot_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(snapshot_dir.cleanup)
+        self.snapshot_path = snapshot_dir.name
+
+    def read_snapshot(self, file_relpath):
+        """Read file from snapshot."""
+        with open(os.path.join(self.snapshot_path, file_relpath)) \
+                as snapshot_file:
+            return snapshot_file.read()
+
+    def test_snapshot_contains_staged_contents(self):
+        self.commit({'a.py': 'a', 'src/b.py': 'b', 'c.py': 'c'})
+        self.write('a.py', 'staged')
+        self.git('add', 'a.py')
+        self.write('a.py', 'unstaged')
+        os.remove('c.py')
+        self.write('untracked.py', 'untracked')
+
+        blobs = git.create_snapshot(self.snapshot_path)
+
+        self.assertEqual(['a.py', 'c.py', 'src/b.py'], sorted(blobs))
+        self.assertEqual('staged', self.read_snapshot('a.py'))
+        self.assertEqual('c', self.read_snapshot('c.py'))
+        self.assertEqual('b', self.read_snapshot('src/b.py'))
+        self.assertFalse(os.path.exists(
+            os.path.join(self.snapshot_path, 'untracked.py')
+        ))
+
+    def test_unmodified_files_are_linked(self):
+        self.commit({'a.py': 'a', 'b.py': 'b'})
+        self.write('b.py', 'modified')
+
+        git.create_snapshot(self.snapshot_path)
+
+        self.assertTrue(os.path.islink(
+            os.path.join(self.snapshot_path, 'a.py')
+        ))
+        self.assertFalse(os.path.islink(
+            os.path.join(self.snapshot_path, 'b.py')
+        ))
@@ -0,0 +1,237 @@
+"""Test :mod:`codechecker.jobserver`."""
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import yaml
+
+from codechecker.jobserver import (find_jobserver_auth,
+                                   JobServer)
+from codechecker.checker.task import (Task,
+                                      ArgvTemplate)
+from codechecker.checkers_spec import (FILE_CHECKERS,
+                                       TASKNAME,
+                                       COMMAND)
+from codechecker.scripts import runner
+from codechecker.worker import (iter_results,
+                                Monitor)
+
+from tests.testsuite.test_git import GitRepositoryTestCase
+from tests.testsuite.test_worker import (create_task,
+                                         _SlotsMonitor)
+
+
+class FindJobserverAuthTestCase(unittest.TestCase):
+    """Test parsing MAKEFLAGS."""
+
+    def test_fifo_and_descriptors_are_found(self):
+        self.assertEqual('fifo:/tmp/js', find_jobserver_auth(
+            '-j4 --jobserver-auth=fifo:/tmp/js'
+        ))
+        self.assertEqual('3,4', find_jobserver_auth(' -j --jobserver-fds=3,4'))
+
+    def test_make_without_jobserver_is_ignored(self):
+        self.assertIsNone(find_jobserver_auth('-k'))
+        self.assertIsNone(find_jobserver_auth('--jobserver-auth=-2,-2'))
+
+
+class JobServerTestCase(unittest.TestCase):
+    """Test acquiring and releasing tokens."""
+
+    def test_created_jobserver_holds_slots_except_implicit(self):
+        with JobServer.create(3) as jobserver:
+            tokens = [jobserver.try_acquire() for _ in range(3)]
+
+            self.assertIsNone(tokens[-1])
+            jobserver.release(tokens[0])
+            self.assertIsNotNone(jobserver.try_acquire())
+
+    def test_jobserver_is_found_in_environ(self):
+        with JobServer.create(2) as jobserver:
+            joined = JobServer.from_environ({'MAKEFLAGS': jobserver.makeflags})
+            with joined:
+                self.assertIsNotNone(joined.try_acquire())
+                self.assertIsNone(jobserver.try_acquire())
+
+    def test_missing_jobserver_is_ignored(self):
+        self.assertIsNone(JobServer.from_environ({
+            'MAKEFLAGS': '--jobserver-auth=fifo:/nonexistent/fifo'
+        }))
+
+    def test_descriptors_which_are_not_pipes_are_ignored(self):
+        with tempfile.TemporaryFile() as regular_file:
+            fd = regular_file.fileno()
+            self.assertIsNone(JobServer.from_environ({
+                'MAKEFLAGS': '--jobserver-auth={0},{0}'.format(fd)
+            }))
+            self.assertIsNone(JobServer.from_environ({
+                'MAKEFLAGS': '--jobserver-auth=fifo:{}'.format(
+                    regular_file.name
+                )
+            }))
+            # descriptor is not closed
+            os.fstat(fd)
+
+
+class SlotsSharingTestCase(unittest.TestCase):
+    """Test worker slots limited by jobserver tokens."""
+
+    def test_used_slots_are_limited_by_tokens(self):
+        monitor = _SlotsMonitor()
+        tasks = [create_task('task {}'.format(index)) for index in range(6)]
+
+        with JobServer.create(2) as jobserver, \
+                mock.patch.dict('os.environ',
+                                {'MAKEFLAGS': jobserver.makeflags}):
+            results = list(iter_results(tasks, workers_count=4,
+                                        adaptive=False, monitor=monitor))
+
+            self.assertEqual(6, len(results))
+            self.assertLessEqual(max(monitor.used_slots), 2)
+            # all tokens are returned
+            self.assertIsNotNone(jobserver.try_acquire())
+
+    def test_heavy_task_alone_gets_available_slots(self):
+        task = create_task('heavy', weight=4)
+
+        with JobServer.create(2) as jobserver, \
+                mock.patch.dict('os.environ',
+                                {'MAKEFLAGS': jobserver.makeflags}):
+            list(iter_results([task], workers_count=4, adaptive=False))
+
+        self.assertEqual(2, task.jobs)
+
+    def test_reserved_tokens_are_readable_by_checker(self):
+        # checker reads tokens from jobserver and writes them back
+        command = (
+            'python3 -c "import os, re; '
+            'path = re.search(\\"fifo:(\\\\S+)\\", '
+            'os.environ[\\"MAKEFLAGS\\"]).group(1); '
+            'fd = os.open(path, os.O_RDWR | os.O_NONBLOCK); '
+            'tokens = os.read(fd, 16); '
+            'os.write(fd, tokens); '
+            'print(len(tokens)); exit(1)"'
+        )
+        task = create_task('heavy', weight=4, command=command)
+
+        with mock.patch.dict('os.environ', {'MAKEFLAGS': ''}):
+            result, = iter_results([task], workers_count=4, adaptive=False,
+                                   jobserver=True)
+
+        self.assertEqual('3', result.message.strip())
+
+    def test_tokens_are_kept_for_checker_getting_jobs_option(self):
+        available_tokens = []
+        task = create_task('heavy', weight=4)
+        task.argv_template = ArgvTemplate('sleep 0.05', {}, None,
+                                          '${jobs}')
+
+        with JobServer.create(4) as jobserver, \
+                mock.patch.dict('os.environ',
+                                {'MAKEFLAGS': jobserver.makeflags}):
+
+            class TokensMonitor(Monitor):
+                """Count tokens left in jobserver when job is started."""
+
+                def job_started(self, job, used_slots, total_slots):
+                    token = jobserver.try_acquire()
+                    available_tokens.append(token is not None)
+                    if token is not None:
+                        jobserver.release(token)
+
+            list(iter_results([task], workers_count=4, adaptive=False,
+                              monitor=TokensMonitor()))
+
+        self.assertEqual(4, task.jobs)
+        self.assertEqual([False], available_tokens)
+
+    def test_created_jobserver_is_passed_to_checkers(self):
+        task = Task('make', 'sh -c "echo $$MAKEFLAGS; exit 1"')
+
+        with mock.patch.dict('os.environ', {'MAKEFLAGS': ''}):
+            result, = iter_results([task], workers_count=2, adaptive=False,
+                                   jobserver=True)
+
+        self.assertIn('--jobserver-auth=fifo:', result.message)
+
+    def test_granted_slots_are_passed_in_jobs_option(self):
+        template = ArgvTemplate('lint ${file_abspath}', {}, None,
+                                '--jobs=${jobs}')
+
+        self.assertEqual(['lint', 'a.py'], template.build('a.py'))
+        self.assertEqual(['lint', 'a.py', '--jobs=3'],
+                         template.build('a.py', 3))
+
+    def test_jobs_option_precedes_stdin_argument(self):
+        template = ArgvTemplate('phpcs --stdin-path=${file_abspath} -', {},
+                                None, '--parallel=${jobs}')
+
+        self.assertEqual(['phpcs', '--stdin-path=a.php', '--parallel=2', '-'],
+                         template.build('a.php', 2))
+
+    def test_tokens_of_cancelled_jobs_are_released(self):
+        available_tokens = []
+        tasks = [create_task('heavy {}'.format(index), weight=3)
+                 for index in range(3)]
+
+        with JobServer.create(3) as jobserver, \
+                mock.patch.dict('os.environ',
+                                {'MAKEFLAGS': jobserver.makeflags}):
+
+            class TokensMonitor(Monitor):
+                """Count tokens left in jobserver when job is skipped."""
+
+                def job_skipped(self, job):
+                    tokens = []
+                    while True:
+                        token = jobserver.try_acquire()
+                        if token is None:
+                            break
+                        tokens.append(token)
+                    available_tokens.append(len(tokens))
+                    for each_token in tokens:
+                        jobserver.release(each_token)
+
+            list(iter_results(tasks, workers_count=3, adaptive=False,
+                              monitor=TokensMonitor(),
+                              is_cancelled=lambda job: True))
+
+        self.assertEqual([2, 2, 2], available_tokens)
+
+
+class JobserverConfigTestCase(GitRepositoryTestCase):
+    """Test enabling jobserver in concurrency section of config."""
+
+    def setUp(self):
+        super().setUp()
+        file_checkers_patch = mock.patch.dict(FILE_CHECKERS, {'make': {
+            TASKNAME: 'MAKE ${file_relpath}',
+            COMMAND: 'sh -c "echo $$MAKEFLAGS | grep -q jobserver-auth"'
+        }})
+        self.addCleanup(file_checkers_patch.stop)
+        file_checkers_patch.start()
+        environ_patch = mock.patch.dict('os.environ', {'MAKEFLAGS': ''})
+        self.addCleanup(environ_patch.stop)
+        environ_patch.start()
+
+    def test_check_code_passes_jobserver_to_checkers(self):
+        self.write('precommit-checkers.yml', yaml.dump({
+            'file-checkers': {'*.py': ['make']},
+            'concurrency': {'jobs': 2, 'jobserver': True}
+        }))
+        self.write('a.py', 'a')
+        self.git('add', 'a.py')
+
+        # git module decodes output with stdout encoding
+        output = io.TextIOWrapper(io.BytesIO(), encoding='utf-8')
+        with contextlib.redirect_stdout(output):
+            status = runner.main(['--compact', '--no-progress'])
+
+        self.assertEqual(0, status)
+
+
+if __name__ == '__main__':
+    unittest.main()
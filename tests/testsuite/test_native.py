@@ -0,0 +1,131 @@
+"""Test :mod:`codechecker.checker.native`."""
+import os
+import tempfile
+import threading
+import unittest
+
+from codechecker.checker import native
+from codechecker.checker.native import (NativeTask,
+                                        NativeTaskCreator)
+from codechecker.checker.task import (Task,
+                                      CheckResult)
+from codechecker.worker import iter_results
+
+
+class ChecksTestCase(unittest.TestCase):
+    """Test check functions."""
+
+    def test_trailing_whitespace_lines_are_reported(self):
+        contents = b'ok\nspace \r\nok\ntab\t\n'
+
+        problems = native.check_trailing_whitespace(contents, {})
+
+        self.assertEqual([(2, 'trailing whitespace'),
+                          (4, 'trailing whitespace')], problems)
+
+    def test_conflict_markers_are_reported(self):
+        contents = b'<<<<<<< HEAD\na\n=======\nb\n>>>>>>> branch\n'
+
+        problems = native.check_merge_conflict(contents, {})
+
+        self.assertEqual([1, 5], [line for line, _ in problems])
+
+    def test_crlf_and_final_newline(self):
+        self.assertEqual([(2, 'CRLF line ending')],
+                         native.check_crlf(b'a\nb\r\n', {}))
+        self.assertEqual([], native.check_final_newline(b'', {}))
+        self.assertEqual([(None, 'no newline at end of file')],
+                         native.check_final_newline(b'a\nb', {}))
+
+    def test_file_size_limit_is_configurable(self):
+        self.assertEqual([], native.check_file_size(b'abc', {'max-size': 3}))
+        self.assertEqual(1, len(native.check_file_size(b'abcd',
+                                                       {'max-size': 3})))
+
+    def test_syntax_errors_are_reported_with_line(self):
+        self.assertEqual([], native.check_python_syntax(b'a = 1\n', {}))
+        self.assertEqual(2, native.check_python_syntax(b'a = 1\nif\n',
+                                                       {})[0][0])
+        self.assertEqual(2, native.check_json(b'{\n"a" 1}', {})[0][0])
+        self.assertEqual([], native.check_yaml(b'a: 1\n---\nb: 2\n', {}))
+        self.assertEqual(2, native.check_yaml(b'a: [1\n', {})[0][0])
+
+
+class NativeTaskTestCase(unittest.TestCase):
+    """Test executing native tasks."""
+
+    def setUp(self):
+        rootdir = tempfile.TemporaryDirectory()
+        self.addCleanup(rootdir.cleanup)
+        self.rootdir = rootdir.name
+        self.creator = NativeTaskCreator('trailing-whitespace',
+                                         'TW ${file_relpath}',
+                                         native.check_trailing_whitespace)
+
+    def create_task(self, relpath, contents):
+        """Write file and create task checking it."""
+        with open(os.path.join(self.rootdir, relpath), 'wb') as checked_file:
+            checked_file.write(contents)
+        task = self.creator.create(relpath)
+        task.rootdir = self.rootdir
+        return task
+
+    def test_mapped_file_is_checked(self):
+        task = self.create_task('a.py', b'a \nb\n')
+
+        result = task()
+
+        self.assertIsInstance(task, NativeTask)
+        self.assertEqual(CheckResult.ERROR, result.status)
+        self.assertEqual('a.py:1: trailing whitespace', result.message)
+
+    def test_empty_file_is_checked(self):
+        self.assertEqual(CheckResult.SUCCESS,
+                         self.create_task('empty.py', b'')().status)
+
+    def test_number_of_reported_problems_is_limited(self):
+        task = self.create_task('a.py', b'a \n' * (native.MAX_PROBLEMS + 5))
+
+        lines = task().message.splitlines()
+
+        self.assertEqual(native.MAX_PROBLEMS + 1, len(lines))
+        self.assertEqual('... 5 more', lines[-1])
+
+    def test_tasks_are_executed_without_worker_slots(self):
+        tasks = [self.create_task('{}.py'.format(index), b'ok\n')
+                 for index in range(20)]
+
+        results = list(iter_results(tasks, workers_count=1, adaptive=False))
+
+        self.assertEqual(20, len(results))
+        self.assertTrue(all(task.in_process for task in tasks))
+
+    def test_worker_jobs_are_submitted_while_native_tasks_run(self):
+        started = threading.Event()
+
+        def check_slowly(contents, config):
+            # pylint: disable=unused-argument
+            started.wait(5)
+            return []
+        creator = NativeTaskCreator('slow', 'Slow ${file_relpath}',
+                                    check_slowly)
+        native_task = creator.create('a.py')
+        self.create_task('a.py', b'ok\n')
+        native_task.rootdir = self.rootdir
+        worker_task = Task('Worker', 'true')
+
+        results = []
+        for result in iter_results([native_task, worker_task],
+                                   workers_count=1, adaptive=False):
+            results.append(result.taskname)
+            started.set()
+
+        self.assertEqual(['Worker', 'Slow a.py'], results)
+
+    def test_check_function_is_part_of_fingerprint(self):
+        other_creator = NativeTaskCreator('trailing-whitespace',
+                                          'TW ${file_relpath}',
+                                          native.check_crlf)
+
+        self.assertNotEqual(self.creator.create('a.py').fingerprint,
+                            other_creator.create('a.py').fingerprint)
@@ -0,0 +1,89 @@
+"""Test :mod:`codechecker.progress`."""
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from codechecker.checker.task import (Task,
+                                      CheckResult)
+from codechecker.progress import (DurationHistory,
+                                  ProgressMonitor)
+
+
+def create_task(name, checkername):
+    """Create task of checker."""
+    task = Task(name, 'true')
+    task.checkername = checkername
+    return task
+
+
+class DurationHistoryTestCase(unittest.TestCase):
+    """Test :class:`codechecker.progress.DurationHistory`."""
+
+    def setUp(self):
+        history_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(history_dir.cleanup)
+        self.history_path = os.path.join(history_dir.name, 'code-checker',
+                                         'durations.json')
+
+    def test_durations_are_averaged_and_saved(self):
+        history = DurationHistory(self.history_path)
+        history.record('pylint', 10.0)
+        history.record('pylint', 20.0)
+        history.save()
+
+        self.assertEqual(13.0,
+                         DurationHistory(self.history_path).expected('pylint'))
+
+    def test_invalid_file_is_treated_as_empty(self):
+        os.makedirs(os.path.dirname(self.history_path))
+        with open(self.history_path, 'w') as history_file:
+            json.dump([1], history_file)
+
+        self.assertEqual(1.0,
+                         DurationHistory(self.history_path).expected('pep8'))
+
+
+class ProgressMonitorTestCase(unittest.TestCase):
+    """Test :class:`codechecker.progress.ProgressMonitor`."""
+
+    def setUp(self):
+        self.history = mock.Mock(spec=DurationHistory)
+        self.history.expected.side_effect = \
+            lambda checkername: {'pep8': 1.0, 'unittest': 60.0}[checkername]
+        self.tasks = [create_task('PEP8 {}'.format(index), 'pep8')
+                      for index in range(4)]
+        self.tasks.append(create_task('UNITTEST', 'unittest'))
+        self.stream = io.StringIO()
+        self.monitor = ProgressMonitor(self.tasks, self.history, self.stream)
+
+    def test_line_shows_counts_and_eta(self):
+        self.monitor.job_cached(self.tasks[0], CheckResult('PEP8 0'))
+        self.monitor.job_skipped(self.tasks[1])
+        with mock.patch('time.monotonic', return_value=1000.0):
+            self.monitor.job_started(self.tasks[4], 2, 2)
+        with mock.patch('time.monotonic', return_value=1010.0):
+            line = self.monitor.format_line()
+
+        # (2 queued pep8 * 1s + 50s remaining of unittest) / 2 slots
+        self.assertIn('done 1, running 1, queued 2, ETA 26s', line)
+        self.assertTrue(line.endswith('| UNITTEST (10s)'))
+
+    def test_line_is_printed_at_bounded_rate_on_log(self):
+        self.monitor.tick()
+        self.assertEqual('', self.stream.getvalue())
+
+        self.monitor.interval = 0
+        self.monitor.tick()
+        self.assertEqual(1, self.stream.getvalue().count('\n'))
+
+    def test_durations_are_recorded(self):
+        self.monitor.job_started(self.tasks[4], 1, 2)
+        self.monitor.job_finished(self.tasks[4], CheckResult('UNITTEST'),
+                                  42.0)
+        self.monitor.run_finished()
+
+        self.history.record.assert_called_once_with('unittest', 42.0)
+        self.history.save.assert_called_once_with()
@@ -0,0 +1,156 @@
+"""Test :mod:`codechecker.watch`."""
+import io
+import threading
+import time
+
+from codechecker import watch
+from codechecker.checker.task import (CheckResult,
+                                      Task)
+from tests.testsuite.test_git import GitRepositoryTestCase
+
+
+class WatcherTestCase(GitRepositoryTestCase):
+    """Test detecting changes in working tree."""
+
+    def create_watcher(self):
+        """Create tested watcher."""
+        watcher = watch.InotifyWatcher(self.repo_path)
+        self.addCleanup(watcher.close)
+        return watcher
+
+    def test_changed_files_are_reported(self):
+        self.write('dir/a.py', 'a')
+        watcher = self.create_watcher()
+
+        self.write('dir/a.py', 'b')
+
+        self.assertEqual({'dir/a.py'}, watch.wait_for_changes(watcher, 0.1))
+
+    def test_files_in_new_directory_are_reported(self):
+        watcher = self.create_watcher()
+
+        self.write('new/dir/a.py', 'a')
+
+        self.assertIn('new/dir/a.py', watch.wait_for_changes(watcher, 0.1))
+
+    def test_git_directory_is_not_watched(self):
+        watcher = self.create_watcher()
+
+        self.write('.git/code-checker/cache', 'result')
+
+        self.assertEqual(set(), watcher.read_changes(0.1))
+
+    def test_changes_are_debounced(self):
+        watcher = self.create_watcher()
+
+        def write_files():
+            for index in range(3):
+                self.write('{}.py'.format(index), 'a')
+                time.sleep(0.05)
+        writer = threading.Thread(target=write_files)
+        writer.start()
+        self.addCleanup(writer.join)
+        time.sleep(0.01)
+
+        self.assertEqual({'0.py', '1.py', '2.py'},
+                         watch.wait_for_changes(watcher, 0.2))
+
+
+class PollingWatcherTestCase(WatcherTestCase):
+    """Test watching working tree without inotify."""
+
+    def create_watcher(self):
+        return watch.PollingWatcher(self.repo_path, interval=0.01)
+
+    def test_changed_files_are_reported(self):
+        self.write('dir/a.py', 'a')
+        watcher = self.create_watcher()
+
+        # modification time may not change in the same clock tick
+        self.write('dir/a.py', 'changed size')
+
+        self.assertEqual({'dir/a.py'}, watch.wait_for_changes(watcher, 0.1))
+
+
+class CheckFilesTestCase(GitRepositoryTestCase):
+    """Test checking batch of changed files."""
+
+    def test_only_checked_files_are_stat_ed_while_tasks_run(self):
+        self.write('a.py', 'a')
+        self.write('b.py', 'b')
+        watcher = _FakeWatcher()
+
+        def create_tasks(checked_files):
+            tasks = []
+            for each_file, _ in sorted(checked_files):
+                task = Task('Check {}'.format(each_file), 'true')
+                task.relpath = each_file
+                tasks.append(task)
+            # file changes after it was hashed
+            self.write('b.py', 'changed size')
+            return tasks
+        table = watch.ResultTable(io.StringIO())
+
+        changed_files = watch._check_files(
+            {'a.py', 'b.py'}, create_tasks, None, watcher, table,
+            {'workers_count': 2}
+        )
+
+        self.assertEqual(1, watcher.reads)
+        self.assertEqual({'b.py'}, changed_files)
+        # task of changed file is cancelled and checked again later
+        self.assertEqual(['Check a.py'], [
+            each_taskname for each_taskname, result in table._rows.items()
+            if result is not None
+        ])
+
+
+class ResultTableTestCase(GitRepositoryTestCase):
+    """Test :class:`codechecker.watch.ResultTable`."""
+
+    def test_table_is_printed_when_tasks_finish_if_output_is_not_tty(self):
+        stream = io.StringIO()
+        table = watch.ResultTable(stream)
+        task = _FakeTask('Lint a.py', 'a.py')
+
+        table.add_tasks([task])
+        table.draw()
+        self.assertEqual('', stream.getvalue())
+
+        table.update(CheckResult('Lint a.py', CheckResult.ERROR,
+                                 message='a.py:1: error'))
+        table.draw()
+        self.assertIn('a.py:1: error', stream.getvalue())
+        self.assertIn('1 tasks, 0 pending, 1 failed', stream.getvalue())
+
+    def test_rows_of_changed_files_are_removed(self):
+        stream = io.StringIO()
+        table = watch.ResultTable(stream)
+        table.add_tasks([_FakeTask('Lint a.py', 'a.py'),
+                         _FakeTask('Lint b.py', 'b.py')])
+        table.update(CheckResult('Lint b.py'))
+
+        table.remove_files(['a.py'])
+        table.draw()
+
+        self.assertIn('1 tasks, 0 pending', stream.getvalue())
+
+
+class _FakeWatcher:
+    """Watcher reporting b.py changed, reads are counted."""
+
+    def __init__(self):
+        self.reads = 0
+
+    def read_changes(self, _):
+        """Report change of b.py."""
+        self.reads += 1
+        return {'b.py'}
+
+
+class _FakeTask:
+    # pylint: disable=too-few-public-methods
+    def __init__(self, taskname, relpath):
+        self.taskname = taskname
+        self.relpath = relpath
+
@@ -0,0 +1,502 @@
+"""Test :mod:`codechecker.worker`."""
+import collections
+import io
+import os
+import pickle
+import tempfile
+import threading
+import time
+import unittest
+
+from codechecker.checker.builder import (CheckListBuilder,
+                                         TaskCreator,
+                                         group_duplicate_tasks)
+from codechecker.checker.task import (Task,
+                                      CheckResult)
+from codechecker.git import IndexEntry
+from codechecker.worker import (iter_results,
+                                CompactReport,
+                                ResultSummary,
+                                Monitor)
+
+
+def create_task(name, checkername='checker', weight=1, max_parallel=None,
+                tier=0, command='sleep 0.05'):
+    """Create task sleeping for short time."""
+    # pylint: disable=too-many-arguments
+    task = Task(name, command)
+    task.checkername = checkername
+    task.weight = weight
+    task.max_parallel = max_parallel
+    task.tier = tier
+    return task
+
+
+class _SlotsMonitor(Monitor):
+    """Record slots used and tasks running at once."""
+
+    def __init__(self):
+        self.used_slots = []
+        self.running = {}
+        self.max_running = {}
+
+    def job_started(self, job, used_slots, total_slots):
+        self.used_slots.append(used_slots)
+        self.running[job.checkername] = \
+            self.running.get(job.checkername, 0) + 1
+        self.max_running[job.checkername] = max(
+            self.max_running.get(job.checkername, 0),
+            self.running[job.checkername]
+        )
+
+    def job_finished(self, job, result, duration):
+        self.running[job.checkername] -= 1
+
+
+class SchedulingTestCase(unittest.TestCase):
+    """Test weighted admission of tasks."""
+
+    def test_weight_limits_used_slots(self):
+        monitor = _SlotsMonitor()
+        tasks = [create_task('heavy {}'.format(index), weight=2)
+                 for index in range(3)]
+        tasks += [create_task('light {}'.format(index)) for index in range(3)]
+
+        results = list(iter_results(tasks, workers_count=3, adaptive=False,
+                                    monitor=monitor))
+
+        self.assertEqual(6, len(results))
+        self.assertLessEqual(max(monitor.used_slots), 3)
+
+    def test_task_heavier_than_all_slots_is_executed(self):
+        tasks = [create_task('heavy', weight=8), create_task('light')]
+
+        results = list(iter_results(tasks, workers_count=2, adaptive=False))
+
+        self.assertEqual({'heavy', 'light'},
+                         {result.taskname for result in results})
+
+    def test_max_parallel_limits_tasks_of_checker(self):
+        monitor = _SlotsMonitor()
+        tasks = [create_task('db {}'.format(index), 'db', max_parallel=1)
+                 for index in range(3)]
+        tasks += [create_task('lint {}'.format(index), 'lint')
+                  for index in range(3)]
+
+        results = list(iter_results(tasks, workers_count=4, adaptive=False,
+                                    monitor=monitor))
+
+        self.assertEqual(6, len(results))
+        self.assertEqual(1, monitor.max_running['db'])
+        self.assertGreater(monitor.max_running['lint'], 1)
+
+
+class TiersTestCase(unittest.TestCase):
+    """Test gating tasks by tiers."""
+
+    def test_later_tier_starts_after_earlier_tier_finished(self):
+        monitor = _SlotsMonitor()
+        tasks = [create_task('style', 'style'), create_task('tests', 'tests',
+                                                            tier=1)]
+
+        list(iter_results(tasks, workers_count=2, adaptive=False,
+                          monitor=monitor))
+
+        # slots used after task started
+        self.assertEqual([1, 1], monitor.used_slots)
+
+    def test_later_tiers_are_skipped_when_tier_fails(self):
+        counters = collections.Counter()
+        tasks = [create_task('style', command='false'),
+                 create_task('tests', tier=1), create_task('deploy', tier=2)]
+
+        results = list(iter_results(tasks, workers_count=2, adaptive=False,
+                                    counters=counters))
+
+        self.assertEqual(['style'], [result.taskname for result in results])
+        self.assertEqual(2, counters['skipped'])
+
+    def test_speculative_results_are_dropped_when_tier_fails(self):
+        monitor = _SlotsMonitor()
+        counters = collections.Counter()
+        tasks = [create_task('style', 'style', command='false'),
+                 create_task('tests', 'tests', tier=1, command='sleep 0.3')]
+
+        results = list(iter_results(tasks, workers_count=2, adaptive=False,
+                                    monitor=monitor, speculative=True,
+                                    counters=counters))
+
+        self.assertEqual([1, 2], monitor.used_slots)
+        self.assertEqual(['style'], [result.taskname for result in results])
+        self.assertEqual(1, counters['skipped'])
+
+
+class CancellationTestCase(unittest.TestCase):
+    """Test dropping cancelled tasks."""
+
+    def test_cancelled_tasks_are_not_started(self):
+        tasks = [create_task('first'), create_task('second')]
+
+        results = list(iter_results(
+            tasks, workers_count=1, adaptive=False,
+            is_cancelled=lambda task: task.taskname == 'first'
+        ))
+
+        self.assertEqual(['second'], [result.taskname for result in results])
+
+    def test_result_of_task_cancelled_while_running_is_dropped(self):
+        cancelled = set()
+
+        def is_cancelled(task):
+            # first call is made before task is started
+            if task.taskname in cancelled:
+                return True
+            cancelled.add(task.taskname)
+            return False
+
+        results = list(iter_results([create_task('task')], workers_count=1,
+                                    adaptive=False, is_cancelled=is_cancelled))
+
+        self.assertEqual([], results)
+
+
+class CacheLookupTestCase(unittest.TestCase):
+    """Test looking up results of jobs in cache."""
+
+    def test_missed_jobs_start_while_lookups_are_in_flight(self):
+        released = threading.Event()
+
+        class SlowCache:
+            """Cache finding results of every task except first one."""
+
+            def get(self, task):
+                """Return result after first task result is yielded."""
+                if task.taskname == 'first':
+                    return None
+                released.wait(5)
+                return CheckResult(task.taskname)
+
+            def put(self, task, result):
+                """Ignore results."""
+
+        tasks = [create_task('first', command='true')] + \
+            [create_task('cached {}'.format(index)) for index in range(20)]
+        start = time.monotonic()
+        results = []
+        for result in iter_results(tasks, SlowCache(), workers_count=1,
+                                   adaptive=False):
+            results.append(result.taskname)
+            released.set()
+
+        self.assertEqual('first', results[0])
+        self.assertEqual(21, len(results))
+        self.assertLess(time.monotonic() - start, 2)
+
+
+class ExecutionOptionsTestCase(unittest.TestCase):
+    """Test execution options in checker config."""
+
+    def setUp(self):
+        self.creator = TaskCreator('phpunit', 'PHPUnit', 'phpunit',
+                                   defaultconfig={'bootstrap': None})
+
+    def test_execution_options_are_not_checker_config(self):
+        self.creator.set_config({'weight': 4, 'max-parallel': 1,
+                                 'bootstrap': 'boot.php'})
+
+        task = self.creator.create()
+
+        self.assertEqual({'bootstrap': 'boot.php'}, task.config)
+        self.assertEqual(4, task.weight)
+        self.assertEqual(1, task.max_parallel)
+        self.assertEqual('phpunit', task.checkername)
+
+    def test_execution_options_do_not_change_fingerprint(self):
+        fingerprint = self.creator.create().fingerprint
+        self.creator.set_config({'weight': 4})
+
+        self.assertEqual(fingerprint, self.creator.create().fingerprint)
+
+    def test_tasks_with_equal_config_share_compiled_command(self):
+        first_task = self.creator.create('a.php', {'bootstrap': 'b.php'})
+        second_task = self.creator.create('b.php', {'bootstrap': 'b.php'})
+
+        self.assertIs(first_task.argv_template, second_task.argv_template)
+
+    def test_invalid_weight_raises_value_error(self):
+        self.assertRaises(ValueError, self.creator.set_config, {'weight': 0})
+
+    def test_inputs_are_execution_option(self):
+        self.creator.set_config({'inputs': '*.php'})
+
+        task = self.creator.create()
+
+        self.assertEqual(('*.php',), task.inputs)
+        self.assertNotIn('inputs', task.config)
+        self.assertRaises(ValueError, self.creator.set_config, {'inputs': 1})
+
+
+def create_index_entry(size=10, mode='100644', binary=False,
+                       attributes=None):
+    """Create index entry of staged file."""
+    return IndexEntry('a.py', 'A', 'b' * 40, size, mode, binary,
+                      attributes or {})
+
+
+class SkippedFilesTestCase(unittest.TestCase):
+    """Test skipping staged files before tasks are created."""
+
+    def setUp(self):
+        self.creator = TaskCreator('lint', 'Lint ${file_relpath}',
+                                   'lint ${file_abspath}')
+        self.builder = CheckListBuilder({}, {'lint': self.creator})
+
+    def create_tasks(self, index_entry, config=None):
+        """Create tasks of lint checker for staged file."""
+        checker_data = {'lint': config} if config else 'lint'
+        return self.builder.create_checkers_for_file(
+            'a.py', [checker_data], index_entry=index_entry
+        )
+
+    def test_binary_generated_and_symlinked_files_are_skipped(self):
+        self.assertEqual(1, len(self.create_tasks(create_index_entry())))
+        self.assertEqual([], self.create_tasks(create_index_entry(
+            binary=True
+        )))
+        self.assertEqual([], self.create_tasks(create_index_entry(
+            attributes={'linguist-generated': True}
+        )))
+        self.assertEqual([], self.create_tasks(create_index_entry(
+            mode='120000'
+        )))
+
+    def test_thresholds_are_configured_per_checker(self):
+        self.creator.set_config({'skip-larger-than': 100})
+
+        self.assertEqual(1, len(self.create_tasks(create_index_entry(100))))
+        self.assertEqual([], self.create_tasks(create_index_entry(101)))
+        self.assertEqual(1, len(self.create_tasks(
+            create_index_entry(101), {'skip-larger-than': 1000}
+        )))
+        self.assertEqual(1, len(self.create_tasks(
+            create_index_entry(binary=True), {'skip-binary': False}
+        )))
+
+    def test_size_limit_is_largest_limit_of_checkers(self):
+        self.creator.set_config({'skip-larger-than': 100})
+
+        self.assertEqual(100, self.builder.get_size_limit(['lint']))
+        self.assertEqual(1000, self.builder.get_size_limit(
+            ['lint', {'lint': {'skip-larger-than': 1000}}]
+        ))
+        self.assertIsNone(self.builder.get_size_limit(
+            ['lint', {'lint': {'skip-larger-than': None}}]
+        ))
+
+    def test_invalid_skip_option_raises_value_error(self):
+        self.assertRaises(ValueError, self.creator.set_config,
+                          {'skip-larger-than': -1})
+        self.assertRaises(ValueError, self.creator.set_config,
+                          {'skip-binary': 'yes'})
+
+
+class StdinTestCase(unittest.TestCase):
+    """Test checkers reading staged blobs from stdin."""
+
+    def setUp(self):
+        self.creator = TaskCreator('lint', 'Lint ${file_relpath}',
+                                   'lint ${file_abspath}',
+                                   stdin_command='lint --name'
+                                   ' ${file_abspath} -')
+
+    def test_stored_blob_is_read_from_stdin(self):
+        task = self.creator.create('a.py', content_hash='1' * 40, stdin=True)
+        task.rootdir = '/tmp'
+
+        self.assertTrue(task.stdin)
+        # pylint: disable=protected-access
+        self.assertEqual(['lint', '--name', '/tmp/a.py', '-'],
+                         task._build_command())
+
+    def test_file_is_read_if_blob_is_not_stored(self):
+        tasks = [self.creator.create('a.py', content_hash='1' * 40),
+                 self.creator.create('a.py', stdin=True)]
+
+        self.assertEqual([False, False], [task.stdin for task in tasks])
+
+    def test_stdin_option_disables_stdin(self):
+        self.creator.set_config({'stdin': False})
+
+        task = self.creator.create('a.py', content_hash='1' * 40, stdin=True)
+
+        self.assertFalse(task.stdin)
+        self.assertRaises(ValueError, self.creator.set_config,
+                          {'stdin': 'no'})
+
+
+class DeduplicationTestCase(unittest.TestCase):
+    """Test tasks checking identical contents are executed once."""
+
+    def setUp(self):
+        self.creator = TaskCreator('lint', 'Lint ${file_relpath}',
+                                   'sh -c "echo ${file_abspath}: bad; exit 1"',
+                                   path_independent=True)
+
+    def test_tasks_with_same_content_are_grouped(self):
+        tasks = [self.creator.create('a/x.py', content_hash='1' * 40),
+                 self.creator.create('b/x.py', content_hash='1' * 40),
+                 self.creator.create('c.py', content_hash='2' * 40),
+                 self.creator.create('d.py')]
+
+        unique_tasks = group_duplicate_tasks(tasks)
+
+        self.assertEqual([tasks[0], tasks[2], tasks[3]], unique_tasks)
+        self.assertEqual([tasks[1]], tasks[0].duplicates)
+
+    def test_tasks_with_different_config_are_not_grouped(self):
+        creator = TaskCreator('lint', 'Lint ${file_relpath}', 'lint',
+                              defaultconfig={'strict': False},
+                              path_independent=True)
+        tasks = [creator.create('a.py', content_hash='1' * 40),
+                 creator.create('b.py', {'strict': True}, '1' * 40)]
+
+        self.assertEqual(tasks, group_duplicate_tasks(tasks))
+
+    def test_tasks_of_path_dependent_checker_are_not_grouped(self):
+        creator = TaskCreator('lint', 'Lint ${file_relpath}', 'lint')
+        tasks = [creator.create('a/x.py', content_hash='1' * 40),
+                 creator.create('b/x.py', content_hash='1' * 40)]
+
+        self.assertEqual(tasks, group_duplicate_tasks(tasks))
+
+    def test_checker_is_path_independent_with_explicit_config(self):
+        creator = TaskCreator('lint', 'Lint ${file_relpath}', 'lint',
+                              defaultconfig={'config': None},
+                              path_independent=('config',))
+        tasks = [creator.create('a/x.py', content_hash='1' * 40),
+                 creator.create('b/x.py', content_hash='1' * 40)]
+        configured_tasks = [
+            creator.create(each_path, {'config': 'lint.cfg'}, '1' * 40)
+            for each_path in ('a/x.py', 'b/x.py')
+        ]
+
+        self.assertEqual(tasks, group_duplicate_tasks(tasks))
+        self.assertEqual(configured_tasks[:1],
+                         group_duplicate_tasks(configured_tasks))
+
+    def test_duplicates_are_not_pickled(self):
+        tasks = [self.creator.create('a/x.py', content_hash='1' * 40),
+                 self.creator.create('b/x.py', content_hash='1' * 40)]
+        group_duplicate_tasks(tasks)
+
+        unpickled = pickle.loads(pickle.dumps(tasks[0]))
+
+        self.assertEqual([], unpickled.duplicates)
+        self.assertEqual([tasks[1]], tasks[0].duplicates)
+
+    def test_adopted_result_refers_to_duplicate_path(self):
+        source = self.creator.create('a/x.py')
+        source.rootdir = '/tmp/root'
+        duplicate = self.creator.create('b/x.py')
+        duplicate.rootdir = '/tmp/root'
+        result = CheckResult('Lint a/x.py', CheckResult.ERROR,
+                             message='a/x.py:1: bad\ndata/x.py:2: bad')
+
+        adopted = duplicate.adopt_result(result, source)
+
+        self.assertEqual('Lint b/x.py', adopted.taskname)
+        self.assertEqual('b/x.py:1: bad\ndata/x.py:2: bad', adopted.message)
+
+    def test_duplicates_receive_result(self):
+        tasks = []
+        for each_path in ('a/x.py', 'b/x.py'):
+            task = self.creator.create(each_path, content_hash='1' * 40)
+            task.rootdir = '/tmp'
+            tasks.append(task)
+
+        results = list(iter_results(group_duplicate_tasks(tasks),
+                                    workers_count=1, adaptive=False))
+
+        self.assertEqual(['Lint a/x.py', 'Lint b/x.py'],
+                         [result.taskname for result in results])
+        self.assertEqual('b/x.py: bad\n', results[1].message)
+
+
+class CompactReportTestCase(unittest.TestCase):
+    """Test :class:`codechecker.worker.CompactReport`."""
+
+    def setUp(self):
+        log_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(log_dir.cleanup)
+        self.log_dir = os.path.join(log_dir.name, 'last-run')
+        self.stream = io.StringIO()
+        self.report = CompactReport(self.log_dir, self.stream)
+        self.summary = ResultSummary()
+
+    def add(self, result):
+        """Add result to report and summary."""
+        self.report.add(result)
+        self.summary.add(result)
+
+    def test_only_failed_results_are_printed(self):
+        self.add(CheckResult('Lint a.py', message='ok'))
+        self.add(CheckResult('Lint b/c.py', CheckResult.ERROR,
+                             message='b/c.py:1: bad'))
+        self.report.finish(self.summary, ['note'])
+
+        log_path = os.path.join(self.log_dir, 'Lint_b_c.py.log')
+        self.assertEqual(
+            'FAILED Lint b/c.py: FAILED (log: {})\n'
+            '2 tasks: 1 passed, 0 warnings, 1 failed\n'
+            'note\n'
+            'Logs: {}\n'
+            'Commit aborted\n'.format(log_path, self.log_dir),
+            self.stream.getvalue()
+        )
+        with open(log_path) as log_file:
+            self.assertEqual('b/c.py:1: bad', log_file.read())
+
+    def test_logs_of_previous_run_are_removed(self):
+        self.add(CheckResult('Lint a.py', message='old'))
+        self.report.finish(self.summary, [])
+
+        CompactReport(self.log_dir, self.stream).finish(self.summary, [])
+
+        self.assertEqual(['results.txt'], os.listdir(self.log_dir))
+
+    def test_clashing_task_names_get_unique_logs(self):
+        self.add(CheckResult('Lint a/b', message='first'))
+        self.add(CheckResult('Lint a_b', message='second'))
+        self.report.finish(self.summary, [])
+
+        self.assertEqual(['Lint_a_b.2.log', 'Lint_a_b.log', 'results.txt'],
+                         sorted(os.listdir(self.log_dir)))
+
+
+class ResultSummaryTestCase(unittest.TestCase):
+    """Test :class:`codechecker.worker.ResultSummary`."""
+
+    def test_successful_results_are_only_counted(self):
+        with ResultSummary() as summary:
+            summary.add(CheckResult('a', message='long output'))
+            summary.add(CheckResult('b', CheckResult.WARNING))
+
+            self.assertEqual(2, summary.total)
+            self.assertTrue(summary.is_ok)
+            self.assertEqual(['b'], [result.taskname
+                                     for result in summary.iter_problems()])
+
+    def test_results_over_memory_limit_overflow_to_disk(self):
+        results = [CheckResult('task {}'.format(index), CheckResult.ERROR,
+                               'FAILED', 'x' * 100)
+                   for index in range(5)]
+
+        with ResultSummary(memory_limit=250) as summary:
+            for each_result in results:
+                summary.add(each_result)
+
+            self.assertFalse(summary.is_ok)
+            self.assertEqual(results, list(summary.iter_problems()))
+            self.assertEqual(results, list(summary.iter_problems(
+                CheckResult.ERROR
+            )))